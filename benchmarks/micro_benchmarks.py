@@ -0,0 +1,532 @@
+"""
+MICRO-BENCHMARKS FOR THE HOT PATHS
+==================================
+Small, focused timings of the code that runs most often, each next to
+the alternative it could be replaced with, so every optimization comes
+with numbers:
+
+    render      MoviePy resize/concatenate vs. calling ffmpeg directly
+    thumbnail   gradient backgrounds of every create_thumbnail variant
+    text        generate_search_terms and the script marker cleanup
+    download    clip download write loops with different chunk sizes
+
+For every benchmark it reports operations per second, frames (or MB)
+per second and memory allocated by Python (tracemalloc).
+
+Results can be saved and compared, like pytest-benchmark:
+
+    python benchmarks/micro_benchmarks.py --save before
+    ... change the code ...
+    python benchmarks/micro_benchmarks.py --compare before
+
+Usage:
+    python benchmarks/micro_benchmarks.py                   # everything
+    python benchmarks/micro_benchmarks.py --group thumbnail text
+    python benchmarks/micro_benchmarks.py --min-time 2      # longer, steadier runs
+"""
+
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import os
+import platform
+import re
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(HERE)
+AUTOMATION_DIR = os.path.join(REPO_DIR, "projects", "00-complete-automation")
+SCRIPTS_DIR = os.path.join(REPO_DIR, "scripts")
+sys.path.insert(0, AUTOMATION_DIR)
+sys.path.insert(0, SCRIPTS_DIR)
+
+# Saved runs (--save NAME), one JSON file each
+SAVED_FOLDER = os.path.join(HERE, ".micro")
+
+GROUPS = ("render", "thumbnail", "text", "download")
+
+THUMB_WIDTH, THUMB_HEIGHT = 1280, 720
+
+SAMPLE_TOPIC = "Mind blowing facts about deep sea creatures nobody talks about"
+
+# Registered benchmarks: (group, name, setup function)
+_benchmarks = []
+
+
+def benchmark(group, name):
+    """
+    Register a benchmark. The decorated function prepares everything and
+    returns (func, work) - func() is what gets timed, work says how much
+    one call does: {"frames": 90} or {"bytes": 64_000_000} or {}.
+    """
+    def register(setup):
+        _benchmarks.append((group, name, setup))
+        return setup
+    return register
+
+
+@contextlib.contextmanager
+def quiet():
+    """Hide the pipeline's progress prints while timing"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+# ===========================================
+# RUNNER
+# ===========================================
+def measure(func, min_time, max_rounds=1000):
+    """Seconds per call for as many rounds as fit in min_time (at least 3)"""
+    func()  # warm up (imports, caches, first file open)
+    times = []
+    started = time.perf_counter()
+    while len(times) < 3 or (time.perf_counter() - started < min_time and len(times) < max_rounds):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def allocations(func):
+    """(peak bytes, blocks still allocated) for one call, Python memory only"""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    blocks = sum(stat.count_diff for stat in after.compare_to(before, "filename"))
+    return peak, blocks
+
+
+def run_benchmark(group, name, setup, min_time):
+    func, work = setup()
+    times = measure(func, min_time)
+    peak, blocks = allocations(func)
+    mean = statistics.mean(times)
+    result = {
+        "group": group,
+        "name": name,
+        "rounds": len(times),
+        "min": min(times),
+        "max": max(times),
+        "mean": mean,
+        "stddev": statistics.stdev(times) if len(times) > 1 else 0.0,
+        "median": statistics.median(times),
+        "ops": 1 / mean if mean else None,
+        "alloc_peak_bytes": peak,
+        "alloc_blocks": blocks,
+    }
+    if work.get("frames"):
+        result["fps"] = work["frames"] / result["median"]
+    if work.get("bytes"):
+        result["mb_per_second"] = work["bytes"] / 1_000_000 / result["median"]
+    return result
+
+
+# ===========================================
+# REPORT
+# ===========================================
+def _time(seconds):
+    if seconds >= 1:
+        return f"{seconds:.2f}s"
+    if seconds >= 0.001:
+        return f"{seconds * 1000:.2f}ms"
+    return f"{seconds * 1_000_000:.1f}us"
+
+
+def _change(now, before, higher_is_better=False):
+    if not before:
+        return ""
+    change = (now / before - 1) * 100
+    better = change > 0 if higher_is_better else change < 0
+    return f" ({change:+.0f}%{' better' if better and abs(change) >= 5 else ''})"
+
+
+def print_report(results, saved=None):
+    saved = {(r["group"], r["name"]): r for r in (saved or {}).get("benchmarks", [])}
+    for group in GROUPS:
+        rows = [r for r in results if r["group"] == group]
+        if not rows:
+            continue
+        fastest = min(r["median"] for r in rows)
+        print(f"\n  {group.upper()}")
+        print(f"  {'NAME':<44}{'MEDIAN':>12}{'MEAN':>12}{'STDDEV':>11}{'OPS':>11}{'RATE':>14}{'ALLOC PEAK':>12}{'BLOCKS':>9}")
+        for r in sorted(rows, key=lambda r: r["median"]):
+            if r.get("fps"):
+                rate = f"{r['fps']:.1f} fps"
+            elif r.get("mb_per_second"):
+                rate = f"{r['mb_per_second']:.0f} MB/s"
+            else:
+                rate = "-"
+            relative = f" x{r['median'] / fastest:.1f}" if r["median"] > fastest * 1.05 else ""
+            print(f"  {r['name'] + relative:<44}{_time(r['median']):>12}{_time(r['mean']):>12}"
+                  f"{_time(r['stddev']):>11}{r['ops']:>11.1f}{rate:>14}"
+                  f"{r['alloc_peak_bytes'] / 1024:>10.0f}KB{r['alloc_blocks']:>9}")
+            before = saved.get((r["group"], r["name"]))
+            if before:
+                print(f"    vs saved: median {_time(before['median'])}{_change(r['median'], before['median'])}, "
+                      f"ops {before['ops']:.1f}{_change(r['ops'], before['ops'], higher_is_better=True)}, "
+                      f"alloc {before['alloc_peak_bytes'] / 1024:.0f}KB"
+                      f"{_change(r['alloc_peak_bytes'], before['alloc_peak_bytes'])}")
+
+
+def saved_file(name):
+    return os.path.join(SAVED_FOLDER, f"{name}.json")
+
+
+# ===========================================
+# THUMBNAIL GRADIENTS
+# ===========================================
+MASTER_SCHEMES = ("urgent", "trust", "growth", "energy")
+
+
+def _master_generator(temp_dir):
+    import master_automation
+    previous = os.getcwd()
+    os.chdir(temp_dir)
+    try:
+        with quiet():
+            return master_automation.FacelessVideoGenerator(project_name="micro")
+    finally:
+        os.chdir(previous)
+
+
+def _auto_instance(temp_dir):
+    """YouTubeAutomation without __init__ (no folders, no topic history)"""
+    import auto_video_creator
+    automation = auto_video_creator.YouTubeAutomation.__new__(auto_video_creator.YouTubeAutomation)
+    automation.output_folder = temp_dir
+    automation.trending_topic = SAMPLE_TOPIC
+    return automation
+
+
+def _register_master_thumbnails():
+    for scheme in MASTER_SCHEMES:
+        @benchmark("thumbnail", f"master create_thumbnail[{scheme}]")
+        def setup(scheme=scheme):
+            generator = _master_generator(tempfile.mkdtemp(prefix="micro_thumb_"))
+
+            def run():
+                with quiet():
+                    generator.create_thumbnail(SAMPLE_TOPIC, color_scheme=scheme)
+            return run, {"frames": 1}
+
+
+_register_master_thumbnails()
+
+
+@benchmark("thumbnail", "auto create_thumbnail")
+def bench_auto_thumbnail():
+    automation = _auto_instance(tempfile.mkdtemp(prefix="micro_thumb_"))
+
+    def run():
+        with quiet():
+            automation.create_thumbnail()
+    return run, {"frames": 1}
+
+
+def _row_colors(top, bottom, height):
+    colors = []
+    for y in range(height):
+        ratio = y / height
+        colors.append(tuple(int(top[i] * (1 - ratio) + bottom[i] * ratio) for i in range(3)))
+    return colors
+
+
+@benchmark("thumbnail", "gradient putpixel (master)")
+def bench_gradient_putpixel():
+    from PIL import Image
+    colors = _row_colors((220, 53, 69), (180, 30, 50), THUMB_HEIGHT)
+
+    def run():
+        img = Image.new("RGB", (THUMB_WIDTH, THUMB_HEIGHT))
+        for y, color in enumerate(colors):
+            for x in range(THUMB_WIDTH):
+                img.putpixel((x, y), color)
+    return run, {"frames": 1}
+
+
+@benchmark("thumbnail", "gradient draw.line (auto)")
+def bench_gradient_lines():
+    from PIL import Image, ImageDraw
+    colors = _row_colors((220, 53, 69), (180, 30, 50), THUMB_HEIGHT)
+
+    def run():
+        img = Image.new("RGB", (THUMB_WIDTH, THUMB_HEIGHT))
+        draw = ImageDraw.Draw(img)
+        for y, color in enumerate(colors):
+            draw.line([(0, y), (THUMB_WIDTH, y)], fill=color)
+    return run, {"frames": 1}
+
+
+@benchmark("thumbnail", "gradient 1px column + resize")
+def bench_gradient_resize():
+    from PIL import Image
+    colors = _row_colors((220, 53, 69), (180, 30, 50), THUMB_HEIGHT)
+
+    def run():
+        column = Image.new("RGB", (1, THUMB_HEIGHT))
+        column.putdata(colors)
+        column.resize((THUMB_WIDTH, THUMB_HEIGHT), Image.NEAREST)
+    return run, {"frames": 1}
+
+
+# ===========================================
+# TEXT
+# ===========================================
+@benchmark("text", "generate_search_terms")
+def bench_search_terms():
+    automation = _auto_instance(tempfile.gettempdir())
+    return automation.generate_search_terms, {}
+
+
+def _sample_script(facts=10, words_per_section=60):
+    sections = ["[INTRO]"] + [f"[FACT {i}]" for i in range(1, facts + 1)] + ["[OUTRO]"]
+    body = " ".join(["the deep sea is full of strange glowing animals"] * (words_per_section // 9))
+    return "\n\n".join(f"{marker}\n{body}" for marker in sections)
+
+
+@benchmark("text", "marker cleanup str.replace (current)")
+def bench_marker_replace():
+    automation = _auto_instance(tempfile.gettempdir())
+    script = _sample_script()
+    return (lambda: automation.clean_script_for_voice(script)), {}
+
+
+MARKER_PATTERN = re.compile(r"\[(?:INTRO|OUTRO|FACT \d+)\]")
+
+
+@benchmark("text", "marker cleanup precompiled regex")
+def bench_marker_regex():
+    script = _sample_script()
+    return (lambda: MARKER_PATTERN.sub("", script)), {}
+
+
+# ===========================================
+# DOWNLOAD WRITE LOOPS
+# ===========================================
+DOWNLOAD_BYTES = 64 * 1024 * 1024
+
+
+class _FakeResponse:
+    """A streamed response served from memory (only the write loop is timed)"""
+
+    status_code = 200
+
+    def __init__(self, data):
+        self.data = data
+
+    def iter_content(self, chunk_size=1):
+        view = memoryview(self.data)
+        for start in range(0, len(view), chunk_size):
+            yield bytes(view[start:start + chunk_size])
+
+
+_payload = None
+
+
+def _download_payload():
+    global _payload
+    if _payload is None:
+        _payload = os.urandom(1024 * 1024) * (DOWNLOAD_BYTES // (1024 * 1024))
+    return _payload
+
+
+def _register_download_loops():
+    @benchmark("download", "project_tools download_file (1 MB chunks)")
+    def setup_shared():
+        import project_tools
+        target = os.path.join(tempfile.mkdtemp(prefix="micro_dl_"), "clip.mp4")
+        payload = _download_payload()
+
+        def run():
+            original = project_tools.requests.get
+            project_tools.requests.get = lambda *args, **kwargs: _FakeResponse(payload)
+            try:
+                project_tools.download_file("http://stand-in/clip.mp4", target)
+            finally:
+                project_tools.requests.get = original
+        return run, {"bytes": DOWNLOAD_BYTES}
+
+    for chunk_kb in (64, 1024, 4096):
+        @benchmark("download", f"write loop {chunk_kb} KB chunks")
+        def setup(chunk_kb=chunk_kb):
+            from instrumentation import count_bytes
+            target = os.path.join(tempfile.mkdtemp(prefix="micro_dl_"), "clip.mp4")
+            payload = _download_payload()
+
+            def run():
+                with open(target, "wb") as f:
+                    for chunk in _FakeResponse(payload).iter_content(chunk_size=chunk_kb * 1024):
+                        f.write(chunk)
+                        count_bytes("downloaded", len(chunk))
+            return run, {"bytes": DOWNLOAD_BYTES}
+
+
+_register_download_loops()
+
+
+# ===========================================
+# RENDER
+# ===========================================
+RENDER_SECONDS = 3
+RENDER_FPS = 30
+
+
+def _render_sources(temp_dir):
+    """Three short 720p test clips and a matching tone, made once"""
+    import ffmpeg_tools
+    clips = []
+    for i, source in enumerate(("testsrc2", "smptehdbars", "mandelbrot")):
+        path = os.path.join(temp_dir, f"source_{i}.mp4")
+        if not os.path.exists(path):
+            ffmpeg_tools.run_ffmpeg([
+                "-f", "lavfi", "-i", f"{source}=s=1280x720:r={RENDER_FPS}:d={RENDER_SECONDS}",
+                "-c:v", "libx264", "-preset", "ultrafast", "-pix_fmt", "yuv420p", path
+            ])
+        clips.append(path)
+    audio = os.path.join(temp_dir, "tone.m4a")
+    if not os.path.exists(audio):
+        ffmpeg_tools.run_ffmpeg([
+            "-f", "lavfi", "-i", f"sine=frequency=220:duration={RENDER_SECONDS * len(clips)}",
+            "-c:a", "aac", audio
+        ])
+    return clips, audio
+
+
+_render_dir = None
+
+
+def _render_folder():
+    global _render_dir
+    if _render_dir is None:
+        _render_dir = tempfile.mkdtemp(prefix="micro_render_")
+    return _render_dir
+
+
+@benchmark("render", "moviepy resize (master _render_segment)")
+def bench_moviepy_resize():
+    temp_dir = _render_folder()
+    clips, _ = _render_sources(temp_dir)
+    generator = _master_generator(temp_dir)
+    generator.config["encode_profile"] = "draft"
+    output = os.path.join(temp_dir, "moviepy_segment.mp4")
+    return (lambda: generator._render_segment(clips[0], RENDER_SECONDS, output)), \
+        {"frames": RENDER_SECONDS * RENDER_FPS}
+
+
+@benchmark("render", "ffmpeg scale filter")
+def bench_ffmpeg_scale():
+    import encode_profiles
+    import ffmpeg_tools
+    temp_dir = _render_folder()
+    clips, _ = _render_sources(temp_dir)
+    output = os.path.join(temp_dir, "ffmpeg_segment.mp4")
+
+    def run():
+        ffmpeg_tools.run_ffmpeg(
+            ["-i", clips[0], "-vf", "scale=1920:1080", "-r", str(RENDER_FPS), "-an"]
+            + encode_profiles.ffmpeg_args("draft", RENDER_FPS) + [output]
+        )
+    return run, {"frames": RENDER_SECONDS * RENDER_FPS}
+
+
+@benchmark("render", "moviepy concatenate_videoclips")
+def bench_moviepy_concatenate():
+    import encode_profiles
+    from moviepy.editor import AudioFileClip, VideoFileClip, concatenate_videoclips
+    temp_dir = _render_folder()
+    clips, audio = _render_sources(temp_dir)
+    output = os.path.join(temp_dir, "moviepy_concat.mp4")
+
+    def run():
+        sources = [VideoFileClip(path).resize((1920, 1080)) for path in clips]
+        voice = AudioFileClip(audio)
+        final = concatenate_videoclips(sources).set_audio(voice)
+        final.write_videofile(output, fps=RENDER_FPS, logger=None,
+                              **encode_profiles.moviepy_args("draft", RENDER_FPS))
+        for clip in sources + [voice, final]:
+            clip.close()
+    return run, {"frames": RENDER_SECONDS * RENDER_FPS * 3}
+
+
+@benchmark("render", "ffmpeg segments + concat copy")
+def bench_ffmpeg_concat():
+    import encode_profiles
+    import ffmpeg_tools
+    temp_dir = _render_folder()
+    clips, audio = _render_sources(temp_dir)
+    output = os.path.join(temp_dir, "ffmpeg_concat.mp4")
+
+    def run():
+        segments = []
+        for i, path in enumerate(clips):
+            segment = os.path.join(temp_dir, f"segment_{i}.mp4")
+            ffmpeg_tools.run_ffmpeg(
+                ["-i", path, "-vf", "scale=1920:1080", "-r", str(RENDER_FPS), "-an"]
+                + encode_profiles.ffmpeg_args("draft", RENDER_FPS) + [segment]
+            )
+            segments.append(segment)
+        ffmpeg_tools.concat_segments(segments, audio, output)
+    return run, {"frames": RENDER_SECONDS * RENDER_FPS * 3}
+
+
+# ===========================================
+# MAIN
+# ===========================================
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for render, thumbnail, text and download code")
+    parser.add_argument("--group", nargs="+", choices=GROUPS, default=list(GROUPS),
+                        help="Groups to run (default: all)")
+    parser.add_argument("--min-time", type=float, default=1.0,
+                        help="Seconds to spend on each benchmark (at least 3 rounds)")
+    parser.add_argument("--save", metavar="NAME", help="Save the results under this name")
+    parser.add_argument("--compare", metavar="NAME", help="Compare with saved results")
+    args = parser.parse_args()
+
+    saved = None
+    if args.compare:
+        if not os.path.exists(saved_file(args.compare)):
+            print(f"No saved results called '{args.compare}' in {SAVED_FOLDER}")
+            return 1
+        with open(saved_file(args.compare), "r", encoding="utf-8") as f:
+            saved = json.load(f)
+
+    results = []
+    for group, name, setup in _benchmarks:
+        if group not in args.group:
+            continue
+        print(f"  {group}: {name}...", flush=True)
+        try:
+            results.append(run_benchmark(group, name, setup, args.min_time))
+        except Exception as e:
+            # Missing ffmpeg/MoviePy/Pillow only skips the benchmarks that need it
+            print(f"    skipped: {e}")
+
+    print_report(results, saved)
+
+    if args.save:
+        os.makedirs(SAVED_FOLDER, exist_ok=True)
+        with open(saved_file(args.save), "w", encoding="utf-8") as f:
+            json.dump({
+                "created": datetime.datetime.now().isoformat(timespec="seconds"),
+                "machine": {"platform": platform.platform(), "python": platform.python_version(),
+                            "cpus": os.cpu_count()},
+                "benchmarks": results,
+            }, f, indent=2)
+        print(f"\n  Saved as '{args.save}': {saved_file(args.save)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,317 @@
+"""
+PIPELINE BENCHMARKS
+===================
+Runs the real pipelines (auto_video_creator.py and master_automation.py)
+against local stand-ins for Ollama, Edge TTS, Pexels and YouTube, so the
+numbers only change when the code (or the machine) changes.
+
+Workloads:
+    single  - 1 video, 1 minute
+    daily   - 5 videos, 3 minutes each
+    batch   - 20 videos, 1 to 10 minutes
+    long    - 1 video, 10 minutes
+
+For every stage it reports the median and 95th percentile time and the
+encode speed, and for every workload the throughput. The results are
+compared with benchmarks/baseline.json; a stage that got slower than the
+tolerance counts as a regression (exit code 1).
+
+Usage:
+    python benchmarks/run_benchmarks.py                        # all workloads, both pipelines
+    python benchmarks/run_benchmarks.py --workload single daily
+    python benchmarks/run_benchmarks.py --pipeline auto
+    python benchmarks/run_benchmarks.py --save-baseline        # record this machine's baseline
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+import stand_ins
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(HERE)
+SCRIPTS_DIR = os.path.join(REPO_DIR, "scripts")
+
+BASELINE_FILE = os.path.join(HERE, "baseline.json")
+RESULTS_FOLDER = os.path.join(HERE, "results")
+
+# Synthetic clips and TTS tones are kept here between runs
+WORK_FOLDER = os.path.join(HERE, ".work")
+
+# Video lengths in minutes for each workload
+WORKLOADS = {
+    "single": [1],
+    "daily": [3] * 5,
+    "batch": [1 + i % 10 for i in range(20)],
+    "long": [10],
+}
+
+PIPELINES = ("auto", "master")
+
+# Stages faster than this are not compared (timer noise)
+MIN_COMPARED_SECONDS = 0.5
+
+
+class Services:
+    """All stand-ins, started once for the whole benchmark"""
+
+    def __init__(self):
+        print("Starting offline stand-ins...")
+        stand_ins.install_edge_tts_stub(os.path.join(WORK_FOLDER, "tts"))
+        self.ollama = stand_ins.FakeOllama()
+        self.pexels = stand_ins.FakePexels(os.path.join(WORK_FOLDER, "clips"))
+        self.upload_server, self.upload_url = stand_ins.start_upload_server()
+        self.auth = stand_ins.StubYouTubeAuth()
+        self.trend_fixture = stand_ins.write_trend_fixture(os.path.join(WORK_FOLDER, "trends.json"))
+        print(f"  Ollama: {self.ollama.url}")
+        print(f"  Pexels: {self.pexels.search_url}")
+        print(f"  Upload: {self.upload_url}")
+
+        # master_automation.py reads its settings from the environment
+        os.environ["OLLAMA_URL"] = self.ollama.url
+        os.environ["PEXELS_API_KEY"] = "benchmark"
+        os.environ["PEXELS_VIDEO_SEARCH_URL"] = self.pexels.search_url
+        os.environ.pop("GEMINI_API_KEY", None)
+
+    def shutdown(self):
+        for server in (self.ollama.server, self.pexels.server, self.upload_server):
+            server.shutdown()
+
+
+class StageCollector:
+    """Receives every stage record from instrumentation"""
+
+    def __init__(self):
+        self.records = []
+        self.label = None
+
+    def __call__(self, record):
+        if self.label:
+            self.records.append(dict(record, workload=self.label))
+
+
+def load_auto_pipeline(services):
+    """Import auto_video_creator.py and point it at the stand-ins"""
+    import auto_video_creator as avc
+    import project_tools
+
+    avc.OLLAMA_URL = services.ollama.url
+    avc.PEXELS_API_KEY = "benchmark"
+    project_tools.PEXELS_VIDEO_SEARCH_URL = services.pexels.search_url
+    avc.YOUTUBE_UPLOAD_URL = services.upload_url
+    avc.TREND_FIXTURE_FILE = services.trend_fixture
+    avc.YOUTUBE_AVAILABLE = True
+    # The stand-in upload server has no quota; 20 videos must not wait a day
+    avc.YOUTUBE_DAILY_QUOTA = 10_000_000
+    # Measure real renders, not reused ones (same stand-in script, same clips)
+    avc.RENDER_CACHE = False
+    avc.YouTubeAutomation.get_youtube_auth = lambda self: services.auth
+    return avc
+
+
+def load_master_pipeline():
+    sys.path.insert(0, SCRIPTS_DIR)
+    import master_automation
+    return master_automation
+
+
+def run_workload(name, pipeline, services, collector, pipelines):
+    """Make every video of one workload in a fresh folder; returns the workload summary"""
+    lengths = WORKLOADS[name]
+    work_dir = tempfile.mkdtemp(prefix=f"bench_{name}_{pipeline}_")
+    previous_dir = os.getcwd()
+    os.chdir(work_dir)
+    random.seed(1234)
+    collector.label = f"{name}/{pipeline}"
+
+    print(f"\n{'=' * 60}\nWORKLOAD {name} ({len(lengths)} videos) - {pipeline}\n{'=' * 60}")
+    started = time.perf_counter()
+    succeeded = 0
+    try:
+        for number, minutes in enumerate(lengths, start=1):
+            print(f"\n[{number}/{len(lengths)}] {minutes} minute video")
+            services.ollama.set_minutes(minutes)
+            if pipeline == "auto":
+                ok = pipelines["auto"].YouTubeAutomation().run()
+            else:
+                generator = pipelines["master"].FacelessVideoGenerator(project_name=f"bench_{number:02d}")
+                generator.config['render_cache'] = False
+                ok = generator.run(stand_ins.TREND_TITLES[number % len(stand_ins.TREND_TITLES)],
+                                   length_minutes=minutes)
+            succeeded += bool(ok)
+    finally:
+        wall = time.perf_counter() - started
+        collector.label = None
+        os.chdir(previous_dir)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    narration_minutes = sum(lengths)
+    return {
+        "videos": len(lengths),
+        "succeeded": succeeded,
+        "wall_seconds": round(wall, 2),
+        "videos_per_hour": round(len(lengths) / wall * 3600, 2) if wall else None,
+        # Minutes of finished video per minute of waiting
+        "video_minutes_per_minute": round(narration_minutes / (wall / 60), 3) if wall else None,
+    }
+
+
+def percentile(values, share):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(share * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize_stages(records):
+    """{"workload/pipeline": {stage: {count, p50, p95, mean, fps}}}"""
+    grouped = {}
+    for record in records:
+        if record["stage"] == "total":
+            continue
+        grouped.setdefault(record["workload"], {}).setdefault(record["stage"], []).append(record)
+
+    summary = {}
+    for label, stages in grouped.items():
+        summary[label] = {}
+        for stage, items in stages.items():
+            seconds = [r["wall_seconds"] for r in items]
+            fps = [r["encode_fps"] for r in items if r.get("encode_fps")]
+            summary[label][stage] = {
+                "count": len(items),
+                "failed": sum(not r["ok"] for r in items),
+                "p50_seconds": round(statistics.median(seconds), 3),
+                "p95_seconds": round(percentile(seconds, 0.95), 3),
+                "mean_seconds": round(statistics.mean(seconds), 3),
+                "mean_fps": round(statistics.mean(fps), 1) if fps else None,
+            }
+    return summary
+
+
+def compare(results, baseline, tolerance):
+    """List of regressions (text) compared with the baseline"""
+    regressions = []
+    for label, stages in results["stages"].items():
+        for stage, now in stages.items():
+            before = baseline.get("stages", {}).get(label, {}).get(stage)
+            if not before or before["p50_seconds"] < MIN_COMPARED_SECONDS:
+                continue
+            if now["p50_seconds"] > before["p50_seconds"] * (1 + tolerance):
+                regressions.append(f"{label} {stage}: p50 {before['p50_seconds']:.2f}s -> {now['p50_seconds']:.2f}s")
+            if before.get("mean_fps") and now.get("mean_fps") and now["mean_fps"] < before["mean_fps"] * (1 - tolerance):
+                regressions.append(f"{label} {stage}: {before['mean_fps']:.1f} -> {now['mean_fps']:.1f} fps")
+    for label, now in results["workloads"].items():
+        before = baseline.get("workloads", {}).get(label)
+        if before and before.get("videos_per_hour") and now["videos_per_hour"] < before["videos_per_hour"] * (1 - tolerance):
+            regressions.append(f"{label} throughput: {before['videos_per_hour']:.1f} -> {now['videos_per_hour']:.1f} videos/hour")
+        if before and now["succeeded"] < before.get("succeeded", 0):
+            regressions.append(f"{label}: {before['succeeded']} -> {now['succeeded']} videos succeeded")
+    return regressions
+
+
+def print_report(results, baseline):
+    print(f"\n{'=' * 78}\nBENCHMARK RESULTS\n{'=' * 78}")
+    for label, workload in results["workloads"].items():
+        print(f"\n  {label}: {workload['succeeded']}/{workload['videos']} videos in {workload['wall_seconds']:.1f}s "
+              f"({workload['videos_per_hour']:.1f} videos/hour, "
+              f"{workload['video_minutes_per_minute']:.2f} video minutes per minute)")
+        print(f"  {'STAGE':<24}{'P50':>9}{'P95':>9}{'FPS':>8}{'BASELINE P50':>15}{'CHANGE':>9}")
+        for stage, now in results["stages"].get(label, {}).items():
+            before = baseline.get("stages", {}).get(label, {}).get(stage) if baseline else None
+            fps = f"{now['mean_fps']:.1f}" if now["mean_fps"] else "-"
+            if before and before["p50_seconds"]:
+                change = f"{(now['p50_seconds'] / before['p50_seconds'] - 1) * 100:+.0f}%"
+                base = f"{before['p50_seconds']:.2f}s"
+            else:
+                change, base = "-", "-"
+            failed = f" ({now['failed']} failed)" if now["failed"] else ""
+            print(f"  {stage + failed:<24}{now['p50_seconds']:>8.2f}s{now['p95_seconds']:>8.2f}s{fps:>8}{base:>15}{change:>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end pipeline benchmarks (offline)")
+    parser.add_argument("--workload", nargs="+", choices=list(WORKLOADS), default=list(WORKLOADS),
+                        help="Workloads to run (default: all)")
+    parser.add_argument("--pipeline", nargs="+", choices=PIPELINES, default=list(PIPELINES),
+                        help="Pipelines to run (default: both)")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="Baseline file to compare with")
+    parser.add_argument("--save-baseline", action="store_true", help="Store these results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed slowdown before it counts as a regression (default: 0.25 = 25%%)")
+    args = parser.parse_args()
+
+    os.makedirs(WORK_FOLDER, exist_ok=True)
+    # Reused backgrounds and the artifact index go to the work folder, not the user's real ones
+    os.environ.setdefault("ASSET_CACHE_DIR", os.path.join(WORK_FOLDER, "asset_cache"))
+    os.environ.setdefault("ARTIFACT_INDEX_FILE", os.path.join(WORK_FOLDER, "artifacts.db"))
+
+    services = Services()
+    import instrumentation
+    collector = StageCollector()
+    instrumentation.add_listener(collector)
+
+    pipelines = {}
+    if "auto" in args.pipeline:
+        pipelines["auto"] = load_auto_pipeline(services)
+    if "master" in args.pipeline:
+        pipelines["master"] = load_master_pipeline()
+
+    workloads = {}
+    try:
+        for name in args.workload:
+            for pipeline in args.pipeline:
+                workloads[f"{name}/{pipeline}"] = run_workload(name, pipeline, services, collector, pipelines)
+    finally:
+        services.shutdown()
+
+    results = {
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "machine": {"platform": platform.platform(), "python": platform.python_version(),
+                    "cpus": os.cpu_count()},
+        "workloads": workloads,
+        "stages": summarize_stages(collector.records),
+    }
+
+    os.makedirs(RESULTS_FOLDER, exist_ok=True)
+    results_file = os.path.join(RESULTS_FOLDER, f"{datetime.datetime.now():%Y%m%d_%H%M%S}.json")
+    with open(results_file, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+
+    baseline = None
+    if os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    print_report(results, baseline)
+    print(f"\n  Results: {results_file}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"  Saved as baseline: {args.baseline}")
+        return 0
+
+    if baseline is None:
+        print("  No baseline yet - run with --save-baseline to record one")
+        return 0
+
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print(f"\n  REGRESSIONS (more than {args.tolerance:.0%} worse than the baseline):")
+        for line in regressions:
+            print(f"    - {line}")
+        return 1
+    print(f"\n  No regressions (tolerance {args.tolerance:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,345 @@
+"""
+OFFLINE STAND-INS FOR BENCHMARKS
+================================
+Local replacements for every outside service the pipelines talk to,
+so benchmark runs are repeatable and need no internet or API keys:
+
+- FakeOllama      answers /api/generate with a script of a fixed length
+- FakePexels      serves a small catalogue of synthetic test clips
+- edge_tts stub   deterministic "voice" (a tone) with word timings
+- StubYouTubeAuth talks to fake_upload_server.py instead of YouTube
+
+Everything is deterministic: the same workload gives the same script,
+the same audio length and the same clips every time.
+"""
+
+import asyncio
+import json
+import os
+import re
+import sys
+import threading
+import types
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+AUTOMATION_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                              "projects", "00-complete-automation")
+sys.path.insert(0, AUTOMATION_DIR)
+
+import ffmpeg_tools  # noqa: E402
+
+WORDS_PER_MINUTE = 150
+
+# Spoken word length of the TTS stub (0.4s = 150 words per minute)
+SECONDS_PER_WORD = 60 / WORDS_PER_MINUTE
+TICKS_PER_SECOND = 10_000_000
+
+FILLER_WORDS = (
+    "did you know that the ocean hides mountains taller than everest and "
+    "scientists still find new animals there every single year which is amazing"
+).split()
+
+# Synthetic clips: (ffmpeg test source, seconds)
+CLIP_SOURCES = [
+    ("testsrc2", 12),
+    ("smptehdbars", 8),
+    ("mandelbrot", 15),
+    ("rgbtestsrc", 6),
+    ("testsrc", 20),
+    ("cellauto", 10),
+]
+
+# Every clip is offered in two sizes so rendition selection is exercised
+RENDITIONS = [(1280, 720), (1920, 1080)]
+
+
+def _serve(handler_class, port=0):
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler_class)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def _json_reply(handler, status, payload):
+    body = json.dumps(payload).encode()
+    handler.send_response(status)
+    handler.send_header("Content-Type", "application/json")
+    handler.send_header("Content-Length", str(len(body)))
+    handler.end_headers()
+    handler.wfile.write(body)
+
+
+# ===========================================
+# OLLAMA
+# ===========================================
+def make_script(words, sections=5):
+    """Deterministic script with [INTRO], [FACT n] and [OUTRO] markers"""
+    words = max(words, sections + 2)
+    per_section = words // (sections + 2)
+    parts = []
+    markers = ["[INTRO]"] + [f"[FACT {i}]" for i in range(1, sections + 1)] + ["[OUTRO]"]
+    position = 0
+    for marker in markers:
+        chunk = [FILLER_WORDS[(position + i) % len(FILLER_WORDS)] for i in range(per_section)]
+        position += per_section
+        parts.append(f"{marker}\n{' '.join(chunk).capitalize()}.")
+    return "\n\n".join(parts)
+
+
+class FakeOllama:
+    """Local /api/generate and /api/tags with scripts of a chosen length"""
+
+    def __init__(self, latency=0.0):
+        self.words = WORDS_PER_MINUTE
+        self.latency = latency
+        self.requests = 0
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.startswith("/api/tags"):
+                    return _json_reply(self, 200, {"models": [{"name": "benchmark"}]})
+                _json_reply(self, 404, {"error": "not found"})
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                request = json.loads(self.rfile.read(length) or b"{}")
+                fake.requests += 1
+                if fake.latency:
+                    threading.Event().wait(fake.latency)
+                # master_automation asks for "Approximately N words"
+                match = re.search(r"Approximately (\d+) words", request.get("prompt", ""))
+                words = int(match.group(1)) if match else fake.words
+                _json_reply(self, 200, {"model": request.get("model"), "response": make_script(words), "done": True})
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server, self.url = _serve(Handler)
+
+    def set_minutes(self, minutes):
+        """Length of the next scripts (for prompts that do not say)"""
+        self.words = int(minutes * WORDS_PER_MINUTE)
+
+
+# ===========================================
+# PEXELS
+# ===========================================
+def build_clips(folder, fps=30):
+    """Render the synthetic clip catalogue once (kept between benchmark runs)"""
+    os.makedirs(folder, exist_ok=True)
+    catalogue = []
+    for number, (source, seconds) in enumerate(CLIP_SOURCES, start=1):
+        files = []
+        for width, height in RENDITIONS:
+            name = f"{source}_{width}x{height}.mp4"
+            path = os.path.join(folder, name)
+            if not os.path.exists(path):
+                ffmpeg_tools.run_ffmpeg([
+                    "-f", "lavfi", "-i", f"{source}=s={width}x{height}:r={fps}:d={seconds}",
+                    "-c:v", "libx264", "-preset", "ultrafast", "-pix_fmt", "yuv420p", path
+                ])
+            files.append({"name": name, "width": width, "height": height, "size": os.path.getsize(path)})
+        catalogue.append({"id": 9000 + number, "duration": seconds, "files": files})
+    return catalogue
+
+
+class FakePexels:
+    """Local /videos/search plus the clip files themselves"""
+
+    def __init__(self, clips_folder):
+        self.catalogue = build_clips(clips_folder)
+        self.clips_folder = clips_folder
+        self.searches = 0
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                if parsed.path == "/videos/search":
+                    fake.searches += 1
+                    query = parse_qs(parsed.query).get("query", [""])[0]
+                    per_page = int(parse_qs(parsed.query).get("per_page", ["10"])[0])
+                    return _json_reply(self, 200, {"videos": fake.search(query, self.headers.get("Host"))[:per_page]})
+                if parsed.path.startswith("/clips/"):
+                    return self.send_clip(os.path.basename(parsed.path))
+                _json_reply(self, 404, {"error": "not found"})
+
+            def send_clip(self, name):
+                path = os.path.join(fake.clips_folder, name)
+                if not os.path.exists(path):
+                    return _json_reply(self, 404, {"error": "no such clip"})
+                self.send_response(200)
+                self.send_header("Content-Type", "video/mp4")
+                self.send_header("Content-Length", str(os.path.getsize(path)))
+                self.end_headers()
+                with open(path, "rb") as f:
+                    while True:
+                        chunk = f.read(1024 * 1024)
+                        if not chunk:
+                            break
+                        self.wfile.write(chunk)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server, base_url = _serve(Handler)
+        self.search_url = f"{base_url}/videos/search"
+
+    def search(self, query, host):
+        """Whole catalogue, rotated by the query so searches differ (deterministically)"""
+        shift = sum(query.encode()) % len(self.catalogue)
+        videos = self.catalogue[shift:] + self.catalogue[:shift]
+        return [{
+            "id": video["id"],
+            "duration": video["duration"],
+            "video_files": [{
+                "link": f"http://{host}/clips/{f['name']}",
+                "width": f["width"],
+                "height": f["height"],
+                "size": f["size"],
+                "quality": "hd",
+                "file_type": "video/mp4",
+            } for f in video["files"]],
+        } for video in videos]
+
+
+# ===========================================
+# EDGE TTS
+# ===========================================
+def install_edge_tts_stub(cache_folder):
+    """Replace the edge_tts module with a deterministic offline voice"""
+    os.makedirs(cache_folder, exist_ok=True)
+    audio_lock = threading.Lock()
+
+    def tone(seconds):
+        path = os.path.join(cache_folder, f"tone_{seconds:.1f}.mp3")
+        with audio_lock:
+            if not os.path.exists(path):
+                ffmpeg_tools.run_ffmpeg([
+                    "-f", "lavfi", "-i", f"sine=frequency=220:sample_rate=24000:duration={seconds:.1f}",
+                    "-c:a", "libmp3lame", "-b:a", "48k", path
+                ])
+        return path
+
+    class Communicate:
+        def __init__(self, text, voice=None, boundary=None, **kwargs):
+            self.words = text.split()
+
+        async def stream(self):
+            seconds = max(1.0, len(self.words) * SECONDS_PER_WORD)
+            with open(tone(seconds), "rb") as f:
+                audio = f.read()
+            step = max(1, len(audio) // max(1, len(self.words)))
+            for i, word in enumerate(self.words):
+                yield {"type": "audio", "data": audio[i * step:(i + 1) * step]}
+                yield {
+                    "type": "WordBoundary",
+                    "offset": int(i * SECONDS_PER_WORD * TICKS_PER_SECOND),
+                    "duration": int(SECONDS_PER_WORD * 0.9 * TICKS_PER_SECOND),
+                    "text": word,
+                }
+            rest = audio[len(self.words) * step:]
+            if rest:
+                yield {"type": "audio", "data": rest}
+            await asyncio.sleep(0)
+
+        async def save(self, path):
+            with open(path, "wb") as f:
+                async for chunk in self.stream():
+                    if chunk["type"] == "audio":
+                        f.write(chunk["data"])
+
+    module = types.ModuleType("edge_tts")
+    module.Communicate = Communicate
+    module.__benchmark_stub__ = True
+    sys.modules["edge_tts"] = module
+    return module
+
+
+# ===========================================
+# YOUTUBE
+# ===========================================
+class _StubRequest:
+    def __init__(self, counter, name):
+        self.counter, self.name = counter, name
+
+    def execute(self):
+        self.counter[self.name] += 1
+        return {}
+
+
+class _StubService:
+    """Just enough of the YouTube client for thumbnails and captions"""
+
+    def __init__(self, counter):
+        self.counter = counter
+
+    def thumbnails(self):
+        return types.SimpleNamespace(set=lambda **kwargs: _StubRequest(self.counter, "thumbnails"))
+
+    def captions(self):
+        return types.SimpleNamespace(insert=lambda **kwargs: _StubRequest(self.counter, "captions"))
+
+
+class StubYouTubeAuth:
+    """Stands in for youtube_auth.YouTubeAuth; uploads go to the fake server"""
+
+    def __init__(self):
+        import requests
+        self._requests = requests
+        self._local = threading.local()
+        self.calls = {"thumbnails": 0, "captions": 0}
+
+    def credentials(self, interactive=True):
+        return object()
+
+    def session(self):
+        if not hasattr(self._local, "session"):
+            self._local.session = self._requests.Session()
+        return self._local.session
+
+    def service(self):
+        return _StubService(self.calls)
+
+
+def start_upload_server():
+    """fake_upload_server.py from the automation folder; returns (server, upload url)"""
+    import fake_upload_server
+    return fake_upload_server.start_server(0)
+
+
+TREND_TITLES = [
+    "Amazing facts about deep sea creatures",
+    "Mind blowing volcano eruptions explained",
+    "Did you know octopuses have three hearts",
+    "Cool facts about the human brain",
+    "Interesting things about ancient Egypt",
+    "Amazing animal migrations around the world",
+    "Facts about black holes nobody tells you",
+    "Mind blowing inventions from the 1800s",
+    "Did you know honey never spoils",
+    "Cool science behind lightning storms",
+    "Interesting facts about the Great Wall",
+    "Amazing records set by tiny insects",
+    "Facts about the coldest places on Earth",
+    "Mind blowing size of the Pacific Ocean",
+    "Did you know bananas are radioactive",
+    "Cool tricks desert plants use to survive",
+    "Interesting origins of everyday words",
+    "Amazing engineering of medieval castles",
+    "Facts about sleep that sound fake",
+    "Mind blowing speed of a peregrine falcon",
+    "Did you know sharks are older than trees",
+    "Cool secrets of coral reef colors",
+    "Interesting history of chocolate",
+    "Amazing things astronauts see from orbit",
+    "Facts about the loudest sounds ever recorded",
+]
+
+
+def write_trend_fixture(path):
+    """Trend fixture with enough different niche topics for the biggest workload"""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"trending": {"US": TREND_TITLES}, "related": {}, "topics": []}, f, indent=2)
+    return path
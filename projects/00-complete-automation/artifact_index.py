@@ -0,0 +1,407 @@
+"""
+ARTIFACT INDEX - WHAT DID EVERY RUN MAKE?
+=========================================
+Every run writes a manifest (runs/<run_id>/manifest.json) listing what
+it made: script, voiceover, captions, clips, final video, thumbnail -
+each with its size and SHA-256 hash - plus the stage timings and the
+YouTube video id once it is uploaded.
+
+Small files that the next run would overwrite (script.txt,
+voiceover.mp3, thumbnail.jpg, ...) are copied into the run folder, so
+the manifest always points at the real file of THAT run.
+
+All manifests are also added to one SQLite database shared by every
+channel and project, so questions are answered instantly instead of by
+searching folders:
+
+    python artifact_index.py clip pexels_123456        # videos that used a clip
+    python artifact_index.py slowest --days 7          # slowest renders this week
+    python artifact_index.py runs                      # latest runs
+    python artifact_index.py show <run_id>             # everything about one run
+    python artifact_index.py rebuild output/runs       # re-read manifests
+
+Uses only the Python standard library.
+"""
+
+import argparse
+import contextlib
+import datetime
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import threading
+
+# Shared between all channels and projects unless a file is passed in
+DEFAULT_INDEX_FILE = os.environ.get(
+    "ARTIFACT_INDEX_FILE",
+    os.path.join(os.path.expanduser("~"), ".faceless_video_artifacts.db")
+)
+
+MANIFEST_NAME = "manifest.json"
+
+HASH_CHUNK_BYTES = 1024 * 1024
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id        TEXT PRIMARY KEY,
+    pipeline      TEXT,
+    channel       TEXT,
+    topic         TEXT,
+    started       TEXT,
+    ok            INTEGER,
+    wall_seconds  REAL,
+    video         TEXT,
+    manifest      TEXT
+);
+CREATE TABLE IF NOT EXISTS artifacts (
+    run_id    TEXT,
+    stage     TEXT,
+    kind      TEXT,
+    path      TEXT,
+    name      TEXT,
+    source    TEXT,
+    size      INTEGER,
+    mtime_ns  INTEGER,
+    sha256    TEXT,
+    kept      INTEGER
+);
+CREATE TABLE IF NOT EXISTS stages (
+    run_id        TEXT,
+    stage         TEXT,
+    ok            INTEGER,
+    wall_seconds  REAL,
+    cpu_seconds   REAL,
+    encode_fps    REAL
+);
+CREATE TABLE IF NOT EXISTS uploads (
+    run_id      TEXT PRIMARY KEY,
+    youtube_id  TEXT,
+    uploaded    TEXT,
+    job_id      TEXT
+);
+CREATE TABLE IF NOT EXISTS deleted_files (
+    path      TEXT,
+    mtime_ns  INTEGER,
+    size      INTEGER,
+    deleted   TEXT,
+    reason    TEXT,
+    PRIMARY KEY (path, mtime_ns)
+);
+CREATE INDEX IF NOT EXISTS artifacts_run ON artifacts (run_id);
+CREATE INDEX IF NOT EXISTS artifacts_hash ON artifacts (sha256);
+CREATE INDEX IF NOT EXISTS artifacts_name ON artifacts (name);
+CREATE INDEX IF NOT EXISTS artifacts_source ON artifacts (source);
+CREATE INDEX IF NOT EXISTS artifacts_path ON artifacts (path, size, mtime_ns);
+CREATE INDEX IF NOT EXISTS stages_slowest ON stages (stage, wall_seconds);
+CREATE INDEX IF NOT EXISTS stages_run ON stages (run_id);
+CREATE INDEX IF NOT EXISTS runs_started ON runs (started);
+"""
+
+
+def file_hash(path):
+    """SHA-256 of a file, read in 1 MB pieces"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_BYTES), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ArtifactIndex:
+    """The shared SQLite database of runs and their files"""
+
+    def __init__(self, db_file=None):
+        self.db_file = db_file or DEFAULT_INDEX_FILE
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_file)), exist_ok=True)
+        self._lock = threading.Lock()
+        with self._connect() as db:
+            db.executescript(SCHEMA)
+
+    @contextlib.contextmanager
+    def _connect(self):
+        # A new connection per call: safe from any thread or process
+        db = sqlite3.connect(self.db_file, timeout=30)
+        db.row_factory = sqlite3.Row
+        try:
+            db.execute("PRAGMA journal_mode=WAL")
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    # ----- adding -----
+
+    def add_manifest(self, manifest):
+        """Add (or replace) one run from its manifest"""
+        run_id = manifest["run_id"]
+        video = next((a["path"] for a in manifest["artifacts"] if a["kind"] == "video"), None)
+        with self._lock, self._connect() as db:
+            db.execute("DELETE FROM artifacts WHERE run_id = ?", (run_id,))
+            db.execute("DELETE FROM stages WHERE run_id = ?", (run_id,))
+            db.execute(
+                "INSERT OR REPLACE INTO runs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (run_id, manifest["pipeline"], manifest["channel"], manifest["topic"],
+                 manifest["started"], int(bool(manifest["ok"])), manifest.get("wall_seconds"),
+                 video, manifest.get("manifest"))
+            )
+            db.executemany(
+                "INSERT INTO artifacts VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(run_id, a["stage"], a["kind"], a["path"], a["name"], a.get("source"),
+                  a["size"], a.get("mtime_ns"), a["sha256"], int(a.get("kept", False)))
+                 for a in manifest["artifacts"]]
+            )
+            db.executemany(
+                "INSERT INTO stages VALUES (?, ?, ?, ?, ?, ?)",
+                [(run_id, s["stage"], int(bool(s["ok"])), s["wall_seconds"], s.get("cpu_seconds"),
+                  s.get("encode_fps")) for s in manifest["stages"]]
+            )
+            youtube = manifest.get("youtube")
+            if youtube and youtube.get("video_id"):
+                db.execute(
+                    "INSERT OR REPLACE INTO uploads VALUES (?, ?, ?, ?)",
+                    (run_id, youtube["video_id"], youtube.get("uploaded"), youtube.get("job_id"))
+                )
+
+    def record_upload(self, run_id, youtube_id, job_id=None):
+        """Remember the YouTube id of a run (also written to its manifest)"""
+        uploaded = datetime.datetime.now().isoformat(timespec="seconds")
+        with self._lock, self._connect() as db:
+            db.execute("INSERT OR REPLACE INTO uploads VALUES (?, ?, ?, ?)",
+                       (run_id, youtube_id, uploaded, job_id))
+            row = db.execute("SELECT manifest FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+
+        # Uploads in the background finish after the manifest was written
+        if row and row["manifest"] and os.path.exists(row["manifest"]):
+            with open(row["manifest"], "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+            manifest["youtube"] = {"video_id": youtube_id, "uploaded": uploaded, "job_id": job_id}
+            _write_json(row["manifest"], manifest)
+
+    def known_hash(self, path, size, mtime_ns):
+        """Hash of an unchanged file indexed before (so big clips are hashed once)"""
+        with self._connect() as db:
+            row = db.execute(
+                "SELECT sha256 FROM artifacts WHERE path = ? AND size = ? AND mtime_ns = ? LIMIT 1",
+                (path, size, mtime_ns)
+            ).fetchone()
+        return row["sha256"] if row else None
+
+    def mark_deleted(self, path, mtime_ns, size, reason):
+        """Remember that this version of a file is gone (see retention.py)"""
+        deleted = datetime.datetime.now().isoformat(timespec="seconds")
+        with self._lock, self._connect() as db:
+            db.execute("INSERT OR REPLACE INTO deleted_files VALUES (?, ?, ?, ?, ?)",
+                       (path, mtime_ns, size, deleted, reason))
+
+    def rebuild(self, runs_folder):
+        """Re-read every manifest in a runs folder; returns how many were added"""
+        added = 0
+        for run_id in sorted(os.listdir(runs_folder)):
+            path = os.path.join(runs_folder, run_id, MANIFEST_NAME)
+            if os.path.exists(path):
+                with open(path, "r", encoding="utf-8") as f:
+                    self.add_manifest(json.load(f))
+                added += 1
+        return added
+
+    # ----- questions -----
+
+    def runs_using(self, clip):
+        """Runs that used a clip (file name, Pexels id, path or SHA-256)"""
+        with self._connect() as db:
+            return [dict(row) for row in db.execute(
+                """SELECT DISTINCT r.run_id, r.started, r.channel, r.topic, r.video, u.youtube_id
+                   FROM artifacts a JOIN runs r ON r.run_id = a.run_id
+                   LEFT JOIN uploads u ON u.run_id = r.run_id
+                   WHERE a.kind = 'clip' AND (a.name = ? OR a.source = ? OR a.path = ? OR a.sha256 = ?)
+                   ORDER BY r.started DESC""",
+                (clip, clip, os.path.abspath(clip), clip)
+            )]
+
+    def slowest(self, stage="assemble_video", days=7, limit=10):
+        """Slowest runs of a stage in the last few days"""
+        since = (datetime.datetime.now() - datetime.timedelta(days=days)).isoformat(timespec="seconds")
+        with self._connect() as db:
+            return [dict(row) for row in db.execute(
+                """SELECT r.run_id, r.started, r.channel, r.topic, s.wall_seconds, s.encode_fps
+                   FROM stages s JOIN runs r ON r.run_id = s.run_id
+                   WHERE s.stage = ? AND r.started >= ?
+                   ORDER BY s.wall_seconds DESC LIMIT ?""",
+                (stage, since, limit)
+            )]
+
+    def recent_runs(self, limit=20, channel=None):
+        """Latest runs, newest first"""
+        query = """SELECT r.run_id, r.started, r.pipeline, r.channel, r.topic, r.ok, r.wall_seconds,
+                          u.youtube_id
+                   FROM runs r LEFT JOIN uploads u ON u.run_id = r.run_id"""
+        params = []
+        if channel:
+            query += " WHERE r.channel = ?"
+            params.append(channel)
+        query += " ORDER BY r.started DESC LIMIT ?"
+        params.append(limit)
+        with self._connect() as db:
+            return [dict(row) for row in db.execute(query, params)]
+
+    def file_references(self):
+        """Every use of every file that still exists, with its run's dates"""
+        with self._connect() as db:
+            return [dict(row) for row in db.execute(
+                """SELECT a.path, a.mtime_ns, a.size, a.kind, r.run_id, r.started, r.ok, u.uploaded
+                   FROM artifacts a JOIN runs r ON r.run_id = a.run_id
+                   LEFT JOIN uploads u ON u.run_id = a.run_id
+                   LEFT JOIN deleted_files d ON d.path = a.path AND d.mtime_ns = a.mtime_ns
+                   WHERE d.path IS NULL"""
+            )]
+
+    def runs_folders(self):
+        """Every runs folder that has a manifest in the index"""
+        with self._connect() as db:
+            manifests = [row["manifest"] for row in db.execute(
+                "SELECT DISTINCT manifest FROM runs WHERE manifest IS NOT NULL"
+            )]
+        return sorted({os.path.dirname(os.path.dirname(path)) for path in manifests})
+
+    def run_artifacts(self, run_id):
+        with self._connect() as db:
+            return [dict(row) for row in db.execute(
+                "SELECT stage, kind, path, size, sha256, kept FROM artifacts WHERE run_id = ?", (run_id,)
+            )]
+
+
+class RunManifest:
+    """Collects the files and numbers of one run and writes manifest.json"""
+
+    def __init__(self, run_id, pipeline, run_dir, channel=None, topic=None):
+        self.run_dir = run_dir
+        self.path = os.path.join(run_dir, MANIFEST_NAME)
+        self.data = {
+            "run_id": run_id,
+            "pipeline": pipeline,
+            "channel": channel,
+            "topic": topic,
+            "started": None,
+            "ok": False,
+            "wall_seconds": None,
+            "artifacts": [],
+            "stages": [],
+            "youtube": None,
+            "manifest": os.path.abspath(self.path),
+        }
+
+    def add(self, stage, kind, path, keep=False, source=None, index=None):
+        """
+        Add one file made by a stage. With keep=True the file is copied
+        into the run folder first (for fixed names the next run overwrites).
+        """
+        if not path or not os.path.exists(path):
+            return None
+        path = os.path.abspath(path)
+        if keep:
+            kept_dir = os.path.join(self.run_dir, "artifacts")
+            os.makedirs(kept_dir, exist_ok=True)
+            copy = os.path.join(kept_dir, os.path.basename(path))
+            shutil.copy2(path, copy)
+            path = os.path.abspath(copy)
+
+        stat = os.stat(path)
+        sha256 = index.known_hash(path, stat.st_size, stat.st_mtime_ns) if index else None
+        artifact = {
+            "stage": stage,
+            "kind": kind,
+            "path": path,
+            "name": os.path.basename(path),
+            "source": source,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": sha256 or file_hash(path),
+            "kept": keep,
+        }
+        self.data["artifacts"].append(artifact)
+        return artifact
+
+    def set_upload(self, video_id, job_id=None):
+        self.data["youtube"] = {
+            "video_id": video_id,
+            "uploaded": datetime.datetime.now().isoformat(timespec="seconds"),
+            "job_id": job_id,
+        }
+
+    def save(self, recorder, total, topic=None, index=None):
+        """Write manifest.json (with the recorder's stage timings) and index it"""
+        if topic:
+            self.data["topic"] = topic
+        self.data["started"] = total.get("started") or recorder.started_at
+        self.data["ok"] = total["ok"]
+        self.data["wall_seconds"] = total["wall_seconds"]
+        self.data["stages"] = [
+            {key: stage.get(key) for key in ("stage", "ok", "wall_seconds", "cpu_seconds", "encode_fps")}
+            for stage in recorder.stages
+        ]
+        os.makedirs(self.run_dir, exist_ok=True)
+        _write_json(self.path, self.data)
+        if index:
+            index.add_manifest(self.data)
+        return self.path
+
+
+def _write_json(path, data):
+    temp_file = f"{path}.{os.getpid()}.tmp"
+    with open(temp_file, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+    os.replace(temp_file, path)
+
+
+def _print_rows(rows, columns):
+    if not rows:
+        print("  Nothing found")
+        return
+    for row in rows:
+        print("  " + "  ".join(str(row.get(column, "")) for column in columns))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ask the artifact index about past runs")
+    parser.add_argument("--db", default=None, help=f"Index file (default: {DEFAULT_INDEX_FILE})")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    clip = commands.add_parser("clip", help="Videos that used a clip")
+    clip.add_argument("clip", help="Clip file name, Pexels id, path or SHA-256")
+
+    slowest = commands.add_parser("slowest", help="Slowest runs of a stage")
+    slowest.add_argument("--stage", default="assemble_video")
+    slowest.add_argument("--days", type=int, default=7)
+    slowest.add_argument("--limit", type=int, default=10)
+
+    runs = commands.add_parser("runs", help="Latest runs")
+    runs.add_argument("--channel")
+    runs.add_argument("--limit", type=int, default=20)
+
+    show = commands.add_parser("show", help="Every file of one run")
+    show.add_argument("run_id")
+
+    rebuild = commands.add_parser("rebuild", help="Re-read the manifests in a runs folder")
+    rebuild.add_argument("runs_folder")
+
+    args = parser.parse_args()
+    index = ArtifactIndex(args.db)
+
+    if args.command == "clip":
+        _print_rows(index.runs_using(args.clip), ["started", "run_id", "channel", "youtube_id", "topic"])
+    elif args.command == "slowest":
+        _print_rows(index.slowest(args.stage, args.days, args.limit),
+                    ["wall_seconds", "encode_fps", "started", "run_id", "topic"])
+    elif args.command == "runs":
+        _print_rows(index.recent_runs(args.limit, args.channel),
+                    ["started", "run_id", "channel", "ok", "wall_seconds", "youtube_id", "topic"])
+    elif args.command == "show":
+        _print_rows(index.run_artifacts(args.run_id), ["stage", "kind", "size", "sha256", "path"])
+    elif args.command == "rebuild":
+        print(f"  Indexed {index.rebuild(args.runs_folder)} runs")
+
+
+if __name__ == "__main__":
+    main()
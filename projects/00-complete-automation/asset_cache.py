@@ -0,0 +1,261 @@
+"""
+SHARED ASSET CACHE - PLACEHOLDER & FALLBACK BACKGROUNDS
+=======================================================
+Solid color (and fancier) background videos never change, so there is
+no reason to render them again on every run. Each one is made ONCE per
+(variant, color, size, fps, duration), stored in a shared cache folder
+and reused by every project and channel.
+
+Variants:
+- "solid"        plain color (encoded with -tune stillimage, very fast)
+- "gradient_pan" a color gradient slowly panning sideways
+- "noise"        the color with light film-grain noise
+
+Variants are only created the first time someone asks for them.
+
+Title cards are cached the same way: a few seconds of the picture are
+encoded once and looped (stream copy) under any length of voiceover.
+
+Rendered video sections (SegmentCache) and music mixes (MixCache) are
+cached here too, so work that did not change is never done twice.
+"""
+
+import hashlib
+import os
+import shutil
+import threading
+import time
+
+import encode_profiles
+import ffmpeg_tools
+from instrumentation import count_cache
+
+# Shared between all projects unless a folder is passed in
+DEFAULT_CACHE_DIR = os.environ.get(
+    "ASSET_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".faceless_video_cache")
+)
+
+VARIANTS = ("solid", "gradient_pan", "noise")
+
+
+def _mark_used(path):
+    # The file time says when a cached file was last used (see _remove_unused)
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+
+def _remove_unused(folder, days, deadline=None):
+    """Delete files in folder not used for `days` days; returns (files, bytes)"""
+    cutoff = time.time() - days * 86400
+    files = removed_bytes = 0
+    for name in sorted(os.listdir(folder)):
+        if deadline and time.time() > deadline:
+            break
+        path = os.path.join(folder, name)
+        try:
+            stat = os.stat(path)
+            if stat.st_mtime < cutoff:
+                os.remove(path)
+                files += 1
+                removed_bytes += stat.st_size
+        except OSError:
+            continue
+    return files, removed_bytes
+
+
+class AssetCache:
+    """Creates background assets once and hands out the cached files"""
+
+    def __init__(self, cache_dir=None):
+        self.cache_dir = os.path.join(cache_dir or DEFAULT_CACHE_DIR, "backgrounds")
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._key_locks = {}
+
+    def background_path(self, color, size, fps, duration, variant="solid"):
+        """Where the cached file for these settings lives"""
+        width, height = size
+        hex_color = ffmpeg_tools.color_to_hex(color)[2:]
+        name = f"{variant}_{hex_color}_{width}x{height}_{fps}fps_{duration}s.mp4"
+        return os.path.join(self.cache_dir, name)
+
+    def background(self, color, size, fps, duration, variant="solid"):
+        """Return a cached background video, creating it on first use"""
+        if variant not in VARIANTS:
+            raise ValueError(f"Unknown background variant: {variant}")
+
+        path = self.background_path(color, size, fps, duration, variant)
+
+        def make(temp_path):
+            if variant == "solid":
+                ffmpeg_tools.encode_color_video(color, size, fps, duration, temp_path)
+            elif variant == "noise":
+                self._make_noise(color, size, fps, duration, temp_path)
+            else:
+                self._make_gradient_pan(color, size, fps, duration, temp_path)
+
+        return self._get_or_make(path, make)
+
+    def title_card(self, image_path, fps, duration, profile):
+        """
+        A few seconds of a still picture (e.g. the title card), encoded
+        once with the given encode profile. The name comes from the
+        picture's content, so the same title is never encoded twice.
+        """
+        with open(image_path, "rb") as f:
+            digest = hashlib.sha256(f.read()).hexdigest()[:16]
+        name = f"still_{digest}_{fps}fps_{duration}s_{profile}.mp4"
+        path = os.path.join(self.cache_dir, name)
+
+        def make(temp_path):
+            encoder_args = encode_profiles.ffmpeg_args(profile, fps)
+            ffmpeg_tools.encode_still_clip(image_path, temp_path, fps, duration, encoder_args)
+
+        return self._get_or_make(path, make)
+
+    def _get_or_make(self, path, make):
+        """Return the cached file at path, calling make(temp_path) to create it first"""
+        if os.path.exists(path):
+            self.hits += 1
+            count_cache("assets", hit=True)
+            _mark_used(path)
+            return path
+
+        # Only one thread builds a given asset; the others wait for it
+        with self._lock:
+            key_lock = self._key_locks.setdefault(path, threading.Lock())
+
+        with key_lock:
+            if os.path.exists(path):
+                self.hits += 1
+                count_cache("assets", hit=True)
+                _mark_used(path)
+                return path
+
+            self.misses += 1
+            count_cache("assets", hit=False)
+            # Write to a temporary name first so a crash never leaves
+            # half a video in the cache
+            temp_path = f"{path}.{os.getpid()}.tmp.mp4"
+            try:
+                make(temp_path)
+                os.replace(temp_path, path)
+            finally:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+
+        return path
+
+    def remove_unused(self, days, deadline=None):
+        """
+        Delete backgrounds nobody used for `days` days (they are simply
+        made again when needed). Stops at `deadline` (time.time()).
+        Returns (files, bytes) removed.
+        """
+        return _remove_unused(self.cache_dir, days, deadline)
+
+    def _make_noise(self, color, size, fps, duration, output_path):
+        """Solid color with moving film grain"""
+        width, height = size
+        source = f"color=c={ffmpeg_tools.color_to_hex(color)}:s={width}x{height}:r={fps}:d={duration}"
+        ffmpeg_tools.run_ffmpeg([
+            "-f", "lavfi", "-i", source,
+            "-vf", "noise=alls=12:allf=t+u",
+            "-c:v", "libx264", "-preset", "veryfast",
+            "-pix_fmt", "yuv420p", "-movflags", "+faststart",
+            output_path
+        ])
+
+    def _make_gradient_pan(self, color, size, fps, duration, output_path):
+        """Gradient picture (drawn once with Pillow) panned by ffmpeg's crop filter"""
+        from PIL import Image, ImageOps
+
+        width, height = size
+        light = tuple(min(255, c * 2 + 40) for c in color)
+
+        # Gradient 50% wider than the frame so there is room to pan
+        gradient = Image.linear_gradient("L").rotate(90).resize((width * 3 // 2, height))
+        gradient = ImageOps.colorize(gradient, color, light)
+        image_path = output_path + ".png"
+        gradient.save(image_path)
+
+        try:
+            ffmpeg_tools.run_ffmpeg([
+                "-loop", "1", "-framerate", fps, "-t", duration, "-i", image_path,
+                "-vf", f"crop={width}:{height}:(iw-ow)*t/{duration}:0",
+                "-c:v", "libx264", "-preset", "veryfast",
+                "-pix_fmt", "yuv420p", "-movflags", "+faststart",
+                output_path
+            ])
+        finally:
+            os.remove(image_path)
+
+
+class FileCache:
+    """Finished files stored under the hash of what went into them"""
+
+    folder = "files"
+    extension = ".bin"
+
+    def __init__(self, cache_dir=None):
+        self.cache_dir = os.path.join(cache_dir or DEFAULT_CACHE_DIR, self.folder)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+
+    def path(self, key):
+        return os.path.join(self.cache_dir, f"{key}{self.extension}")
+
+    def get(self, key):
+        """The cached file for this key, or None"""
+        path = self.path(key)
+        if os.path.exists(path):
+            self.hits += 1
+            count_cache(self.folder, hit=True)
+            _mark_used(path)
+            return path
+        self.misses += 1
+        count_cache(self.folder, hit=False)
+        return None
+
+    def put(self, key, made_path):
+        """Move a freshly made file into the cache; returns its cached path"""
+        path = self.path(key)
+        temp_path = f"{path}.{os.getpid()}.tmp{self.extension}"
+        try:
+            shutil.move(made_path, temp_path)
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f"  Warning: Could not cache {os.path.basename(made_path)}: {e}")
+            return made_path if os.path.exists(made_path) else temp_path
+        return path
+
+    def remove_unused(self, days, deadline=None):
+        """Delete files not used for `days` days; returns (files, bytes)"""
+        return _remove_unused(self.cache_dir, days, deadline)
+
+
+class SegmentCache(FileCache):
+    """
+    Rendered sections of videos, stored by the hash of what is in them
+    (clip content, in/out points, size, encode profile, captions).
+
+    A section that did not change since an earlier render is copied
+    into the new video instead of being rendered again, so fixing one
+    fact re-renders one section, not the whole video.
+    """
+
+    folder = "segments"
+    extension = ".mp4"
+
+
+class MixCache(FileCache):
+    """Voiceover + music mixes (music.py), one per voiceover, track and settings"""
+
+    folder = "music"
+    extension = ".m4a"
@@ -22,10 +22,12 @@ For Windows: Make sure Ollama is running (ollama serve)
 import os
 import sys
 import json
+import argparse
 import asyncio
 import random
 import datetime
-import pickle
+import re
+import shutil
 from pathlib import Path
 
 # Auto-install missing packages
@@ -53,10 +55,9 @@ for module, package in required_packages.items():
 
 import requests
 import edge_tts
-from pytrends.request import TrendReq
 
 try:
-    from moviepy.editor import VideoFileClip, AudioFileClip, concatenate_videoclips, CompositeVideoClip, TextClip, ColorClip
+    from moviepy.editor import VideoFileClip, AudioFileClip, CompositeVideoClip, ColorClip, ImageClip
     MOVIEPY_AVAILABLE = True
 except ImportError:
     MOVIEPY_AVAILABLE = False
@@ -69,10 +70,11 @@ except ImportError:
     PILLOW_AVAILABLE = False
 
 try:
-    from googleapiclient.discovery import build
-    from googleapiclient.http import MediaFileUpload
-    from google_auth_oauthlib.flow import InstalledAppFlow
-    from google.auth.transport.requests import Request
+    # What youtube_auth.py needs for the login (it imports them itself when used)
+    import google.auth.transport.requests
+    import google.oauth2.credentials
+    import google_auth_oauthlib.flow
+    import googleapiclient.discovery
     YOUTUBE_AVAILABLE = True
 except ImportError:
     YOUTUBE_AVAILABLE = False
@@ -81,21 +83,68 @@ except ImportError:
 # Import config
 from config import *
 
+import captions
+import edl
+import encode_profiles
+import ffmpeg_tools
+import music
+import profiling
+import project_tools
+import relevance
+import trends
+from artifact_index import ArtifactIndex, RunManifest, file_hash
+from asset_cache import AssetCache, MixCache, SegmentCache
+from instrumentation import RunRecorder
+from topic_history import TopicHistory, history_file
+from upload_queue import make_auth, make_queue
+
 
 class YouTubeAutomation:
     """Complete YouTube Video Automation System"""
     
-    def __init__(self):
+    def __init__(self, encode_profile=None, upload_in_background=False, profile=None):
         self.output_folder = OUTPUT_FOLDER
+        self.encode_profile = encode_profile or ENCODE_PROFILE
+        self.upload_in_background = upload_in_background
+        self.profile = profile or PROFILE_MODE
+        encode_profiles.get_profile(self.encode_profile)  # fail early on typos
+        if self.profile:
+            profiling.check_mode(self.profile)
         self.ensure_output_folder()
         self.trending_topic = None
         self.script = None
+        self.script_file = None
         self.voiceover_file = None
         self.video_clips = []
         self.final_video = None
         self.thumbnail_file = None
+        self.captions_file = None
+        self.captions_cues = []
+        self.voice_words = []
+        self.edit_plan = []
+        self.edl_file = None
+        self.music_track = None
         self.metadata = {}
+        self.youtube_upload = None
+        self.recorder = None
+        self.topic_history = self.load_topic_history()
+        
+    def load_topic_history(self):
+        """Topics this channel already made (one history per YOUTUBE_CHANNEL)"""
+        # Relative to this folder, so every script finds the same files
+        folder = os.path.join(os.path.dirname(os.path.abspath(__file__)), TOPIC_HISTORY_FOLDER)
+        path = history_file(folder, YOUTUBE_CHANNEL)
+        
+        # Histories used to be kept per niche - carry the old file over once
+        niche_path = history_file(folder, CHANNEL_NICHE)
+        if not os.path.exists(path) and os.path.exists(niche_path):
+            try:
+                shutil.copy2(niche_path, path)
+            except OSError as e:
+                print(f"  Warning: Could not copy topic history {niche_path}: {e}")
         
+        return TopicHistory(path, TOPIC_SIMILARITY_LIMIT)
+    
     def ensure_output_folder(self):
         """Create output folder if it doesn't exist"""
         os.makedirs(self.output_folder, exist_ok=True)
@@ -121,31 +170,47 @@ class YouTubeAutomation:
         self.print_step(1, "DISCOVERING TRENDING TOPICS...")
         
         try:
-            # Initialize pytrends
-            pytrends = TrendReq(hl='en-US', tz=360)
-            
-            # Get trending searches
-            trending_searches = pytrends.trending_searches(pn='united_states')
-            trends_list = trending_searches[0].tolist()[:NUM_TRENDS_TO_CHECK]
-            
-            print(f"  Found {len(trends_list)} trending topics!")
-            
-            # Filter trends based on niche keywords
-            relevant_trends = []
-            for trend in trends_list:
-                trend_lower = trend.lower()
-                # Check if trend is relevant to niche
-                for keyword in NICHE_KEYWORDS:
-                    if keyword.lower() in trend_lower:
-                        relevant_trends.append(trend)
-                        break
-            
-            # If no relevant trends, use general trends
+            # Ask every trend source at the same time (cached between runs)
+            fetcher = trends.TrendFetcher(
+                regions=TREND_REGIONS,
+                niche_keywords=NICHE_KEYWORDS,
+                topics_file=TOPICS_FILE,
+                cache_file=os.path.join(self.output_folder, "trend_cache.json"),
+                ttl_minutes=TREND_CACHE_MINUTES,
+                fixture_file=TREND_FIXTURE_FILE,
+                max_results=NUM_TRENDS_TO_CHECK
+            )
+            candidates = fetcher.fetch()
+            trends_list = [candidate["title"] for candidate in candidates]
+            
+            if not trends_list:
+                raise RuntimeError("no trend source returned any topics")
+            
+            print(f"  Found {len(trends_list)} trending topics! "
+                  f"({fetcher.cache_hits} sources cached, {fetcher.cache_misses} fetched)")
+            
+            # Rank trends by how well they fit the niche (best first)
+            scorer = relevance.get_scorer(
+                CHANNEL_NICHE, NICHE_KEYWORDS,
+                extra_texts=self.get_fallback_topics(),
+                use_embeddings=RELEVANCE_USE_SIMILARITY
+            )
+            ranked = scorer.rank(trends_list, min_score=RELEVANCE_MIN_SCORE)
+            relevant_trends = [title for score, title in ranked]
+            
+            # Skip topics this channel already made
+            new_trends = self.topic_history.filter_new(relevant_trends)
+            if len(new_trends) < len(relevant_trends):
+                print(f"  Skipped {len(relevant_trends) - len(new_trends)} topics already made")
+            relevant_trends = new_trends
+            
+            # If no trend fits the niche, use the niche's own topics
             if not relevant_trends:
-                relevant_trends = trends_list[:5]
-                print(f"  Using general trends (no niche-specific found)")
+                relevant_trends = self.pick_new_topics(self.get_fallback_topics())
+                print(f"  No trend fits the niche well enough - using niche topics")
             else:
-                print(f"  Found {len(relevant_trends)} niche-relevant trends!")
+                print(f"  Found {len(relevant_trends)} niche-relevant trends! "
+                      f"(best: {ranked[0][1]}, score {ranked[0][0]:.2f})")
             
             # Pick a random trend from top relevant ones
             self.trending_topic = random.choice(relevant_trends[:5])
@@ -156,11 +221,19 @@ class YouTubeAutomation:
         except Exception as e:
             print(f"  WARNING: Could not fetch trends: {e}")
             # Fallback to predefined topics based on niche
-            fallback_topics = self.get_fallback_topics()
+            fallback_topics = self.pick_new_topics(self.get_fallback_topics())
             self.trending_topic = random.choice(fallback_topics)
             print(f"  Using fallback topic: {self.trending_topic}")
             return self.trending_topic
     
+    def pick_new_topics(self, topics):
+        """Topics not made yet (all of them again if every one was made)"""
+        new_topics = self.topic_history.filter_new(topics)
+        if not new_topics:
+            print(f"  WARNING: Every fallback topic was already made - add ideas to {TOPICS_FILE}")
+            return topics
+        return new_topics
+    
     def get_fallback_topics(self):
         """Get fallback topics based on niche"""
         topics = {
@@ -280,6 +353,7 @@ Make it exciting and fun to watch!"""
                     f.write("=" * 50 + "\n\n")
                     f.write(self.script)
                 
+                self.script_file = script_file
                 print(f"  Script generated! ({len(self.script)} characters)")
                 print(f"  Saved to: {script_file}")
                 return self.script
@@ -302,32 +376,71 @@ Make it exciting and fun to watch!"""
             print("  ERROR: No script available!")
             return None
         
-        # Clean script for voiceover (remove formatting markers)
-        clean_script = self.script
-        for marker in ['[INTRO]', '[OUTRO]', '[FACT 1]', '[FACT 2]', '[FACT 3]', 
-                       '[FACT 4]', '[FACT 5]', '[FACT 6]', '[FACT 7]', '[FACT 8]',
-                       '[FACT 9]', '[FACT 10]']:
-            clean_script = clean_script.replace(marker, '')
+        clean_script = self.clean_script_for_voice(self.script)
         
         self.voiceover_file = os.path.join(self.output_folder, "voiceover.mp3")
         
         try:
-            # Create voiceover with Edge TTS
-            communicate = edge_tts.Communicate(clean_script, VOICE)
-            await communicate.save(self.voiceover_file)
+            # Create voiceover with Edge TTS (and ask for word timings)
+            try:
+                communicate = edge_tts.Communicate(clean_script, VOICE, boundary="WordBoundary")
+            except TypeError:
+                # Older edge-tts versions always send word boundaries
+                communicate = edge_tts.Communicate(clean_script, VOICE)
+            
+            words = []
+            with open(self.voiceover_file, "wb") as audio_file:
+                async for chunk in communicate.stream():
+                    if chunk["type"] == "audio":
+                        audio_file.write(chunk["data"])
+                    elif chunk["type"] == "WordBoundary":
+                        words.append(captions.word_from_boundary(chunk))
             
             print(f"  Voiceover created!")
             print(f"  Saved to: {self.voiceover_file}")
+            
+            self.voice_words = words
+            self.create_captions(words)
             return self.voiceover_file
             
         except Exception as e:
             print(f"  ERROR creating voiceover: {e}")
             return None
     
+    def clean_script_for_voice(self, script):
+        """Script without the formatting markers ([INTRO], [FACT 1], ...)"""
+        clean_script = script
+        for marker in ['[INTRO]', '[OUTRO]', '[FACT 1]', '[FACT 2]', '[FACT 3]', 
+                       '[FACT 4]', '[FACT 5]', '[FACT 6]', '[FACT 7]', '[FACT 8]',
+                       '[FACT 9]', '[FACT 10]']:
+            clean_script = clean_script.replace(marker, '')
+        return clean_script
+    
     def generate_voiceover(self):
         """Wrapper for async voiceover generation"""
         return asyncio.run(self.generate_voiceover_async())
     
+    def create_captions(self, words):
+        """Build SRT/VTT caption files from the voiceover word timings"""
+        if not CAPTIONS_ENABLED:
+            return None
+        
+        if not words:
+            print("  Note: No word timings received - skipping captions")
+            return None
+        
+        self.captions_cues = captions.build_cues(words, max_chars=CAPTION_MAX_CHARS)
+        
+        captions.save_words(words, os.path.join(self.output_folder, "voiceover_words.json"))
+        self.captions_file = captions.write_srt(
+            self.captions_cues, os.path.join(self.output_folder, "captions.srt")
+        )
+        captions.write_vtt(self.captions_cues, os.path.join(self.output_folder, "captions.vtt"))
+        
+        print(f"  Captions created! ({len(self.captions_cues)} lines)")
+        print(f"  Saved to: {self.captions_file}")
+        return self.captions_file
+    
     # =========================================
     # STEP 4: VIDEO CLIPS DOWNLOAD
     # =========================================
@@ -341,72 +454,38 @@ Make it exciting and fun to watch!"""
             print("  Add it to config.py")
             return []
         
+        # How much footage do we actually need?
+        target_seconds = self.get_narration_duration()
+        sections = self.count_script_sections()
+        
         # Generate search terms based on topic
         search_terms = self.generate_search_terms()
         print(f"  Search terms: {search_terms[:3]}")
         
-        clips_folder = os.path.join(self.output_folder, "clips")
-        os.makedirs(clips_folder, exist_ok=True)
-        
-        downloaded_clips = []
-        clips_needed = NUM_FACTS + 2  # Extra clips for intro/outro
-        
-        for term in search_terms:
-            if len(downloaded_clips) >= clips_needed:
-                break
-                
-            try:
-                response = requests.get(
-                    "https://api.pexels.com/videos/search",
-                    headers={"Authorization": PEXELS_API_KEY},
-                    params={
-                        "query": term,
-                        "per_page": 3,
-                        "orientation": "landscape",
-                        "size": "medium"
-                    },
-                    timeout=30
-                )
-                
-                if response.status_code == 200:
-                    videos = response.json().get("videos", [])
-                    
-                    for video in videos:
-                        if len(downloaded_clips) >= clips_needed:
-                            break
-                            
-                        # Find HD video file
-                        video_files = video.get("video_files", [])
-                        video_url = None
-                        
-                        for vf in video_files:
-                            if vf.get("quality") == "hd" and vf.get("width", 0) >= 1280:
-                                video_url = vf.get("link")
-                                break
-                        
-                        if not video_url and video_files:
-                            video_url = video_files[0].get("link")
-                        
-                        if video_url:
-                            # Download video
-                            clip_filename = os.path.join(clips_folder, f"clip_{len(downloaded_clips)+1}.mp4")
-                            
-                            vid_response = requests.get(video_url, stream=True, timeout=60)
-                            if vid_response.status_code == 200:
-                                with open(clip_filename, "wb") as f:
-                                    for chunk in vid_response.iter_content(chunk_size=8192):
-                                        f.write(chunk)
-                                downloaded_clips.append(clip_filename)
-                                print(f"  Downloaded clip {len(downloaded_clips)}/{clips_needed}")
-                                
-            except Exception as e:
-                print(f"  Warning: Error downloading from '{term}': {e}")
-                continue
+        downloaded_clips = project_tools.download_clips(
+            PEXELS_API_KEY, search_terms, os.path.join(self.output_folder, "clips"),
+            target_seconds, sections, VIDEO_WIDTH, VIDEO_HEIGHT
+        )
         
         self.video_clips = downloaded_clips
         print(f"\n  Total clips downloaded: {len(downloaded_clips)}")
         return downloaded_clips
     
+    def get_narration_duration(self):
+        """Voiceover length in seconds (estimated from the script if unknown)"""
+        if self.voiceover_file and os.path.exists(self.voiceover_file):
+            duration = ffmpeg_tools.probe_duration(self.voiceover_file)
+            if duration:
+                return duration
+        # About 150 spoken words per minute
+        words = len((self.script or "").split())
+        return max(words / 150 * 60, 60)
+    
+    def count_script_sections(self):
+        """Number of sections ([INTRO], [FACT n], [OUTRO]) in the script"""
+        markers = re.findall(r"\[(?:INTRO|OUTRO|FACT \d+)\]", self.script or "")
+        return len(markers) or NUM_FACTS + 2
+    
     def generate_search_terms(self):
         """Generate search terms based on trending topic"""
         # Extract keywords from topic
@@ -451,10 +530,6 @@ Make it exciting and fun to watch!"""
         """Assemble final video from clips and voiceover"""
         self.print_step(5, "ASSEMBLING FINAL VIDEO...")
         
-        if not MOVIEPY_AVAILABLE:
-            print("  ERROR: MoviePy not available!")
-            return None
-        
         if not self.voiceover_file or not os.path.exists(self.voiceover_file):
             print("  ERROR: No voiceover file!")
             return None
@@ -464,72 +539,38 @@ Make it exciting and fun to watch!"""
             print("  Creating video with static background...")
             return self.create_static_video()
         
+        if not MOVIEPY_AVAILABLE:
+            print("  ERROR: MoviePy not available!")
+            return None
+        
         try:
             # Load audio
             audio = AudioFileClip(self.voiceover_file)
             audio_duration = audio.duration
+            audio.close()
             print(f"  Audio duration: {audio_duration:.1f} seconds")
             
-            # Calculate clip duration
-            num_clips = len(self.video_clips)
-            clip_duration = audio_duration / num_clips
-            print(f"  Each clip: {clip_duration:.1f} seconds")
-            
-            # Process video clips
-            processed_clips = []
-            for i, clip_path in enumerate(self.video_clips):
-                try:
-                    clip = VideoFileClip(clip_path)
-                    
-                    # Adjust clip duration
-                    if clip.duration < clip_duration:
-                        # Loop short clips
-                        clip = clip.loop(duration=clip_duration)
-                    else:
-                        # Trim long clips
-                        clip = clip.subclip(0, min(clip_duration, clip.duration))
-                    
-                    # Resize to standard resolution
-                    clip = clip.resize((VIDEO_WIDTH, VIDEO_HEIGHT))
-                    
-                    processed_clips.append(clip)
-                    print(f"  Processed clip {i+1}/{num_clips}")
-                    
-                except Exception as e:
-                    print(f"  Warning: Could not process clip {i+1}: {e}")
-                    continue
-            
-            if not processed_clips:
-                print("  ERROR: No clips could be processed!")
-                return self.create_static_video()
-            
-            # Concatenate clips
-            final_video = concatenate_videoclips(processed_clips, method="compose")
-            
-            # Add audio
-            final_video = final_video.set_audio(audio)
+            # Work out which clip plays when (shared with previews)
+            self.edit_plan = self.plan_clips(audio_duration)
+            print(f"  Each clip: ~{audio_duration / len(self.video_clips):.1f} seconds")
             
             # Output filename
             timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
             self.final_video = os.path.join(self.output_folder, f"video_{timestamp}.mp4")
             
             # Write final video
-            print(f"\n  Rendering final video...")
-            final_video.write_videofile(
-                self.final_video,
-                fps=VIDEO_FPS,
-                codec='libx264',
-                audio_codec='aac',
-                threads=4,
-                logger=None
+            print(f"\n  Rendering final video ({self.describe_encode_profile()})...")
+            rendered = self.render_plan(
+                self.edit_plan, self.final_video,
+                VIDEO_WIDTH, VIDEO_HEIGHT, VIDEO_FPS, self.encode_profile
             )
             
-            # Cleanup
-            audio.close()
-            for clip in processed_clips:
-                clip.close()
-            final_video.close()
+            if not rendered:
+                print("  ERROR: No clips could be processed!")
+                return self.create_static_video()
             
+            self.final_video = rendered
+            self.edl_file = edl.sidecar_path(rendered)
             print(f"  Video saved: {self.final_video}")
             return self.final_video
             
@@ -537,44 +578,349 @@ Make it exciting and fun to watch!"""
             print(f"  ERROR assembling video: {e}")
             return None
     
-    def create_static_video(self):
-        """Create video with static background when no clips available"""
+    def plan_clips(self, audio_duration):
+        """
+        Make the edit plan: which part of which clip plays when.
+        
+        Every clip gets its own section (see section_bounds). When a clip
+        is too short for its section, the gap is filled with footage nobody
+        has seen yet from the other clips; only if none is left is the
+        clip looped.
+        
+        The final render and the preview both render this same plan,
+        so a preview always shows exactly what the final video will be.
+        """
+        bounds = self.section_bounds(audio_duration, len(self.video_clips))
+        durations = [end - start for start, end in zip(bounds, bounds[1:])]
+        lengths = {
+            path: ffmpeg_tools.probe_duration(path) or duration
+            for path, duration in zip(self.video_clips, durations)
+        }
+        
+        # First pass: every section starts with its own clip
+        used = {}
+        sections = []
+        for path, duration in zip(self.video_clips, durations):
+            take = min(lengths[path], duration)
+            used[path] = max(used.get(path, 0.0), take)
+            sections.append([{"source": path, "in": 0.0, "duration": take}])
+        
+        # Second pass: fill short sections with unused footage, then loops
+        for pieces, duration in zip(sections, durations):
+            missing = duration - sum(piece["duration"] for piece in pieces)
+            while missing > 0.05:
+                spare = max(self.video_clips, key=lambda path: lengths[path] - used[path])
+                available = lengths[spare] - used[spare]
+                if available < MIN_ALTERNATE_SECONDS:
+                    break
+                take = min(available, missing)
+                pieces.append({"source": spare, "in": used[spare], "duration": take})
+                used[spare] += take
+                missing -= take
+            
+            if missing > 0.05:
+                pieces.append({"source": pieces[0]["source"], "in": 0.0,
+                               "duration": missing, "loop": True})
+        
+        # Flatten into one timeline
+        plan = []
+        start = 0.0
+        for section, pieces in enumerate(sections, start=1):
+            first_index = len(plan)
+            for piece in pieces:
+                entry = dict(piece, section=section, start=start)
+                if piece.get("loop"):
+                    entry["loop_of"] = first_index
+                plan.append(entry)
+                start += piece["duration"]
+        
+        return plan
+    
+    def section_bounds(self, audio_duration, count):
+        """
+        Start and end times of `count` clip sections (count + 1 times).
+        
+        Sections follow the script parts ([INTRO], [FACT n], [OUTRO]) in
+        the voiceover, so rewording one fact only changes the sections of
+        that fact. The other sections keep their length and come straight
+        from the segment cache. Without word timings the voiceover is
+        simply split evenly.
+        """
+        part_starts = self.script_part_starts(audio_duration)
+        part_ends = part_starts[1:] + [audio_duration]
+        parts = len(part_starts)
+        
+        def time_at(position):
+            part = min(int(position), parts - 1)
+            return part_starts[part] + (position - part) * (part_ends[part] - part_starts[part])
+        
+        return [time_at(i * parts / count) for i in range(count + 1)]
+    
+    def script_part_starts(self, audio_duration):
+        """When each script part starts in the voiceover ([0.0] if unknown)"""
+        parts = [part for part in re.split(r"\[(?:INTRO|OUTRO|FACT \d+)\]", self.script or "") if part.strip()]
+        # Spoken words as the voice counts them (not punctuation on its own)
+        counts = [sum(1 for word in part.split() if any(c.isalnum() for c in word)) for part in parts]
+        total = sum(counts)
+        if not self.voice_words or len(parts) < 2 or not total:
+            return [0.0]
+        
+        starts = [0.0]
+        spoken = 0
+        for count in counts[:-1]:
+            spoken += count
+            # Numbers and hyphens may be counted a little differently by the voice
+            index = min(len(self.voice_words) - 1, round(spoken * len(self.voice_words) / total))
+            start = min(self.voice_words[index]["start"], audio_duration)
+            starts.append(max(start, starts[-1]))
+        return starts
+    
+    def add_music(self, edit):
+        """
+        Put a track from MUSIC_FOLDER under the voice, ducked while the
+        voice speaks (needs the voiceover word timings and NumPy)
+        """
+        tracks = music.find_tracks(MUSIC_FOLDER)
+        if not tracks or not self.voice_words:
+            return edit
+        if not music.NUMPY_AVAILABLE:
+            print("  Note: NumPy not available - no background music")
+            return edit
+        
+        voice_hash = edit["inputs"][os.path.abspath(self.voiceover_file)]["sha256"]
+        track = music.choose_track(tracks, voice_hash)
+        print(f"  Music: {os.path.basename(track)}")
+        self.music_track = track
+        return edl.add_audio_track(edit, music.music_track(track, self.voice_words, self.music_settings()))
+    
+    def music_settings(self):
+        """The MUSIC_* settings from config.py, as music.py wants them"""
+        return {
+            "volume": MUSIC_VOLUME,
+            "ducked_volume": MUSIC_DUCKED_VOLUME,
+            "attack": MUSIC_DUCK_ATTACK,
+            "release": MUSIC_DUCK_RELEASE,
+            "fade": MUSIC_FADE_SECONDS,
+        }
+    
+    def voice_with_music(self):
+        """
+        The voiceover with the music bed mixed in, for videos that are not
+        rendered from an EDL (the plain voiceover if there is no music)
+        """
+        tracks = music.find_tracks(MUSIC_FOLDER)
+        if not tracks or not self.voice_words:
+            return self.voiceover_file
+        if not music.NUMPY_AVAILABLE:
+            print("  Note: NumPy not available - no background music")
+            return self.voiceover_file
+        
+        try:
+            mixed = music.voice_with_music(self.voiceover_file, self.voice_words, tracks, self.music_settings())
+        except Exception as e:
+            print(f"  Warning: Could not mix music: {e}")
+            return self.voiceover_file
+        if mixed != self.voiceover_file:
+            self.music_track = music.choose_track(tracks, file_hash(self.voiceover_file))
+            print(f"  Music: {os.path.basename(self.music_track)}")
+        return mixed
+    
+    def trim_plan(self, plan, max_seconds):
+        """Keep only the first max_seconds of an edit plan"""
+        trimmed = []
+        for entry in plan:
+            if entry["start"] >= max_seconds:
+                break
+            duration = min(entry["duration"], max_seconds - entry["start"])
+            trimmed.append(dict(entry, duration=duration))
+        return trimmed
+    
+    def render_plan(self, plan, output_path, width, height, fps, profile, max_seconds=None):
+        """
+        Render an edit plan to a video file (returns None if no clip worked)
+        
+        The plan is written down as an EDL (edl.py) and rendered by the
+        RENDER_BACKEND. If a video with exactly the same EDL was already
+        rendered, that video is returned instead of rendering again, and
+        sections rendered before are taken from the segment cache.
+        """
+        if max_seconds:
+            plan = self.trim_plan(plan, max_seconds)
+        
+        burn_captions = CAPTIONS_BURN_IN and self.captions_file and self.captions_cues
+        edit = edl.build_edl(
+            plan, self.voiceover_file, width, height, fps, profile,
+            cues=self.captions_cues if burn_captions else None,
+            caption_font_size=CAPTION_FONT_SIZE
+        )
+        self.add_music(edit)
+        
+        if RENDER_CACHE:
+            previous = edl.find_render(edit, os.path.dirname(os.path.abspath(output_path)))
+            if previous:
+                print(f"  Edit unchanged (EDL {edit['hash'][:12]}) - reusing {previous}")
+                return previous
+        
+        segment_cache = SegmentCache(ASSET_CACHE_FOLDER) if RENDER_CACHE else None
+        mix_cache = MixCache(ASSET_CACHE_FOLDER)
+        rendered = edl.render(edit, output_path, backend=RENDER_BACKEND, workers=RENDER_WORKERS,
+                              segment_cache=segment_cache, mix_cache=mix_cache)
+        if rendered:
+            edl.mark_rendered(edit, rendered)
+        return rendered
+    
+    def create_preview(self, max_seconds=None, frames_only=False):
+        """
+        Quick low resolution preview of the video.
+        
+        Renders the same edit plan as the final video at preview size with
+        the draft encode profile, plus a contact sheet PNG with one frame
+        per section. With frames_only=True only the contact sheet is made.
+        """
+        self.print_step(5, "CREATING PREVIEW...")
+        
+        if not MOVIEPY_AVAILABLE:
+            print("  ERROR: MoviePy not available!")
+            return None
+        
+        if not self.voiceover_file or not os.path.exists(self.voiceover_file):
+            print("  ERROR: No voiceover file!")
+            return None
+        
+        if not self.video_clips:
+            print("  ERROR: No video clips to preview!")
+            return None
+        
         try:
             audio = AudioFileClip(self.voiceover_file)
+            self.edit_plan = self.plan_clips(audio.duration)
+            audio.close()
             
-            # Create colored background
-            background = ColorClip(
-                size=(VIDEO_WIDTH, VIDEO_HEIGHT),
-                color=(30, 30, 60),
-                duration=audio.duration
-            )
+            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+            sheet_file = os.path.join(self.output_folder, f"preview_{timestamp}_sheet.png")
+            self.create_contact_sheet(self.edit_plan, sheet_file)
+            print(f"  Contact sheet saved: {sheet_file}")
             
-            # Add text
+            if frames_only:
+                return sheet_file
+            
+            preview_file = os.path.join(self.output_folder, f"preview_{timestamp}.mp4")
+            length = f"first {max_seconds:g}s" if max_seconds else "full length"
+            print(f"  Rendering preview ({PREVIEW_WIDTH}x{PREVIEW_HEIGHT} @ {PREVIEW_FPS}fps, {length})...")
+            
+            preview_file = self.render_plan(self.edit_plan, preview_file, PREVIEW_WIDTH, PREVIEW_HEIGHT,
+                                            PREVIEW_FPS, PREVIEW_PROFILE, max_seconds=max_seconds)
+            if not preview_file:
+                print("  ERROR: No clips could be processed!")
+                return None
+            
+            print(f"  Preview saved: {preview_file}")
+            return preview_file
+            
+        except Exception as e:
+            print(f"  ERROR creating preview: {e}")
+            return None
+    
+    def create_contact_sheet(self, plan, output_path, thumb_width=320, columns=4):
+        """Save one frame from the middle of every section as a grid picture"""
+        # First piece of every section
+        firsts = {}
+        for entry in plan:
+            firsts.setdefault(entry["section"], entry)
+        plan = list(firsts.values())
+        
+        thumb_height = thumb_width * VIDEO_HEIGHT // VIDEO_WIDTH
+        label_height = 24
+        columns = min(columns, len(plan))
+        rows = (len(plan) + columns - 1) // columns
+        
+        sheet = Image.new('RGB', (columns * thumb_width, rows * (thumb_height + label_height)), (20, 20, 20))
+        draw = ImageDraw.Draw(sheet)
+        
+        for i, entry in enumerate(plan):
+            clip = VideoFileClip(entry["source"])
+            # Same time the render would show
+            t = min(entry["in"] + entry["duration"] / 2, clip.duration - 0.05)
+            frame = Image.fromarray(clip.get_frame(t)).resize((thumb_width, thumb_height))
+            clip.close()
+            
+            x = (i % columns) * thumb_width
+            y = (i // columns) * (thumb_height + label_height)
+            sheet.paste(frame, (x, y))
+            minutes, seconds = divmod(int(entry["start"]), 60)
+            draw.text((x + 6, y + thumb_height + 5),
+                      f"Section {entry['section']}  {minutes}:{seconds:02d}", fill=(255, 255, 255))
+        
+        sheet.save(output_path)
+        return output_path
+    
+    def create_static_video(self):
+        """Create video with static background when no clips available"""
+        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.final_video = os.path.join(self.output_folder, f"video_{timestamp}.mp4")
+        
+        # Background with the title drawn once by Pillow
+        title_card = self.create_title_card()
+        
+        burn_captions = CAPTIONS_BURN_IN and self.captions_file and self.captions_cues
+        audio_file = self.voice_with_music()
+        
+        # Fast path: a few seconds of the picture are encoded once (cached)
+        # and looped under the voiceover by stream copy
+        if not burn_captions:
             try:
-                txt_clip = TextClip(
-                    self.trending_topic,
-                    fontsize=60,
-                    color='white',
-                    size=(VIDEO_WIDTH - 100, None),
-                    method='caption'
-                ).set_position('center').set_duration(audio.duration)
-                
-                final = CompositeVideoClip([background, txt_clip])
-            except:
-                final = background
+                cache = AssetCache(ASSET_CACHE_FOLDER)
+                if title_card:
+                    background = cache.title_card(title_card, VIDEO_FPS, 5, self.encode_profile)
+                else:
+                    background = cache.background((30, 30, 60), (VIDEO_WIDTH, VIDEO_HEIGHT), VIDEO_FPS, 5)
+                ffmpeg_tools.loop_video_with_audio(background, audio_file, self.final_video)
+                print(f"  Video saved: {self.final_video}")
+                return self.final_video
+            except Exception as e:
+                print(f"  Warning: Cached background failed: {e}")
+        
+        # Captions change over the picture, so every frame is encoded -
+        # but at a low frame rate, since the picture itself never moves
+        elif title_card and ffmpeg_tools.has_filter("subtitles"):
+            try:
+                print(f"  Encoding still background with captions ({STILL_CAPTION_FPS} fps)...")
+                ffmpeg_tools.encode_still_video(
+                    title_card, audio_file, self.final_video, STILL_CAPTION_FPS,
+                    encode_profiles.ffmpeg_args(self.encode_profile, STILL_CAPTION_FPS),
+                    video_filter=ffmpeg_tools.subtitles_filter(self.captions_file, CAPTION_FONT_SIZE)
+                )
+                print(f"  Video saved: {self.final_video}")
+                return self.final_video
+            except Exception as e:
+                print(f"  Warning: Fast still-image encode failed: {e}")
+                print("  Falling back to MoviePy...")
+        
+        if not MOVIEPY_AVAILABLE:
+            print("  ERROR: MoviePy not available!")
+            return None
+        
+        try:
+            audio = AudioFileClip(audio_file)
             
-            final = final.set_audio(audio)
+            if title_card:
+                final = ImageClip(title_card).set_duration(audio.duration)
+            else:
+                final = ColorClip(
+                    size=(VIDEO_WIDTH, VIDEO_HEIGHT),
+                    color=(30, 30, 60),
+                    duration=audio.duration
+                )
             
-            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-            self.final_video = os.path.join(self.output_folder, f"video_{timestamp}.mp4")
+            final = final.set_audio(audio)
+            final, caption_params = self.burn_in_captions(final)
             
             final.write_videofile(
                 self.final_video,
                 fps=VIDEO_FPS,
-                codec='libx264',
                 audio_codec='aac',
-                threads=4,
-                logger=None
+                logger=None,
+                **encode_profiles.moviepy_args(self.encode_profile, VIDEO_FPS, caption_params)
             )
             
             audio.close()
@@ -586,6 +932,85 @@ Make it exciting and fun to watch!"""
             print(f"  ERROR creating static video: {e}")
             return None
     
+    def describe_encode_profile(self):
+        """Profile name plus its benchmarked speed, e.g. 'fast, ~240 fps'"""
+        fps = encode_profiles.measured_fps(self.encode_profile)
+        if fps:
+            return f"{self.encode_profile} profile, ~{fps:.0f} fps"
+        return f"{self.encode_profile} profile"
+    
+    def create_title_card(self):
+        """Draw the topic title on a plain background once with Pillow"""
+        if not PILLOW_AVAILABLE:
+            return None
+        
+        try:
+            img = Image.new('RGB', (VIDEO_WIDTH, VIDEO_HEIGHT), (30, 30, 60))
+            draw = ImageDraw.Draw(img)
+            
+            try:
+                font = ImageFont.truetype("arial.ttf", 60)
+            except:
+                font = ImageFont.load_default()
+            
+            # Word wrap the title to fit the screen
+            lines = []
+            current = ""
+            for word in self.trending_topic.split():
+                candidate = f"{current} {word}".strip()
+                if current and draw.textlength(candidate, font=font) > VIDEO_WIDTH - 100:
+                    lines.append(current)
+                    current = word
+                else:
+                    current = candidate
+            if current:
+                lines.append(current)
+            
+            line_height = 75
+            start_y = VIDEO_HEIGHT // 2 - (len(lines) - 1) * line_height // 2
+            for i, line in enumerate(lines):
+                draw.text((VIDEO_WIDTH // 2, start_y + i * line_height), line,
+                          font=font, fill=(255, 255, 255), anchor="mm")
+            
+            title_card = os.path.join(self.output_folder, "title_card.png")
+            img.save(title_card)
+            return title_card
+            
+        except Exception as e:
+            print(f"  Warning: Could not draw title card: {e}")
+            return None
+    
+    def burn_in_captions(self, video, width=VIDEO_WIDTH, height=VIDEO_HEIGHT):
+        """
+        Add captions to a video before rendering.
+        
+        Returns (video, ffmpeg_params). With ffmpeg's subtitles filter the
+        captions are drawn by the encoder itself; otherwise pre-drawn
+        Pillow images are laid over the video.
+        """
+        if not (CAPTIONS_BURN_IN and self.captions_file and self.captions_cues):
+            return video, None
+        
+        if ffmpeg_tools.has_filter("subtitles"):
+            caption_filter = ffmpeg_tools.subtitles_filter(self.captions_file, CAPTION_FONT_SIZE)
+            return video, ["-vf", caption_filter]
+        
+        if not PILLOW_AVAILABLE:
+            return video, None
+        
+        # Subtitle font sizes are measured against a 288 pixel tall screen
+        font_px = int(CAPTION_FONT_SIZE * height / 288)
+        cue_images = captions.render_cue_images(
+            self.captions_cues, width, font_px,
+            os.path.join(self.output_folder, "caption_images")
+        )
+        overlays = [
+            ImageClip(png).set_start(start).set_duration(end - start)
+                          .set_position(("center", height - font_px * 3))
+            for png, start, end in cue_images
+        ]
+        return CompositeVideoClip([video] + overlays).set_audio(video.audio), None
+    
     # =========================================
     # STEP 6: THUMBNAIL CREATION
     # =========================================
@@ -643,42 +1068,28 @@ Make it exciting and fun to watch!"""
     # =========================================
     # STEP 7: YOUTUBE UPLOAD
     # =========================================
-    def get_youtube_service(self):
-        """Get authenticated YouTube service"""
+    def get_youtube_auth(self):
+        """Shared YouTube login for this channel (tokens/<channel>.json)"""
+        return make_auth()
+    
+    def get_youtube_credentials(self):
+        """Load (or ask for) the YouTube login"""
         if not YOUTUBE_AVAILABLE:
             return None
         
-        SCOPES = ["https://www.googleapis.com/auth/youtube.upload"]
-        credentials = None
-        token_file = os.path.join(os.path.dirname(__file__), "token.pickle")
-        client_secrets = os.path.join(os.path.dirname(__file__), YOUTUBE_CLIENT_SECRETS)
-        
-        # Load existing credentials
-        if os.path.exists(token_file):
-            with open(token_file, 'rb') as token:
-                credentials = pickle.load(token)
-        
-        # Refresh or get new credentials
-        if not credentials or not credentials.valid:
-            if credentials and credentials.expired and credentials.refresh_token:
-                credentials.refresh(Request())
-            else:
-                if not os.path.exists(client_secrets):
-                    print(f"  ERROR: {YOUTUBE_CLIENT_SECRETS} not found!")
-                    print("  Please download it from Google Cloud Console")
-                    return None
-                
-                flow = InstalledAppFlow.from_client_secrets_file(client_secrets, SCOPES)
-                credentials = flow.run_local_server(port=0)
-            
-            # Save credentials
-            with open(token_file, 'wb') as token:
-                pickle.dump(credentials, token)
-        
-        return build('youtube', 'v3', credentials=credentials)
+        credentials = self.get_youtube_auth().credentials()
+        if not credentials:
+            print(f"  ERROR: {YOUTUBE_CLIENT_SECRETS} not found!")
+            print("  Please download it from Google Cloud Console")
+        return credentials
     
-    def upload_to_youtube(self):
-        """Upload video to YouTube"""
+    def upload_to_youtube(self, background=False):
+        """
+        Upload video to YouTube
+        
+        With background=True the video is only put in the outbox and the
+        scheduler's upload worker uploads it later.
+        """
         self.print_step(7, "UPLOADING TO YOUTUBE...")
         
         if not self.final_video or not os.path.exists(self.final_video):
@@ -688,75 +1099,75 @@ Make it exciting and fun to watch!"""
         # Generate metadata
         self.generate_metadata()
         
-        youtube = self.get_youtube_service()
-        if not youtube:
+        credentials = self.get_youtube_credentials()
+        if not credentials:
             print("  WARNING: YouTube upload skipped (not configured)")
             print("  To enable: Add client_secrets.json from Google Cloud Console")
             self.save_metadata_for_manual_upload()
             return None
         
-        try:
-            # Prepare video metadata
-            body = {
-                'snippet': {
-                    'title': self.metadata['title'],
-                    'description': self.metadata['description'],
-                    'tags': self.metadata['tags'],
-                    'categoryId': YOUTUBE_CATEGORY
-                },
-                'status': {
-                    'privacyStatus': YOUTUBE_PRIVACY,
-                    'selfDeclaredMadeForKids': False
-                }
+        # Prepare video metadata
+        body = {
+            'snippet': {
+                'title': self.metadata['title'],
+                'description': self.metadata['description'],
+                'tags': self.metadata['tags'],
+                'categoryId': YOUTUBE_CATEGORY
+            },
+            'status': {
+                'privacyStatus': YOUTUBE_PRIVACY,
+                'selfDeclaredMadeForKids': False
             }
-            
-            # Upload video
-            media = MediaFileUpload(
+        }
+        
+        try:
+            # Every upload goes through the outbox (survives restarts, respects quota)
+            queue = self.get_upload_queue()
+            job_id = queue.add(
                 self.final_video,
-                mimetype='video/mp4',
-                resumable=True
+                body,
+                thumbnail_file=self.thumbnail_file,
+                captions_file=self.captions_file if CAPTIONS_UPLOAD else None,
+                captions_language=CAPTIONS_LANGUAGE,
+                topic=self.trending_topic,
+                run_id=self.recorder.run_id if self.recorder else None
             )
             
-            request = youtube.videos().insert(
-                part=','.join(body.keys()),
-                body=body,
-                media_body=media
-            )
+            if background:
+                print(f"  Video added to the upload queue: {job_id}")
+                print("  The upload worker uploads it as soon as YouTube quota allows")
+                return None
             
-            print("  Uploading video...")
-            response = None
-            while response is None:
-                status, response = request.next_chunk()
-                if status:
-                    print(f"  Upload progress: {int(status.progress() * 100)}%")
+            wait_seconds = queue.drain(job_ids=[job_id])
+            job = queue.find_job(job_id)
+            
+            if not job or not job['video_id']:
+                if wait_seconds:
+                    print(f"  YouTube quota used up - more in {wait_seconds / 60:.0f} minutes")
+                else:
+                    print(f"  ERROR uploading to YouTube: {job['last_error'] if job else 'unknown error'}")
+                print("  The video stays in the outbox - run 'python upload_queue.py' to upload it later")
+                self.save_metadata_for_manual_upload()
+                return None
             
-            video_id = response.get('id')
-            video_url = f"https://www.youtube.com/watch?v={video_id}"
+            self.youtube_upload = (job['video_id'], job_id)
+            video_url = f"https://www.youtube.com/watch?v={job['video_id']}"
             
             print(f"\n  VIDEO UPLOADED SUCCESSFULLY!")
             print(f"  URL: {video_url}")
             
-            # Upload thumbnail if available
-            if self.thumbnail_file and os.path.exists(self.thumbnail_file):
-                try:
-                    youtube.thumbnails().set(
-                        videoId=video_id,
-                        media_body=MediaFileUpload(self.thumbnail_file)
-                    ).execute()
-                    print("  Thumbnail uploaded!")
-                except:
-                    print("  Note: Thumbnail upload requires channel verification")
-            
-            # Save upload info
-            self.save_upload_log(video_id, video_url)
-            
             return video_url
             
         except Exception as e:
             print(f"  ERROR uploading to YouTube: {e}")
+            print("  (Run again to continue the upload where it stopped)")
             self.save_metadata_for_manual_upload()
             return None
     
+    def get_upload_queue(self):
+        """The outbox of finished videos waiting for upload"""
+        return make_queue(self.output_folder)
+    
     def generate_metadata(self):
         """Generate video metadata"""
         # Create title
@@ -817,55 +1228,113 @@ Created with Krwutarth's YouTube Automation System
         print(f"  Metadata saved to: {metadata_file}")
         print("  You can use this for manual upload to YouTube Studio")
     
-    def save_upload_log(self, video_id, video_url):
-        """Save upload log"""
-        log_file = os.path.join(self.output_folder, "upload_log.txt")
-        
-        with open(log_file, "a", encoding="utf-8") as f:
-            f.write(f"\n{'=' * 50}\n")
-            f.write(f"Upload: {datetime.datetime.now()}\n")
-            f.write(f"Topic: {self.trending_topic}\n")
-            f.write(f"Video ID: {video_id}\n")
-            f.write(f"URL: {video_url}\n")
-    
     # =========================================
     # MAIN EXECUTION
     # =========================================
-    def run(self):
-        """Run the complete automation pipeline"""
+    def run(self, preview=False, preview_seconds=None, preview_frames=False):
+        """
+        Run the complete automation pipeline
+        
+        With preview=True the pipeline stops after a quick low resolution
+        preview (no thumbnail, no upload).
+        """
         self.print_banner()
         
+        # Every stage is timed and measured (output/runs/<run id>/)
+        self.recorder = RunRecorder("auto_video_creator", self.output_folder, profile=self.profile)
+        
+        success = False
+        try:
+            success = self.run_stages(preview, preview_seconds, preview_frames)
+        finally:
+            total = self.recorder.finish(success)
+            self.save_manifest(total)
+        return success
+    
+    def save_manifest(self, total):
+        """Write runs/<run id>/manifest.json and add the run to the artifact index"""
+        try:
+            index = ArtifactIndex(ARTIFACT_INDEX_FILE)
+            manifest = RunManifest(self.recorder.run_id, "auto_video_creator", self.recorder.run_dir,
+                                   channel=YOUTUBE_CHANNEL)
+            
+            def add(stage, kind, path, keep=False, source=None):
+                manifest.add(stage, kind, path, keep=keep, source=source, index=index)
+            
+            # Fixed names are overwritten by the next run, so keep copies of those
+            add("generate_script", "script", self.script_file, keep=True)
+            add("generate_voiceover", "voiceover", self.voiceover_file, keep=True)
+            if self.captions_file:
+                add("generate_voiceover", "captions", self.captions_file, keep=True)
+                add("generate_voiceover", "captions", os.path.splitext(self.captions_file)[0] + ".vtt", keep=True)
+                add("generate_voiceover", "word_timings",
+                    os.path.join(self.output_folder, "voiceover_words.json"), keep=True)
+            for clip in self.video_clips:
+                match = re.match(r"(pexels_\d+)_", os.path.basename(clip))
+                add("download_video_clips", "clip", clip, source=match.group(1) if match else None)
+            add("assemble_video", "video", self.final_video)
+            if self.edl_file and os.path.exists(self.edl_file):
+                add("assemble_video", "edl", self.edl_file, keep=True)
+            if self.music_track:
+                add("assemble_video", "music", self.music_track)
+            add("create_thumbnail", "thumbnail", self.thumbnail_file, keep=True)
+            if self.youtube_upload:
+                manifest.set_upload(*self.youtube_upload)
+            
+            manifest_file = manifest.save(self.recorder, total, topic=self.trending_topic, index=index)
+            print(f"  Manifest: {manifest_file}")
+        except Exception as e:
+            print(f"  Warning: Could not save the run manifest: {e}")
+    
+    def run_stages(self, preview=False, preview_seconds=None, preview_frames=False):
+        """All pipeline steps, each measured as its own stage"""
+        stage = self.recorder.call
+        
         start_time = datetime.datetime.now()
-        print(f"Started at: {start_time.strftime('%Y-%m-%d %H:%M:%S')}")
+        print(f"Started at: {start_time.strftime('%Y-%m-%d %H:%M:%S')} (run {self.recorder.run_id})")
         
         # Step 1: Discover trends
-        if not self.discover_trends():
+        if not stage("discover_trends", self.discover_trends):
             print("\nERROR: Could not find trending topic!")
             return False
         
         # Step 2: Generate script
-        if not self.generate_script():
+        if not stage("generate_script", self.generate_script):
             print("\nERROR: Could not generate script!")
             return False
         
         # Step 3: Generate voiceover
-        if not self.generate_voiceover():
+        if not stage("generate_voiceover", self.generate_voiceover):
             print("\nERROR: Could not generate voiceover!")
             return False
         
         # Step 4: Download video clips
-        self.download_video_clips()  # Continue even if no clips
+        stage("download_video_clips", self.download_video_clips)  # Continue even if no clips
+        
+        # Preview only: show what the video will look like and stop
+        if preview:
+            preview_file = stage("create_preview", self.create_preview, preview_seconds, frames_only=preview_frames)
+            print(f"\n  Preview: {preview_file}")
+            return preview_file is not None
         
         # Step 5: Assemble video
-        if not self.assemble_video():
+        with self.recorder.stage("assemble_video") as assemble_stage:
+            assembled = self.assemble_video()
+            assemble_stage["ok"] = bool(assembled)
+            if assembled:
+                assemble_stage["frames"] = self.count_frames(self.final_video)
+        if not assembled:
             print("\nERROR: Could not assemble video!")
             return False
         
+        # Remember the topic so it is not made again
+        self.topic_history.record(self.trending_topic, self.final_video)
+        
         # Step 6: Create thumbnail
-        self.create_thumbnail()  # Continue even if fails
+        stage("create_thumbnail", self.create_thumbnail)  # Continue even if fails
         
         # Step 7: Upload to YouTube
-        self.upload_to_youtube()  # Continue even if fails
+        stage("upload_to_youtube", self.upload_to_youtube, background=self.upload_in_background)  # Continue even if fails
         
         # Done!
         end_time = datetime.datetime.now()
@@ -882,12 +1351,36 @@ Created with Krwutarth's YouTube Automation System
         print("=" * 70 + "\n")
         
         return True
+    
+    def count_frames(self, video_file):
+        """Number of frames in a finished video (for the encode speed), or None"""
+        try:
+            return int(ffmpeg_tools.probe_duration(video_file) * VIDEO_FPS)
+        except Exception:
+            return None
 
 
 def main():
     """Main entry point"""
-    automation = YouTubeAutomation()
-    success = automation.run()
+    parser = argparse.ArgumentParser(description="Krwutarth's complete YouTube automation")
+    parser.add_argument("--preview", action="store_true",
+                        help="Only make a quick low resolution preview (no upload)")
+    parser.add_argument("--preview-seconds", type=float,
+                        help="Preview only the first N seconds")
+    parser.add_argument("--preview-frames", action="store_true",
+                        help="Preview as a contact sheet only (one frame per section)")
+    parser.add_argument("--encode-profile", choices=list(encode_profiles.ENCODE_PROFILES),
+                        help=f"Encode profile for this video (default: {ENCODE_PROFILE})")
+    parser.add_argument("--profile", nargs="?", const="cpu", choices=profiling.MODES,
+                        help="Profile every step (cpu, sample or memory; default: cpu) - saved in output/runs")
+    args = parser.parse_args()
+    
+    automation = YouTubeAutomation(encode_profile=args.encode_profile, profile=args.profile)
+    success = automation.run(
+        preview=args.preview or args.preview_frames,
+        preview_seconds=args.preview_seconds,
+        preview_frames=args.preview_frames
+    )
     
     if not success:
         print("\nSome steps failed. Check the errors above.")
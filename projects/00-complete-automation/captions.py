@@ -0,0 +1,182 @@
+"""
+CAPTIONS - SUBTITLES FROM THE VOICEOVER TIMINGS
+===============================================
+Edge TTS tells us exactly when every word is spoken (word boundaries).
+This module turns those timings into caption cues and writes them as
+SRT (for YouTube) and VTT (for web players) files.
+
+Burning captions into the video is done by ffmpeg's 'subtitles' filter
+during the normal render, so it costs seconds instead of minutes.
+If that filter is missing, each cue is drawn ONCE with Pillow and laid
+over the video as a picture.
+"""
+
+import json
+import os
+import string
+
+# Edge TTS reports offsets in 100-nanosecond ticks
+TICKS_PER_SECOND = 10_000_000
+
+SENTENCE_END = (".", "!", "?")
+
+
+def word_from_boundary(chunk):
+    """Convert an Edge TTS WordBoundary chunk into a simple word dict"""
+    start = chunk["offset"] / TICKS_PER_SECOND
+    end = (chunk["offset"] + chunk["duration"]) / TICKS_PER_SECOND
+    return {"text": chunk["text"], "start": round(start, 3), "end": round(end, 3)}
+
+
+def save_words(words, path):
+    """Save word timings as JSON (reused later for the music bed)"""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(words, f)
+    return path
+
+
+def load_words(path):
+    """Load word timings saved by save_words()"""
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def build_cues(words, max_chars=42, max_duration=3.5, max_gap=0.6, min_duration=0.8):
+    """
+    Group words into caption cues.
+
+    A new cue starts when the line would get too long, too slow,
+    after a pause, or after the end of a sentence.
+    """
+    cues = []
+    current = []
+
+    def flush():
+        if current:
+            cues.append({
+                "start": current[0]["start"],
+                "end": current[-1]["end"],
+                "text": " ".join(w["text"] for w in current)
+            })
+            current.clear()
+
+    for word in words:
+        text = word["text"].strip()
+        if not text:
+            continue
+
+        # Punctuation marks belong to the word before them
+        if all(ch in string.punctuation for ch in text):
+            if current:
+                current[-1] = dict(current[-1], text=current[-1]["text"] + text)
+            continue
+
+        if current:
+            line = " ".join(w["text"] for w in current) + " " + text
+            too_long = len(line) > max_chars
+            too_slow = word["end"] - current[0]["start"] > max_duration
+            paused = word["start"] - current[-1]["end"] > max_gap
+            sentence_done = current[-1]["text"].endswith(SENTENCE_END)
+            if too_long or too_slow or paused or sentence_done:
+                flush()
+
+        current.append({"text": text, "start": word["start"], "end": word["end"]})
+
+    flush()
+
+    # Keep very short cues on screen long enough to read
+    for i, cue in enumerate(cues):
+        next_start = cues[i + 1]["start"] if i + 1 < len(cues) else None
+        end = max(cue["end"], cue["start"] + min_duration)
+        if next_start is not None:
+            end = min(end, next_start)
+        cue["end"] = round(end, 3)
+
+    return cues
+
+
+def format_timestamp(seconds, separator=","):
+    """Format seconds as HH:MM:SS,mmm (SRT) or HH:MM:SS.mmm (VTT)"""
+    millis = int(round(seconds * 1000))
+    hours, millis = divmod(millis, 3_600_000)
+    minutes, millis = divmod(millis, 60_000)
+    secs, millis = divmod(millis, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}{separator}{millis:03d}"
+
+
+def write_srt(cues, path):
+    """Write cues as an SRT subtitle file"""
+    with open(path, "w", encoding="utf-8") as f:
+        for i, cue in enumerate(cues, start=1):
+            f.write(f"{i}\n")
+            f.write(f"{format_timestamp(cue['start'])} --> {format_timestamp(cue['end'])}\n")
+            f.write(f"{cue['text']}\n\n")
+    return path
+
+
+def write_vtt(cues, path):
+    """Write cues as a WebVTT subtitle file"""
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("WEBVTT\n\n")
+        for cue in cues:
+            start = format_timestamp(cue["start"], ".")
+            end = format_timestamp(cue["end"], ".")
+            f.write(f"{start} --> {end}\n{cue['text']}\n\n")
+    return path
+
+
+def render_cue_images(cues, width, font_size, out_dir):
+    """
+    Draw every cue ONCE as a transparent PNG with Pillow.
+
+    Returns a list of (png_path, start, end). Used when ffmpeg has no
+    'subtitles' filter - MoviePy then only pastes finished pictures.
+    """
+    from PIL import Image, ImageDraw, ImageFont
+
+    os.makedirs(out_dir, exist_ok=True)
+    try:
+        font = ImageFont.truetype("arial.ttf", font_size)
+    except Exception:
+        try:
+            font = ImageFont.truetype("DejaVuSans-Bold.ttf", font_size)
+        except Exception:
+            font = ImageFont.load_default()
+
+    # Glyph cache: each distinct cue text is only drawn once
+    rendered = {}
+    images = []
+    scratch = ImageDraw.Draw(Image.new("RGBA", (1, 1)))
+
+    for cue in cues:
+        text = cue["text"]
+        if text not in rendered:
+            bbox = scratch.textbbox((0, 0), text, font=font, stroke_width=3)
+            text_w = min(bbox[2] - bbox[0] + 20, width)
+            text_h = bbox[3] - bbox[1] + 20
+            img = Image.new("RGBA", (text_w, text_h), (0, 0, 0, 0))
+            draw = ImageDraw.Draw(img)
+            draw.text(
+                (text_w // 2, text_h // 2), text, font=font, anchor="mm",
+                fill=(255, 255, 255, 255), stroke_width=3, stroke_fill=(0, 0, 0, 255)
+            )
+            png_path = os.path.join(out_dir, f"cue_{len(rendered) + 1}.png")
+            img.save(png_path)
+            rendered[text] = png_path
+        images.append((rendered[text], cue["start"], cue["end"]))
+
+    return images
+
+
+def slice_cues(cues, start, end):
+    """Cues visible between start and end, shifted so start becomes 0"""
+    sliced = []
+    for cue in cues:
+        if cue["end"] <= start or cue["start"] >= end:
+            continue
+        sliced.append({
+            "start": round(max(cue["start"], start) - start, 3),
+            "end": round(min(cue["end"], end) - start, 3),
+            "text": cue["text"]
+        })
+    return sliced
@@ -49,6 +49,10 @@ PEXELS_API_KEY = "YOUR_PEXELS_API_KEY_HERE"
 # YouTube client secrets file (download from Google Cloud Console)
 YOUTUBE_CLIENT_SECRETS = "client_secrets.json"
 
+# Name for this channel's YouTube login (saved as tokens/<name>.json)
+# Use a different name for every channel you upload to
+YOUTUBE_CHANNEL = "main"
+
 # ===========================================
 # OLLAMA SETTINGS (LOCAL AI)
 # ===========================================
@@ -73,6 +77,28 @@ YOUTUBE_CATEGORY = "27"
 # Default tags for all videos
 DEFAULT_TAGS = ["facts", "amazing facts", "did you know", "interesting", "education"]
 
+# Upload in pieces of this many MB (bigger = faster on good internet)
+UPLOAD_CHUNK_MB = 32
+
+# How many times in a row to retry a failed piece before giving up
+UPLOAD_MAX_RETRIES = 8
+
+# Where videos are uploaded (only change this to test with fake_upload_server.py)
+YOUTUBE_UPLOAD_URL = "https://www.googleapis.com/upload/youtube/v3/videos"
+
+# ===========================================
+# UPLOAD QUEUE SETTINGS
+# ===========================================
+# Let the scheduler upload in the background while the next video renders
+# (finished videos wait in output/outbox until they are uploaded)
+UPLOAD_IN_BACKGROUND = True
+
+# How many uploads (videos, thumbnails, captions) at the same time
+UPLOAD_CONCURRENCY = 2
+
+# YouTube API units per day (a video costs 1600, so about 6 videos a day)
+YOUTUBE_DAILY_QUOTA = 10000
+
 # ===========================================
 # SCHEDULING SETTINGS
 # ===========================================
@@ -83,11 +109,192 @@ VIDEOS_PER_DAY = 1
 SCHEDULE_HOUR = 10
 SCHEDULE_MINUTE = 0
 
+# Live numbers for monitoring tools at http://localhost:<port>/metrics
+# (e.g. 9464; None = off)
+METRICS_PORT = None
+
+# Who can open the metrics page? "127.0.0.1" = only this computer.
+# Use "0.0.0.0" only if a monitoring tool on another machine needs it
+# (anyone on your network can then read the numbers)
+METRICS_HOST = "127.0.0.1"
+
 # ===========================================
 # TREND DISCOVERY SETTINGS
 # ===========================================
 # Country for trends (US, GB, IN, etc.)
 TREND_COUNTRY = "US"
 
+# All countries to check for trends (your country first)
+# Known codes: US, GB, CA, AU, IN, DE, FR, JP, BR, MX
+TREND_REGIONS = [TREND_COUNTRY, "GB", "CA", "AU"]
+
+# How long to remember trends before asking Google again (minutes)
+TREND_CACHE_MINUTES = 60
+
+# Your own topic ideas, one per line (optional)
+TOPICS_FILE = "topics.txt"
+
+# Offline test data instead of Google Trends (None = use the internet)
+TREND_FIXTURE_FILE = None
+
 # How many trending topics to check?
 NUM_TRENDS_TO_CHECK = 20
+
+# How well a trend must fit your niche (0 = anything, 1 = perfect match)
+# Below this, one of your niche's own topic ideas is used instead
+RELEVANCE_MIN_SCORE = 0.25
+
+# Also compare trends by meaning, not just keywords (a bit smarter, still instant)
+RELEVANCE_USE_SIMILARITY = True
+
+# Topics you already made are remembered here (one file per YOUTUBE_CHANNEL,
+# shared with the starter projects and master_automation.py)
+TOPIC_HISTORY_FOLDER = "topic_history"
+
+# How similar a new topic may be to an old one (0.6 = 60% the same words)
+TOPIC_SIMILARITY_LIMIT = 0.6
+
+# ===========================================
+# CAPTION SETTINGS
+# ===========================================
+# Make subtitles from the voiceover word timings?
+CAPTIONS_ENABLED = True
+
+# Draw the captions onto the video itself (burn-in)?
+CAPTIONS_BURN_IN = True
+
+# Upload the captions file to YouTube as a subtitle track?
+# (needs the "youtube.force-ssl" permission - you are asked to log in again once)
+CAPTIONS_UPLOAD = True
+
+# Caption language code and size (18 looks good at 1080p)
+CAPTIONS_LANGUAGE = "en"
+CAPTION_FONT_SIZE = 18
+
+# Maximum characters on one caption line
+CAPTION_MAX_CHARS = 42
+
+# Frames per second for a still-picture video with burned-in captions.
+# The picture never moves, so a few frames a second is plenty and encodes
+# much faster than VIDEO_FPS (captions change at most this often)
+STILL_CAPTION_FPS = 5
+
+# ===========================================
+# MUSIC SETTINGS
+# ===========================================
+# Put royalty-free music (mp3, wav, m4a, ogg, flac) in this folder and every
+# video gets a quiet music bed under the voice. No files here = no music.
+# (Free tracks: YouTube Studio -> Audio Library)
+MUSIC_FOLDER = "music"
+
+# Music volume in the pauses (1.0 = as loud as the file) and while the voice speaks
+MUSIC_VOLUME = 0.25
+MUSIC_DUCKED_VOLUME = 0.06
+
+# Seconds the music takes to get quiet before the voice starts / to come back after
+MUSIC_DUCK_ATTACK = 0.15
+MUSIC_DUCK_RELEASE = 0.6
+
+# Fade the music in at the start and out at the end (seconds)
+MUSIC_FADE_SECONDS = 2.0
+
+# ===========================================
+# CACHE SETTINGS
+# ===========================================
+# Where reusable backgrounds are stored (None = shared folder in your user folder)
+ASSET_CACHE_FOLDER = None
+
+# ===========================================
+# ARTIFACT INDEX SETTINGS
+# ===========================================
+# Database of every run and the files it made (None = shared file in your user folder)
+# Ask it questions with: python artifact_index.py runs
+ARTIFACT_INDEX_FILE = None
+
+# ===========================================
+# CLEANUP SETTINGS (RETENTION)
+# ===========================================
+# Delete files that are no longer needed while the scheduler waits?
+# See what would go with: python retention.py --dry-run
+RETENTION_ENABLED = True
+
+# Keep finished videos this many days after they are on YouTube
+KEEP_VIDEOS_DAYS_AFTER_UPLOAD = 7
+
+# Keep videos that were never uploaded this many days (None = forever)
+KEEP_UNUPLOADED_VIDEOS_DAYS = 30
+
+# Delete voiceovers (and word timings) as soon as the video is on YouTube
+DELETE_INTERMEDIATES_AFTER_UPLOAD = True
+
+# Keep downloaded clips this many days after the last video that used them
+KEEP_CLIPS_DAYS = 14
+
+# Keep cached backgrounds this many days after they were last used
+KEEP_BACKGROUNDS_DAYS = 30
+
+# Keep cached video sections and music mixes this many days after they were last used
+KEEP_SEGMENTS_DAYS = 7
+
+# Seconds of cleanup each time the scheduler is waiting (small = never in the way)
+RETENTION_SECONDS_PER_PASS = 20
+
+# ===========================================
+# ENCODE SETTINGS
+# ===========================================
+# How hard should the video encoder work?
+# - "draft"    fastest, for quick previews
+# - "fast"     quick daily uploads
+# - "balanced" good quality, sensible speed
+# - "archival" best quality, slowest
+# Run "python encode_benchmark.py" to see the speed of each on your computer
+ENCODE_PROFILE = "balanced"
+
+# Create this file to use another profile for only the NEXT scheduled video
+# Write the profile name in it, e.g. archival (scheduler.py --encode-profile
+# changes it for every video instead)
+ENCODE_PROFILE_TRIGGER_FILE = "encode_profile_next_run.txt"
+
+# ===========================================
+# PREVIEW SETTINGS
+# ===========================================
+# Quick previews (python auto_video_creator.py --preview) use these
+PREVIEW_WIDTH = 854
+PREVIEW_HEIGHT = 480
+PREVIEW_FPS = 15
+PREVIEW_PROFILE = "draft"
+
+# ===========================================
+# RENDER SETTINGS
+# ===========================================
+# How many sections to render at the same time (0 = one per CPU core)
+# Memory does not grow with video length, but it DOES grow with workers:
+# every worker holds its own clip decoder and frame buffers (roughly
+# 60-100 MB each at 720p), so peak memory is about that times the number
+# of workers. 0 on a 16-core computer can mean over 1 GB.
+# Use 1 on computers with very little memory (one clip open at a time).
+RENDER_WORKERS = 0
+
+# Shortest piece of unused footage worth cutting to instead of looping a clip
+MIN_ALTERNATE_SECONDS = 1.0
+
+# Which renderer turns the edit (saved as <video>.edl.json) into a video
+# - "segments" MoviePy renders sections side by side (default)
+# - "ffmpeg"   one ffmpeg command, no MoviePy (needs ffmpeg's subtitles filter for captions)
+RENDER_BACKEND = "segments"
+
+# Reuse earlier renders? A video whose edit did not change is not rendered
+# again, and after a small fix only the changed sections are rendered
+# (rendered sections are kept in the cache folder, see ASSET_CACHE_FOLDER)
+RENDER_CACHE = True
+
+# ===========================================
+# PROFILING SETTINGS
+# ===========================================
+# Profile every run to find slow code? (saved in output/runs/<run>/profiles)
+# None = off, "cpu", "sample" (almost no slowdown) or "memory"
+PROFILE_MODE = None
+
+# Create this file to profile only the NEXT scheduled video, no restart needed
+# Write cpu, sample or memory in it (an empty file means cpu)
+PROFILE_TRIGGER_FILE = "profile_next_run.txt"
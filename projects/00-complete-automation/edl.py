@@ -0,0 +1,634 @@
+"""
+EDIT DECISION LIST (EDL) - THE EDIT AS A FILE
+=============================================
+Assembling a video happens in two steps:
+
+1. PLANNING writes down the whole edit as a small JSON file: which
+   clip plays when (in/out points), how it is transformed, which audio
+   tracks play (voiceover, music with its ducking), and the captions.
+2. RENDERING turns that file into a video.
+
+Because the edit is a file, it can be saved next to the video, looked
+at, compared with yesterday's, and rendered by a different backend:
+
+- "segments"  every section rendered by MoviePy in its own worker,
+              joined by stream copy (see parallel_render.py) - default
+- "ffmpeg"    one ffmpeg command for the whole video, no MoviePy
+
+Every EDL has a hash of everything that changes the picture or sound
+(including the CONTENT of the clips and voiceover, not just their
+names). When a video with the same hash was already rendered, it is
+reused instead of rendered again. The segments backend also caches
+every rendered section by its own hash, so after a small fix only the
+sections that changed are rendered; the rest are joined by stream copy.
+
+    python edl.py show output/video_20240101_120000.edl.json
+    python edl.py diff old.edl.json new.edl.json
+    python edl.py render my.edl.json video.mp4 --backend ffmpeg
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+
+import captions
+import encode_profiles
+import ffmpeg_tools
+import music
+import parallel_render
+from artifact_index import file_hash
+from asset_cache import MixCache, SegmentCache
+
+EDL_VERSION = 1
+
+# Saved next to the video: video_20240101_120000.mp4 -> video_20240101_120000.edl.json
+EDL_SUFFIX = ".edl.json"
+
+# Times are stored in milliseconds precision, so the same edit always hashes the same
+TIME_DIGITS = 3
+
+# Subtitle font sizes are measured against a 288 pixel tall screen
+SUBTITLE_SCREEN_HEIGHT = 288
+
+# Section cache keys round times to 10 ms: the same section moved along the
+# timeline (after an earlier section got longer) still finds its cached render
+KEY_DIGITS = 2
+
+# Bump when segment rendering changes, so old cached sections are not reused
+SEGMENT_FORMAT = 1
+
+# Content hashes of input files this process already read: (path, size, mtime) -> sha256
+_hash_memo = {}
+
+
+def _seconds(value):
+    return round(float(value), TIME_DIGITS)
+
+
+def _fingerprint(path):
+    """Content hash and size of one input file"""
+    stat = os.stat(path)
+    key = (path, stat.st_size, stat.st_mtime_ns)
+    if key not in _hash_memo:
+        _hash_memo[key] = file_hash(path)
+    return {"sha256": _hash_memo[key], "bytes": stat.st_size}
+
+
+def build_edl(plan, audio_file, width, height, fps, profile, cues=None, caption_font_size=18):
+    """
+    Write an edit plan (see plan_clips in auto_video_creator.py) down as an EDL.
+
+    cues are the captions to burn in (None = no captions on the picture).
+    """
+    video = []
+    for entry in plan:
+        item = {
+            "section": entry.get("section", len(video) + 1),
+            "start": _seconds(entry["start"]),
+            "source": os.path.abspath(entry["source"]),
+            "in": _seconds(entry["in"]),
+            "out": _seconds(entry["in"] + entry["duration"]),
+            "transforms": [{"resize": [width, height]}],
+        }
+        if entry.get("loop"):
+            # Plays the source from the start again; loop_of is the piece already showing it
+            item["loop"] = True
+            item["loop_of"] = entry.get("loop_of")
+        video.append(item)
+
+    edl = {
+        "version": EDL_VERSION,
+        "output": {
+            "width": width,
+            "height": height,
+            "fps": fps,
+            "encode": encode_profiles.get_profile(profile),
+        },
+        "duration": _seconds(sum(item["out"] - item["in"] for item in video)),
+        "video": video,
+        "audio": [{"source": os.path.abspath(audio_file), "role": "voice", "start": 0.0, "gain": 1.0}],
+        "captions": None,
+    }
+    if cues:
+        edl["captions"] = {
+            "font_size": caption_font_size,
+            "cues": [{"start": _seconds(c["start"]), "end": _seconds(c["end"]), "text": c["text"]}
+                     for c in cues],
+        }
+
+    sources = {item["source"] for item in video} | {track["source"] for track in edl["audio"]}
+    edl["inputs"] = {path: _fingerprint(path) for path in sorted(sources)}
+    edl["hash"] = edl_hash(edl)
+    return edl
+
+
+def _content_view(edl):
+    """The EDL with every source replaced by its content hash"""
+    inputs = edl.get("inputs", {})
+
+    def content(path):
+        return inputs[path]["sha256"] if path in inputs else path
+
+    view = {key: value for key, value in edl.items() if key not in ("hash", "inputs", "rendered")}
+    view["video"] = [dict(item, source=content(item["source"])) for item in edl["video"]]
+    view["audio"] = [dict(track, source=content(track["source"])) for track in edl["audio"]]
+    return view
+
+
+def edl_hash(edl):
+    """
+    Hash of everything that changes the rendered video.
+
+    Sources count by their content, so a renamed clip hashes the same and
+    a clip replaced under the same name does not.
+    """
+    text = json.dumps(_content_view(edl), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def sidecar_path(video_path):
+    """Where the EDL of a video is saved"""
+    return os.path.splitext(str(video_path))[0] + EDL_SUFFIX
+
+
+def save_edl(edl, path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(edl, f, indent=2)
+    return path
+
+
+def load_edl(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def mark_rendered(edl, video_path):
+    """Save the EDL next to its freshly rendered video"""
+    stat = os.stat(video_path)
+    edl["rendered"] = {
+        "file": os.path.abspath(video_path),
+        "bytes": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+    }
+    return save_edl(edl, sidecar_path(video_path))
+
+
+def find_render(edl, folder):
+    """
+    A video in folder rendered from an EDL with the same hash (or None).
+
+    The video must still be exactly the file that was rendered.
+    """
+    try:
+        names = sorted(os.listdir(folder), reverse=True)
+    except OSError:
+        return None
+
+    for name in names:
+        if not name.endswith(EDL_SUFFIX):
+            continue
+        try:
+            saved = load_edl(os.path.join(folder, name))
+            rendered = saved.get("rendered")
+            if saved.get("hash") != edl["hash"] or not rendered:
+                continue
+            stat = os.stat(rendered["file"])
+        except (OSError, ValueError, KeyError):
+            continue
+        if stat.st_size == rendered["bytes"] and stat.st_mtime_ns == rendered["mtime_ns"]:
+            return rendered["file"]
+    return None
+
+
+def add_audio_track(edl, track):
+    """Add an audio track (e.g. music.music_track) to a built EDL"""
+    edl["audio"].append(track)
+    edl["inputs"][track["source"]] = _fingerprint(track["source"])
+    edl["hash"] = edl_hash(edl)
+    return edl
+
+
+def render_audio(edl, mix_cache=None):
+    """
+    The one audio stream the backends mux under the picture: the
+    voiceover, or the voiceover mixed with the music (made once, cached).
+    """
+    voices = [t for t in edl["audio"] if t.get("role") != "music"]
+    music_tracks = [t for t in edl["audio"] if t.get("role") == "music"]
+    if len(voices) != 1 or voices[0]["start"] or voices[0]["gain"] != 1.0 or len(music_tracks) > 1:
+        raise ValueError("Backends play one voice track (plus at most one music track)")
+
+    voice = voices[0]["source"]
+    if not music_tracks:
+        return voice
+
+    track = music_tracks[0]
+    inputs = edl["inputs"]
+    key = music.mix_key(inputs[voice]["sha256"], inputs[track["source"]]["sha256"], track, edl["duration"])
+    return music.mix(voice, track, edl["duration"], key, mix_cache)
+
+
+def _size(item, edl):
+    for transform in item.get("transforms", []):
+        if "resize" in transform:
+            return tuple(transform["resize"])
+    return edl["output"]["width"], edl["output"]["height"]
+
+
+def segment_key(edl, item, segment_cues, base=False):
+    """
+    Cache key of one rendered piece: the clip content, in/out points,
+    transforms, encode settings and the captions shown on it.
+
+    base=True is the key of the caption-free single pass of a looped
+    piece (see render_with_segments).
+    """
+    digits = KEY_DIGITS
+    content = edl.get("inputs", {}).get(item["source"], {}).get("sha256", item["source"])
+    key = {
+        "format": SEGMENT_FORMAT,
+        "source": content,
+        "in": round(item["in"], digits),
+        "duration": round(item["out"] - item["in"], digits),
+        "loop": "base" if base else item.get("loop", False),
+        "transforms": item.get("transforms", []),
+        "fps": edl["output"]["fps"],
+        "encode": edl["output"]["encode"],
+        "captions": None,
+    }
+    if segment_cues is not None:
+        key["captions"] = {
+            "font_size": edl["captions"]["font_size"],
+            "cues": [[round(c["start"], digits), round(c["end"], digits), c["text"]] for c in segment_cues],
+        }
+    text = json.dumps(key, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def piece_cues(edl, item):
+    """Captions shown on one piece, shifted so the piece starts at 0 (None = no captions)"""
+    if not edl.get("captions") or not edl["captions"]["cues"]:
+        return None
+    start = item["start"]
+    return captions.slice_cues(edl["captions"]["cues"], start, start + item["out"] - item["in"])
+
+
+def _font_px(edl):
+    return int(edl["captions"]["font_size"] * edl["output"]["height"] / SUBTITLE_SCREEN_HEIGHT)
+
+
+# ===========================================
+# BACKEND: SEGMENTS (MoviePy workers)
+# ===========================================
+
+def segment_jobs(edl, work_dir):
+    """Turn every EDL piece into a job for the segment workers"""
+    out = edl["output"]
+    cues = edl["captions"]["cues"] if edl.get("captions") else None
+    use_subtitles_filter = bool(cues) and ffmpeg_tools.has_filter("subtitles")
+
+    # Without the subtitles filter, draw every caption once up front
+    cue_images = []
+    if cues and not use_subtitles_filter:
+        try:
+            cue_images = captions.render_cue_images(
+                cues, out["width"], _font_px(edl), os.path.join(work_dir, "caption_images")
+            )
+        except ImportError:
+            print("  Warning: Pillow not available - captions not burned in")
+
+    jobs = []
+    for index, item in enumerate(edl["video"]):
+        seg_start = item["start"]
+        duration = item["out"] - item["in"]
+        seg_end = seg_start + duration
+        segment_cues = piece_cues(edl, item)
+        job = {
+            "index": index,
+            "section": item["section"],
+            "source": item["source"],
+            "in": item["in"],
+            "duration": duration,
+            "loop": item.get("loop", False),
+            "output": os.path.join(work_dir, f"segment_{index:03d}.mp4"),
+            "size": _size(item, edl),
+            "fps": out["fps"],
+            "profile": out["encode"]["name"],
+            "cache_key": segment_key(edl, item, segment_cues),
+        }
+
+        if use_subtitles_filter and segment_cues:
+            # Each segment starts at 0, so it gets its own shifted captions
+            # (none for a piece without captions: ffmpeg refuses an empty file)
+            srt_file = os.path.join(work_dir, f"segment_{index:03d}.srt")
+            captions.write_srt(segment_cues, srt_file)
+            job["subtitles_file"] = srt_file
+            job["subtitles_filter"] = ffmpeg_tools.subtitles_filter(srt_file, edl["captions"]["font_size"])
+        elif cue_images:
+            job["caption_images"] = [
+                (png, max(start, seg_start) - seg_start, min(end, seg_end) - seg_start)
+                for png, start, end in cue_images
+                if end > seg_start and start < seg_end
+            ]
+            job["caption_y"] = out["height"] - _font_px(edl) * 3
+
+        jobs.append(job)
+
+    return jobs
+
+
+def _has_captions(job):
+    return bool(job.get("subtitles_file") or job.get("caption_images"))
+
+
+def _base_job(edl, job):
+    """The caption-free, unlooped render of a looped piece's clip"""
+    item = edl["video"][job["index"]]
+    base = {key: value for key, value in job.items()
+            if key not in ("subtitles_file", "subtitles_filter", "caption_images", "caption_y")}
+    base.update(
+        loop=False,
+        output=os.path.join(os.path.dirname(job["output"]), f"segment_{job['index']:03d}_base.mp4"),
+        cache_key=segment_key(edl, item, None, base=True),
+    )
+    return base
+
+
+def render_with_segments(edl, output_path, audio, work_dir=None, workers=0, segment_cache=None):
+    """
+    Render every section in a worker process, then join the segments by
+    stream copy with the audio. Returns None if no clip worked.
+
+    With a segment_cache (asset_cache.SegmentCache) only sections that
+    changed since an earlier render are rendered; the rest are copied.
+
+    Looped pieces never loop inside MoviePy: the clip is rendered once
+    without captions, repeated by stream copy, and only then are the
+    captions (if any) burned in. Raises RuntimeError if a looped piece
+    cannot be made at all (the video would come out too short).
+    """
+    work_dir = work_dir or os.path.splitext(output_path)[0] + "_segments"
+    os.makedirs(work_dir, exist_ok=True)
+
+    def render_pass(pass_jobs):
+        # Render jobs and cache the results; returns {cache_key: file}
+        results = parallel_render.render_segments(pass_jobs, workers=workers) if pass_jobs else []
+        made = {}
+        for job, path in zip(pass_jobs, results):
+            if path:
+                made[job["cache_key"]] = segment_cache.put(job["cache_key"], path) if segment_cache else path
+        return made
+
+    base_files = {}
+
+    def missing_bases(loop_jobs):
+        # Base renders the loops still need (cached ones are looked up)
+        wanted = {}
+        for job in loop_jobs:
+            base = _base_job(edl, job)
+            key = base["cache_key"]
+            if key in base_files or key in wanted:
+                continue
+            cached = segment_cache.get(key) if segment_cache else None
+            if cached:
+                base_files[key] = cached
+            else:
+                wanted[key] = base
+        return list(wanted.values())
+
+    try:
+        jobs = segment_jobs(edl, work_dir)
+        # Loops without captions are a cheap stream copy, never cached
+        cacheable = [job for job in jobs if not job["loop"] or _has_captions(job)]
+        rendered = {}
+        if segment_cache:
+            for job in cacheable:
+                cached = segment_cache.get(job["cache_key"])
+                if cached:
+                    rendered[job["index"]] = cached
+            print(f"  {len(rendered)}/{len(cacheable)} pieces unchanged (from the segment cache), "
+                  f"rendering {len(cacheable) - len(rendered)}")
+
+        todo = [job for job in jobs if job["index"] not in rendered]
+        plain = [job for job in todo if not job["loop"]]
+        loops = [job for job in todo if job["loop"]]
+
+        made = render_pass(plain + missing_bases([job for job in loops if _has_captions(job)]))
+        base_files.update(made)
+        for job in plain:
+            if job["cache_key"] in made:
+                rendered[job["index"]] = made[job["cache_key"]]
+
+        # Loops without captions repeat the piece they loop. If that piece
+        # failed, their clip is rendered once on its own instead
+        for job in loops:
+            loop_of = edl["video"][job["index"]].get("loop_of")
+            if not _has_captions(job) and loop_of in rendered:
+                base_files[_base_job(edl, job)["cache_key"]] = rendered[loop_of]
+        base_files.update(render_pass(missing_bases([job for job in loops if not _has_captions(job)])))
+
+        caption_jobs = []
+        repeated = {}
+        for job in loops:
+            base = base_files.get(_base_job(edl, job)["cache_key"])
+            if not base:
+                raise RuntimeError(f"Could not render the looped clip of section {job['section']}")
+            looped = os.path.join(work_dir, f"segment_{job['index']:03d}_loop.mp4")
+            ffmpeg_tools.repeat_segment(base, job["duration"], looped)
+            repeated[job["index"]] = looped
+            if _has_captions(job):
+                caption_job = dict(job, source=looped, loop=False)
+                caption_job["in"] = 0.0
+                caption_jobs.append(caption_job)
+
+        made = render_pass(caption_jobs)
+        for job in loops:
+            # A failed caption pass still keeps the picture (and the timing)
+            rendered[job["index"]] = made.get(job["cache_key"], repeated[job["index"]])
+
+        segments = [rendered[index] for index in range(len(edl["video"])) if index in rendered]
+
+        if not segments:
+            return None
+
+        ffmpeg_tools.concat_segments(segments, audio, output_path, edl["duration"])
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    return output_path
+
+
+# ===========================================
+# BACKEND: FFMPEG (one command, no MoviePy)
+# ===========================================
+
+def render_with_ffmpeg(edl, output_path, audio, work_dir=None, workers=0, segment_cache=None):
+    """
+    Render the whole EDL with a single ffmpeg filter graph (one encode,
+    so there are no sections to cache).
+
+    Captions need ffmpeg's 'subtitles' filter here (RuntimeError without it).
+    """
+    out = edl["output"]
+    fps = out["fps"]
+    args = []
+    filters = []
+
+    for i, item in enumerate(edl["video"]):
+        duration = item["out"] - item["in"]
+        if item.get("loop"):
+            args += ["-stream_loop", "-1", "-t", f"{duration:.3f}", "-i", item["source"]]
+        else:
+            args += ["-ss", f"{item['in']:.3f}", "-t", f"{duration:.3f}", "-i", item["source"]]
+        width, height = _size(item, edl)
+        filters.append(
+            f"[{i}:v]scale={width}:{height},setsar=1,fps={fps},"
+            f"trim=duration={duration:.3f},setpts=PTS-STARTPTS[v{i}]"
+        )
+
+    if not filters:
+        return None
+
+    pieces = "".join(f"[v{i}]" for i in range(len(filters)))
+    filters.append(f"{pieces}concat=n={len(filters)}:v=1:a=0[video]")
+    picture = "[video]"
+
+    srt_file = None
+    if edl.get("captions"):
+        if not ffmpeg_tools.has_filter("subtitles"):
+            raise RuntimeError("This ffmpeg has no 'subtitles' filter - use the segments backend for captions")
+        srt_file = os.path.splitext(output_path)[0] + ".edl.srt"
+        captions.write_srt(edl["captions"]["cues"], srt_file)
+        filters.append(f"[video]{ffmpeg_tools.subtitles_filter(srt_file, edl['captions']['font_size'])}[captioned]")
+        picture = "[captioned]"
+
+    args += ["-i", audio]
+    args += ["-filter_complex", ";".join(filters), "-map", picture, "-map", f"{len(edl['video'])}:a"]
+    args += encode_profiles.ffmpeg_args(out["encode"]["name"], fps)
+    args += ["-c:a", "aac", "-b:a", "192k", "-t", f"{edl['duration']:.3f}",
+             "-movflags", "+faststart", output_path]
+
+    try:
+        ffmpeg_tools.run_ffmpeg(args)
+    finally:
+        if srt_file and os.path.exists(srt_file):
+            os.remove(srt_file)
+    return output_path
+
+
+BACKENDS = {
+    "segments": render_with_segments,
+    "ffmpeg": render_with_ffmpeg,
+}
+
+
+def render(edl, output_path, backend="segments", work_dir=None, workers=0, segment_cache=None,
+           mix_cache=None):
+    """Render an EDL with one of the BACKENDS (returns None if nothing could be rendered)"""
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown render backend '{backend}' (choose from: {', '.join(BACKENDS)})")
+    audio = render_audio(edl, mix_cache)
+    return BACKENDS[backend](edl, output_path, audio, work_dir=work_dir, workers=workers,
+                             segment_cache=segment_cache)
+
+
+# ===========================================
+# COMMAND LINE
+# ===========================================
+
+def describe(edl):
+    """Short text summary of an EDL"""
+    out = edl["output"]
+    sections = sorted({item["section"] for item in edl["video"]})
+    lines = [
+        f"  Hash:     {edl['hash'][:16]}",
+        f"  Output:   {out['width']}x{out['height']} @ {out['fps']}fps, {out['encode']['name']} profile",
+        f"  Length:   {edl['duration']:.1f}s in {len(sections)} sections ({len(edl['video'])} pieces)",
+        f"  Audio:    {', '.join(os.path.basename(t['source']) for t in edl['audio'])}",
+        f"  Captions: {len(edl['captions']['cues']) if edl.get('captions') else 0} cues",
+    ]
+    if edl.get("rendered"):
+        lines.append(f"  Rendered: {edl['rendered']['file']}")
+    for item in edl["video"]:
+        loop = " (loop)" if item.get("loop") else ""
+        lines.append(f"    {item['start']:8.2f}s  section {item['section']:<3} "
+                     f"{os.path.basename(item['source'])} {item['in']:.2f}-{item['out']:.2f}{loop}")
+    return "\n".join(lines)
+
+
+def changed_sections(old, new):
+    """
+    Sections that differ between two EDLs: the segment cache keys of their
+    pieces (clip content, in/out points, transforms, encoding and the
+    captions shown on them - see segment_key), or the sound under them
+    (voiceover and music content and mix settings).
+
+    A section that only moved along the timeline is not changed: its
+    cached render is reused as it is.
+    """
+    def sections(edl):
+        # The audio is one stream over the whole video, so any change to
+        # it changes every section
+        audio = _content_view(edl)["audio"]
+        by_section = {}
+        for item in edl["video"]:
+            section = by_section.setdefault(item["section"], {"pieces": [], "audio": audio})
+            section["pieces"].append(segment_key(edl, item, piece_cues(edl, item)))
+        return by_section
+
+    old_sections, new_sections = sections(old), sections(new)
+    return sorted(s for s in set(old_sections) | set(new_sections)
+                  if old_sections.get(s) != new_sections.get(s))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Look at, compare and render edit decision lists")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    show = commands.add_parser("show", help="Summary of an EDL")
+    show.add_argument("file")
+
+    diff = commands.add_parser("diff", help="What changed between two EDLs")
+    diff.add_argument("old")
+    diff.add_argument("new")
+
+    render_cmd = commands.add_parser("render", help="Render an EDL to a video")
+    render_cmd.add_argument("file")
+    render_cmd.add_argument("output")
+    render_cmd.add_argument("--backend", choices=sorted(BACKENDS), default="segments")
+    render_cmd.add_argument("--workers", type=int, default=0)
+    render_cmd.add_argument("--no-cache", action="store_true", help="Render every section again")
+
+    args = parser.parse_args()
+
+    if args.command == "show":
+        print(describe(load_edl(args.file)))
+
+    elif args.command == "diff":
+        old, new = load_edl(args.old), load_edl(args.new)
+        if old["hash"] == new["hash"]:
+            print("  Same edit - the video would not change")
+            return
+        sections = changed_sections(old, new)
+        print(f"  Changed sections: {', '.join(map(str, sections)) or 'none'}")
+        old_view, new_view = _content_view(old), _content_view(new)
+        for key in ("output", "audio", "captions", "duration"):
+            if old_view.get(key) != new_view.get(key):
+                print(f"  Changed: {key}")
+
+    elif args.command == "render":
+        edl = load_edl(args.file)
+        segment_cache = None if args.no_cache else SegmentCache()
+        output = render(edl, args.output, backend=args.backend, workers=args.workers,
+                        segment_cache=segment_cache, mix_cache=MixCache())
+        if not output:
+            print("  ERROR: Nothing could be rendered")
+            raise SystemExit(1)
+        mark_rendered(edl, output)
+        print(f"  Video saved: {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+ENCODE PROFILE BENCHMARK
+========================
+Measures how fast every encode profile runs on this computer and saves
+the results to encode_benchmarks.json (shown next to each profile).
+
+Usage:
+    python encode_benchmark.py
+    python encode_benchmark.py --seconds 20
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import tempfile
+import time
+
+import encode_profiles
+import ffmpeg_tools
+from config import VIDEO_WIDTH, VIDEO_HEIGHT, VIDEO_FPS
+
+
+def benchmark_profile(name, source, frames, temp_dir):
+    """Encode the test source with one profile and time it"""
+    output = os.path.join(temp_dir, f"{name}.mp4")
+    start = time.perf_counter()
+    ffmpeg_tools.run_ffmpeg(["-i", source] + encode_profiles.ffmpeg_args(name, VIDEO_FPS) + ["-an", output])
+    elapsed = time.perf_counter() - start
+    return {
+        "fps": round(frames / elapsed, 1),
+        "seconds": round(elapsed, 2),
+        "size_bytes": os.path.getsize(output),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure encode speed of every profile")
+    parser.add_argument("--seconds", type=int, default=10, help="Length of the test video")
+    args = parser.parse_args()
+
+    frames = args.seconds * VIDEO_FPS
+    results = {}
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        # Moving test pattern, decoded to raw video once so only encoding is timed
+        source = os.path.join(temp_dir, "source.nut")
+        ffmpeg_tools.run_ffmpeg([
+            "-f", "lavfi",
+            "-i", f"testsrc2=s={VIDEO_WIDTH}x{VIDEO_HEIGHT}:r={VIDEO_FPS}:d={args.seconds}",
+            "-c:v", "rawvideo", "-pix_fmt", "yuv420p", source
+        ])
+
+        print(f"\nEncoding {frames} frames at {VIDEO_WIDTH}x{VIDEO_HEIGHT}...\n")
+        for name in encode_profiles.ENCODE_PROFILES:
+            results[name] = benchmark_profile(name, source, frames, temp_dir)
+            print(f"  {name:<10} {results[name]['fps']:>8.1f} fps   "
+                  f"{results[name]['size_bytes'] / 1_000_000:.1f} MB")
+
+    data = {
+        "measured": datetime.datetime.now().isoformat(timespec="seconds"),
+        "machine": {"platform": platform.platform(), "cpu_count": os.cpu_count()},
+        "resolution": f"{VIDEO_WIDTH}x{VIDEO_HEIGHT}",
+        "profiles": results,
+    }
+    with open(encode_profiles.BENCHMARK_FILE, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+
+    draft, archival = results["draft"]["fps"], results["archival"]["fps"]
+    print(f"\n  Draft is {draft / archival:.1f}x faster than archival")
+    print(f"  Saved to: {encode_profiles.BENCHMARK_FILE}\n")
+
+
+if __name__ == "__main__":
+    main()
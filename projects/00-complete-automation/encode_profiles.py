@@ -0,0 +1,127 @@
+"""
+ENCODE PROFILES - HOW HARD SHOULD THE ENCODER WORK?
+===================================================
+Instead of hard-coding libx264 settings in every render call, renders
+pick a named profile:
+
+- "draft"     fastest possible, for previews (low quality is fine)
+- "fast"      quick daily uploads
+- "balanced"  good quality at a sensible speed (default)
+- "archival"  best quality, slowest
+
+Every profile uses all CPU cores (threads=auto). Run
+`python encode_benchmark.py` to measure how many frames per second
+each profile encodes on THIS computer.
+"""
+
+import json
+import os
+
+ENCODE_PROFILES = {
+    "draft": {
+        "preset": "ultrafast",
+        "crf": 30,
+        "tune": "fastdecode",
+        "gop_seconds": 1,
+    },
+    "fast": {
+        "preset": "veryfast",
+        "crf": 24,
+        "tune": None,
+        "gop_seconds": 2,
+    },
+    "balanced": {
+        "preset": "medium",
+        "crf": 21,
+        "tune": None,
+        "gop_seconds": 2,
+    },
+    "archival": {
+        "preset": "slow",
+        "crf": 18,
+        "tune": "film",
+        "gop_seconds": 4,
+    },
+}
+
+# ffmpeg picks the thread count itself when given 0
+AUTO_THREADS = 0
+
+BENCHMARK_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "encode_benchmarks.json")
+
+
+def get_profile(name):
+    """Look up an encode profile by name"""
+    if name not in ENCODE_PROFILES:
+        raise ValueError(
+            f"Unknown encode profile '{name}' (choose from: {', '.join(ENCODE_PROFILES)})"
+        )
+    return dict(ENCODE_PROFILES[name], name=name)
+
+
+def take_trigger(path):
+    """
+    Encode profile asked for in a trigger file, or None.
+
+    The file is removed, so only one video uses it.
+    """
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            name = f.read().strip().lower()
+        os.remove(path)
+    except OSError:
+        return None
+    if name not in ENCODE_PROFILES:
+        print(f"  Warning: Unknown encode profile '{name}' in {path} - using the default")
+        return None
+    return name
+
+
+def x264_params(name, fps):
+    """Rate control, tune and keyframe settings shared by every render path"""
+    profile = get_profile(name)
+    params = [
+        "-crf", str(profile["crf"]),
+        "-g", str(int(profile["gop_seconds"] * fps)),
+        "-pix_fmt", "yuv420p",
+    ]
+    if profile["tune"]:
+        params += ["-tune", profile["tune"]]
+    return params
+
+
+def moviepy_args(name, fps, extra_params=None):
+    """Keyword arguments for MoviePy's write_videofile()"""
+    profile = get_profile(name)
+    return {
+        "codec": "libx264",
+        "preset": profile["preset"],
+        "threads": AUTO_THREADS,
+        "ffmpeg_params": x264_params(name, fps) + list(extra_params or []),
+    }
+
+
+def ffmpeg_args(name, fps):
+    """Video encoder arguments for calling ffmpeg directly"""
+    profile = get_profile(name)
+    return [
+        "-c:v", "libx264",
+        "-preset", profile["preset"],
+        "-threads", str(AUTO_THREADS),
+    ] + x264_params(name, fps)
+
+
+def load_benchmarks():
+    """Measured encode speeds saved by encode_benchmark.py"""
+    if not os.path.exists(BENCHMARK_FILE):
+        return {}
+    with open(BENCHMARK_FILE, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def measured_fps(name):
+    """Measured encode frames per second for a profile (None if not benchmarked)"""
+    result = load_benchmarks().get("profiles", {}).get(name)
+    return result["fps"] if result else None
@@ -0,0 +1,175 @@
+"""
+FAKE YOUTUBE UPLOAD SERVER (FOR TESTING)
+========================================
+A tiny local server that speaks YouTube's resumable upload protocol,
+so uploads can be tested without a Google account or internet.
+
+It can also misbehave on purpose, to check that retries and resuming
+work:
+    --fail-every 3      answer every 3rd piece with "503 try again"
+    --drop-every 5      cut the connection on every 5th piece
+    --throttle-mbps 2   accept at most 2 MB per second
+
+Usage:
+    python fake_upload_server.py --port 8090
+    (set YOUTUBE_UPLOAD_URL = "http://localhost:8090/upload/youtube/v3/videos")
+
+Uploaded files are kept in memory and thrown away when it stops
+(use --save-dir to keep them).
+"""
+
+import argparse
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+UPLOAD_PATH = "/upload/youtube/v3/videos"
+SESSION_PATH = "/upload/sessions/"
+
+RANGE_PATTERN = re.compile(r"bytes (\d+)-(\d+)/(\d+)")
+
+
+class FakeUploadState:
+    """Upload sessions and misbehaviour settings shared by all requests"""
+
+    def __init__(self, fail_every=0, drop_every=0, throttle_mbps=0, save_dir=None):
+        self.fail_every = fail_every
+        self.drop_every = drop_every
+        self.throttle_mbps = throttle_mbps
+        self.save_dir = save_dir
+        self.sessions = {}
+        self.completed = {}
+        self.chunks_seen = 0
+        self.lock = threading.Lock()
+
+
+class FakeUploadHandler(BaseHTTPRequestHandler):
+    """Handles session starts (POST), pieces and status checks (PUT)"""
+
+    protocol_version = "HTTP/1.1"
+    state = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        if not self.path.startswith(UPLOAD_PATH):
+            return self._reply(404, {"error": "not found"})
+
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        total = int(self.headers.get("X-Upload-Content-Length", 0))
+
+        session_id = uuid.uuid4().hex
+        with self.state.lock:
+            self.state.sessions[session_id] = {"body": body, "total": total, "data": bytearray()}
+
+        host = self.headers.get("Host", "localhost")
+        self._reply(200, None, {"Location": f"http://{host}{SESSION_PATH}{session_id}"})
+
+    def do_PUT(self):
+        session_id = self.path[len(SESSION_PATH):] if self.path.startswith(SESSION_PATH) else None
+        length = int(self.headers.get("Content-Length", 0))
+        data = self.rfile.read(length) if length else b""
+
+        with self.state.lock:
+            if session_id in self.state.completed:
+                return self._reply(200, self.state.completed[session_id])
+            upload = self.state.sessions.get(session_id)
+        if upload is None:
+            return self._reply(404, {"error": "unknown upload session"})
+
+        content_range = self.headers.get("Content-Range", "")
+
+        # Status check: "bytes */total"
+        if content_range.startswith("bytes */"):
+            return self._partial(upload)
+
+        match = RANGE_PATTERN.match(content_range)
+        if not match:
+            return self._reply(400, {"error": "bad Content-Range"})
+        start = int(match.group(1))
+
+        with self.state.lock:
+            self.state.chunks_seen += 1
+            chunk_number = self.state.chunks_seen
+
+        if self.state.drop_every and chunk_number % self.state.drop_every == 0:
+            self.close_connection = True
+            self.connection.close()
+            return
+        if self.state.fail_every and chunk_number % self.state.fail_every == 0:
+            return self._reply(503, {"error": "backend error"})
+        if self.state.throttle_mbps:
+            time.sleep(len(data) / (self.state.throttle_mbps * 1_000_000))
+
+        with self.state.lock:
+            if start != len(upload["data"]):
+                return self._partial(upload)
+            upload["data"].extend(data)
+            if len(upload["data"]) < upload["total"]:
+                return self._partial(upload)
+
+            video = {"kind": "youtube#video", "id": session_id[:11], "snippet": upload["body"].get("snippet", {})}
+            self.state.completed[session_id] = video
+            del self.state.sessions[session_id]
+
+        if self.state.save_dir:
+            os.makedirs(self.state.save_dir, exist_ok=True)
+            with open(os.path.join(self.state.save_dir, f"{video['id']}.mp4"), "wb") as f:
+                f.write(upload["data"])
+        self._reply(201, video)
+
+    def _partial(self, upload):
+        headers = {}
+        if upload["data"]:
+            headers["Range"] = f"bytes=0-{len(upload['data']) - 1}"
+        self._reply(308, None, headers)
+
+    def _reply(self, status, payload, headers=None):
+        body = json.dumps(payload).encode() if payload is not None else b""
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def start_server(port=0, **settings):
+    """Start the fake server in a background thread; returns (server, upload_url)"""
+    handler = type("Handler", (FakeUploadHandler,), {"state": FakeUploadState(**settings)})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}{UPLOAD_PATH}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local fake YouTube upload server")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--fail-every", type=int, default=0, help="Answer every Nth piece with 503")
+    parser.add_argument("--drop-every", type=int, default=0, help="Drop the connection on every Nth piece")
+    parser.add_argument("--throttle-mbps", type=float, default=0, help="Limit upload speed")
+    parser.add_argument("--save-dir", help="Keep uploaded files in this folder")
+    args = parser.parse_args()
+
+    server, url = start_server(
+        args.port, fail_every=args.fail_every, drop_every=args.drop_every,
+        throttle_mbps=args.throttle_mbps, save_dir=args.save_dir
+    )
+    print(f"Fake upload server running at {url}")
+    print("Press Ctrl+C to stop")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+"""
+FFMPEG HELPERS
+==============
+Small wrappers around the ffmpeg program that comes with MoviePy
+(through imageio-ffmpeg). The automation uses these for the fast
+paths where MoviePy does not need to touch every single frame.
+"""
+
+import os
+import re
+import shutil
+import subprocess
+from functools import lru_cache
+
+
+@lru_cache(maxsize=None)
+def get_ffmpeg_exe():
+    """Find the ffmpeg program (MoviePy's bundled copy first)"""
+    try:
+        import imageio_ffmpeg
+        return imageio_ffmpeg.get_ffmpeg_exe()
+    except Exception:
+        pass
+    return shutil.which("ffmpeg") or "ffmpeg"
+
+
+def run_ffmpeg(args):
+    """Run ffmpeg with the given arguments, raise RuntimeError on failure"""
+    cmd = [get_ffmpeg_exe(), "-y", "-hide_banner", "-loglevel", "error"]
+    cmd += [str(arg) for arg in args]
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed: {result.stderr.strip()[-500:]}")
+    return result
+
+
+@lru_cache(maxsize=None)
+def has_filter(name):
+    """Check if this ffmpeg build has a video filter (e.g. 'subtitles')"""
+    try:
+        result = subprocess.run(
+            [get_ffmpeg_exe(), "-hide_banner", "-filters"],
+            capture_output=True, text=True
+        )
+    except OSError:
+        return False
+    for line in result.stdout.splitlines():
+        parts = line.split()
+        if len(parts) >= 2 and parts[1] == name:
+            return True
+    return False
+
+
+def escape_filter_path(path):
+    """
+    Escape a file path for use between single quotes in an ffmpeg filter
+    (like subtitles='...').
+
+    ffmpeg reads the text twice: once for the filter graph, once for the
+    filter's options. A colon only matters to the second read, so it gets
+    one backslash. A quote cannot appear inside quotes at all: the quote
+    is closed, the quote character is escaped for both reads, and the
+    quote is opened again.
+    """
+    path = os.path.abspath(path).replace("\\", "/")
+    return path.replace(":", "\\:").replace("'", "'\\\\\\''")
+
+
+def subtitles_filter(subtitles_file, font_size=18):
+    """Build the ffmpeg 'subtitles' filter that burns captions into the video"""
+    style = (
+        f"FontSize={font_size},PrimaryColour=&H00FFFFFF,OutlineColour=&H00000000,"
+        "BorderStyle=1,Outline=2,Shadow=0,MarginV=30"
+    )
+    return f"subtitles='{escape_filter_path(subtitles_file)}':force_style='{style}'"
+
+
+def color_to_hex(color):
+    """Convert an (r, g, b) tuple into ffmpeg's 0xRRGGBB color format"""
+    return "0x{:02x}{:02x}{:02x}".format(*color)
+
+
+def encode_still_clip(image_path, output_path, fps, duration, encoder_args):
+    """
+    Encode a few seconds of one picture (no audio). Loop the result
+    under a voiceover with loop_video_with_audio() instead of encoding
+    every frame of a long video.
+    """
+    run_ffmpeg([
+        "-loop", "1", "-framerate", fps, "-t", duration, "-i", image_path,
+        *encoder_args,
+        "-r", fps, "-movflags", "+faststart",
+        output_path
+    ])
+    return output_path
+
+
+def encode_still_video(image_path, audio_path, output_path, fps, encoder_args, video_filter=None):
+    """
+    Turn one picture + the voiceover into a video, every frame encoded.
+
+    Only needed when something changes over the picture (burned-in
+    captions), so use a low fps: the picture itself never moves.
+    """
+    args = [
+        "-loop", "1", "-framerate", fps, "-i", image_path,
+        "-i", audio_path,
+        "-map", "0:v", "-map", "1:a",
+    ]
+    if video_filter:
+        args += ["-vf", video_filter]
+    args += list(encoder_args)
+    args += [
+        "-r", fps,
+        "-c:a", "aac", "-b:a", "192k",
+        "-shortest", "-movflags", "+faststart",
+        output_path
+    ]
+    run_ffmpeg(args)
+    return output_path
+
+
+def encode_color_video(color, size, fps, duration, output_path):
+    """Encode a solid color video straight from ffmpeg (no MoviePy frames)"""
+    width, height = size
+    source = f"color=c={color_to_hex(color)}:s={width}x{height}:r={fps}:d={duration}"
+    run_ffmpeg([
+        "-f", "lavfi", "-i", source,
+        "-c:v", "libx264", "-preset", "veryfast", "-tune", "stillimage",
+        "-pix_fmt", "yuv420p", "-movflags", "+faststart",
+        output_path
+    ])
+    return output_path
+
+
+def loop_video_with_audio(video_path, audio_path, output_path):
+    """
+    Loop an already encoded short video under the voiceover.
+
+    The video stream is copied, not re-encoded, so this takes about
+    as long as copying the file. The result is cut at the voiceover's
+    length (-shortest alone overshoots by up to a whole loop when the
+    video is copied).
+    """
+    duration = probe_duration(audio_path)
+    args = [
+        "-stream_loop", "-1", "-i", video_path,
+        "-i", audio_path,
+        "-map", "0:v", "-map", "1:a",
+        "-c:v", "copy", "-c:a", "aac", "-b:a", "192k",
+    ]
+    args += ["-t", f"{duration:.3f}"] if duration else ["-shortest"]
+    args += ["-movflags", "+faststart", output_path]
+    run_ffmpeg(args)
+    return output_path
+
+
+def concat_segments(segment_paths, audio_path, output_path, duration=None):
+    """
+    Join rendered video segments (stream copy, no re-encode) and add
+    the voiceover. All segments must use the same encode settings.
+    """
+    list_file = output_path + ".segments.txt"
+    with open(list_file, "w", encoding="utf-8") as f:
+        for path in segment_paths:
+            safe_path = os.path.abspath(path).replace("\\", "/").replace("'", "'\\''")
+            f.write(f"file '{safe_path}'\n")
+
+    args = [
+        "-f", "concat", "-safe", "0", "-i", list_file,
+        "-i", audio_path,
+        "-map", "0:v", "-map", "1:a",
+        "-c:v", "copy", "-c:a", "aac", "-b:a", "192k",
+    ]
+    if duration:
+        args += ["-t", f"{duration:.3f}"]
+    else:
+        args += ["-shortest"]
+    args += ["-movflags", "+faststart", output_path]
+
+    try:
+        run_ffmpeg(args)
+    finally:
+        os.remove(list_file)
+    return output_path
+
+
+def probe_duration(path):
+    """Length of a media file in seconds (None if ffmpeg can't tell)"""
+    result = subprocess.run(
+        [get_ffmpeg_exe(), "-hide_banner", "-i", str(path)],
+        capture_output=True, text=True
+    )
+    match = re.search(r"Duration: (\d+):(\d+):(\d+(?:\.\d+)?)", result.stderr)
+    if not match:
+        return None
+    hours, minutes, seconds = match.groups()
+    return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+
+def repeat_segment(segment_path, duration, output_path):
+    """
+    Loop (or cut) an already encoded segment to `duration` seconds.
+
+    Uses -stream_loop with stream copy, so the source is never decoded
+    again - a long voiceover over a short clip costs one encode only.
+    """
+    run_ffmpeg([
+        "-stream_loop", "-1", "-i", segment_path,
+        "-t", f"{duration:.3f}",
+        "-map", "0:v", "-c", "copy",
+        output_path
+    ])
+    return output_path
@@ -0,0 +1,358 @@
+"""
+INSTRUMENTATION - WHERE DOES THE TIME GO?
+=========================================
+Measures every stage of a run (trends, script, voiceover, download,
+render, thumbnail, upload):
+
+- wall time (seconds on the clock)
+- CPU time (this script plus the ffmpeg processes it started)
+- peak memory (RSS) of this script and of its helper processes during
+  the stage (sampled from /proc on Linux), plus the peak of the whole run
+- bytes downloaded, uploaded and written to the output folder (network
+  bytes are counted per thread, so a background upload does not add to
+  the stage the main thread is in)
+- encode speed (frames per second) for render stages
+
+Each run gets an id and a folder, output/runs/<run_id>/. Every stage is
+written there as one JSON line in stages.jsonl, and the same lines are
+added to output/runs/runs.jsonl, which holds all runs. A summary table
+is printed at the end.
+
+With profile="cpu", "sample" or "memory" every stage is also profiled
+(see profiling.py).
+"""
+
+import contextlib
+import datetime
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+
+import profiling
+
+try:
+    import resource
+except ImportError:
+    # Windows
+    resource = None
+
+# Bytes moved over the network, counted by the download/upload code
+_counters = {"downloaded": 0, "uploaded": 0}
+_counters_lock = threading.Lock()
+
+# Bytes of the stage running in each thread, so a background upload is
+# not counted for whatever stage the main thread is in (see RunRecorder.stage)
+_stage = threading.local()
+
+# Cache hits and misses per cache: {"trends": {"hit": 3, "miss": 1}}
+_cache_counters = {}
+
+# Functions called with every stage record (e.g. the metrics server)
+_listeners = []
+
+# How often memory is sampled during a stage (seconds)
+RSS_SAMPLE_SECONDS = 0.05
+
+
+def count_bytes(kind, amount):
+    """Add to the 'downloaded' or 'uploaded' byte counter (and this thread's stage)"""
+    stage = getattr(_stage, "counters", None)
+    with _counters_lock:
+        _counters[kind] += amount
+        if stage is not None:
+            stage[kind] += amount
+
+
+def byte_counters():
+    """Copy of the network byte counters of the whole process"""
+    with _counters_lock:
+        return dict(_counters)
+
+
+def same_stage(func):
+    """
+    func, counting its bytes for the stage running in THIS thread
+    whatever thread calls it - for work handed to a thread pool:
+
+        pool.submit(same_stage(upload), ...)
+    """
+    counters = getattr(_stage, "counters", None)
+
+    def run(*args, **kwargs):
+        previous = getattr(_stage, "counters", None)
+        _stage.counters = counters
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _stage.counters = previous
+
+    return run
+
+
+def count_cache(cache, hit):
+    """Count one cache lookup"""
+    with _counters_lock:
+        counts = _cache_counters.setdefault(cache, {"hit": 0, "miss": 0})
+        counts["hit" if hit else "miss"] += 1
+
+
+def cache_counters():
+    """Copy of the cache hit/miss counters"""
+    with _counters_lock:
+        return {cache: dict(counts) for cache, counts in _cache_counters.items()}
+
+
+def add_listener(func):
+    """Call func(record) for every stage and run total that is recorded"""
+    _listeners.append(func)
+
+
+def cpu_seconds():
+    """CPU time of this process plus finished child processes (e.g. ffmpeg)"""
+    t = os.times()
+    return t.user + t.system + t.children_user + t.children_system
+
+
+def peak_rss_mb():
+    """
+    (this process, largest child process) peak memory in MB over the
+    WHOLE run so far, None if unknown. See RssSampler for one stage.
+    """
+    if resource is not None:
+        # Linux reports kilobytes, macOS bytes
+        scale = 1 if sys.platform == "darwin" else 1024
+        own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+        children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * scale
+        return round(own / 1_000_000, 1), round(children / 1_000_000, 1)
+    try:
+        import psutil
+        info = psutil.Process().memory_info()
+        return round(getattr(info, "peak_wset", info.rss) / 1_000_000, 1), None
+    except ImportError:
+        return None, None
+
+
+def _rss_kb(pid):
+    """Current memory (VmRSS) of a process in KB, 0 if it is gone"""
+    try:
+        with open(f"/proc/{pid}/status", "r") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except (OSError, ValueError):
+        pass
+    return 0
+
+
+def _child_pids(pid):
+    """Every process started by pid, and by those, and so on"""
+    children = []
+    try:
+        for task in os.listdir(f"/proc/{pid}/task"):
+            with open(f"/proc/{pid}/task/{task}/children", "r") as f:
+                children += [int(child) for child in f.read().split()]
+    except (OSError, ValueError):
+        pass
+    return children + [grandchild for child in children for grandchild in _child_pids(child)]
+
+
+class RssSampler:
+    """
+    Peak memory of ONE stage. ru_maxrss never goes down, so after a big
+    render every later stage would report the render's peak. Instead a
+    background thread reads the current RSS of this process and of all
+    its helper processes (ffmpeg, render workers - added up) from /proc
+    every RSS_SAMPLE_SECONDS while the stage runs.
+
+    Only works where /proc exists (Linux); elsewhere the peaks stay None.
+    """
+
+    available = os.path.exists("/proc/self/status")
+
+    def __init__(self, interval=RSS_SAMPLE_SECONDS):
+        self.interval = interval
+        self.own_kb = 0
+        self.children_kb = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+
+    def start(self):
+        if self.available:
+            self._sample()
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop sampling; returns (this process, child processes) peak MB"""
+        if not self.available:
+            return None, None
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+        return round(self.own_kb * 1024 / 1_000_000, 1), round(self.children_kb * 1024 / 1_000_000, 1)
+
+    def _sample(self):
+        pid = os.getpid()
+        self.own_kb = max(self.own_kb, _rss_kb(pid))
+        self.children_kb = max(self.children_kb, sum(_rss_kb(child) for child in _child_pids(pid)))
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+
+def folder_size(folder, skip=()):
+    """Total size of all files in a folder (skipping some subfolders)"""
+    total = 0
+    for root, dirs, files in os.walk(folder):
+        dirs[:] = [d for d in dirs if os.path.join(root, d) not in skip]
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+class RunRecorder:
+    """Collects stage measurements for one run"""
+
+    def __init__(self, pipeline, output_folder, run_id=None, profile=None):
+        self.pipeline = pipeline
+        self.output_folder = str(output_folder)
+        self.run_id = run_id or f"{datetime.datetime.now():%Y%m%d_%H%M%S}_{uuid.uuid4().hex[:6]}"
+        self.runs_folder = os.path.join(self.output_folder, "runs")
+        self.run_dir = os.path.join(self.runs_folder, self.run_id)
+        os.makedirs(self.run_dir, exist_ok=True)
+        self.profiler = profiling.StageProfiler(profile, self.run_dir) if profile else None
+        self.stages = []
+        self.started = time.perf_counter()
+        self.started_cpu = cpu_seconds()
+        self.started_at = datetime.datetime.now().isoformat(timespec="seconds")
+        # Output folder size after the last stage (each stage walks it once)
+        self._written_size = folder_size(self.output_folder, skip=(self.runs_folder,))
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """
+        Measure one stage:
+
+            with recorder.stage("assemble_video") as stage:
+                ...
+                stage["frames"] = 1800   # optional extras
+        """
+        extras = {}
+        # Only bytes moved by this thread (or work it hands over, see same_stage)
+        counters = {"downloaded": 0, "uploaded": 0}
+        written = self._written_size
+        sampler = RssSampler().start()
+        wall, cpu = time.perf_counter(), cpu_seconds()
+        ok = False
+        profile_files = []
+        outer, _stage.counters = getattr(_stage, "counters", None), counters
+        try:
+            if self.profiler:
+                with self.profiler.stage(name) as profile_files:
+                    yield extras
+            else:
+                yield extras
+            ok = extras.pop("ok", True)
+        finally:
+            wall = time.perf_counter() - wall
+            cpu = cpu_seconds() - cpu
+            _stage.counters = outer
+            if outer is not None:
+                # A stage inside another one: its bytes count for both
+                with _counters_lock:
+                    for kind, amount in counters.items():
+                        outer[kind] += amount
+            own_rss, child_rss = sampler.stop()
+            lifetime_rss, lifetime_child_rss = peak_rss_mb()
+            self._written_size = folder_size(self.output_folder, skip=(self.runs_folder,))
+            record = {
+                "run_id": self.run_id,
+                "pipeline": self.pipeline,
+                "stage": name,
+                "ok": bool(ok),
+                "wall_seconds": round(wall, 3),
+                "cpu_seconds": round(cpu, 3),
+                "peak_rss_mb": own_rss,
+                "children_peak_rss_mb": child_rss,
+                "lifetime_peak_rss_mb": lifetime_rss,
+                "lifetime_children_peak_rss_mb": lifetime_child_rss,
+                "bytes_downloaded": counters["downloaded"],
+                "bytes_uploaded": counters["uploaded"],
+                "bytes_written": max(0, self._written_size - written),
+            }
+            frames = extras.pop("frames", None)
+            if frames:
+                record["frames"] = frames
+                record["encode_fps"] = round(frames / wall, 1) if wall else None
+            if profile_files:
+                record["profiles"] = profile_files
+            record.update(extras)
+            self.stages.append(record)
+            self._write(record)
+
+    def call(self, name, func, *args, **kwargs):
+        """Run func as a stage; a falsy result counts as a failed stage"""
+        with self.stage(name) as stage:
+            result = func(*args, **kwargs)
+            stage["ok"] = bool(result)
+        return result
+
+    def finish(self, success):
+        """Write the run total and print the summary table (memory: peak of the whole run)"""
+        own_rss, child_rss = peak_rss_mb()
+        total = {
+            "run_id": self.run_id,
+            "pipeline": self.pipeline,
+            "stage": "total",
+            "ok": bool(success),
+            "started": self.started_at,
+            "wall_seconds": round(time.perf_counter() - self.started, 3),
+            "cpu_seconds": round(cpu_seconds() - self.started_cpu, 3),
+            "peak_rss_mb": own_rss,
+            "children_peak_rss_mb": child_rss,
+            "bytes_downloaded": sum(s["bytes_downloaded"] for s in self.stages),
+            "bytes_uploaded": sum(s["bytes_uploaded"] for s in self.stages),
+            "bytes_written": sum(s["bytes_written"] for s in self.stages),
+        }
+        self._write(total)
+        print(self.summary_table(total))
+        return total
+
+    def summary_table(self, total=None):
+        """Stage measurements as a printable table"""
+        lines = [
+            f"\n  RUN {self.run_id}",
+            f"  {'STAGE':<22}{'WALL':>9}{'CPU':>9}{'PEAK RSS':>10}{'DOWN MB':>9}{'WRITTEN MB':>12}{'FPS':>8}",
+        ]
+        for record in self.stages + ([total] if total else []):
+            rss = f"{record['peak_rss_mb']:.0f} MB" if record["peak_rss_mb"] is not None else "-"
+            fps = f"{record['encode_fps']:.1f}" if record.get("encode_fps") else "-"
+            mark = "" if record["ok"] else " (failed)"
+            lines.append(
+                f"  {record['stage'] + mark:<22}{record['wall_seconds']:>8.1f}s{record['cpu_seconds']:>8.1f}s"
+                f"{rss:>10}{record['bytes_downloaded'] / 1_000_000:>9.1f}"
+                f"{record['bytes_written'] / 1_000_000:>12.1f}{fps:>8}"
+            )
+        lines.append(f"  Details: {os.path.join(self.run_dir, 'stages.jsonl')}")
+        if self.profiler:
+            lines.append(f"  Profiles ({self.profiler.mode}): {self.profiler.folder}")
+        return "\n".join(lines)
+
+    def _write(self, record):
+        line = json.dumps(record) + "\n"
+        with open(os.path.join(self.run_dir, "stages.jsonl"), "a", encoding="utf-8") as f:
+            f.write(line)
+        with open(os.path.join(self.runs_folder, "runs.jsonl"), "a", encoding="utf-8") as f:
+            f.write(line)
+        for listener in list(_listeners):
+            try:
+                listener(record)
+            except Exception as e:
+                print(f"  Warning: Stage listener failed: {e}")
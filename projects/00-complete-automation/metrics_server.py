@@ -0,0 +1,230 @@
+"""
+METRICS SERVER - LIVE NUMBERS FOR MONITORING
+============================================
+A tiny web page (http://localhost:METRICS_PORT/metrics) in the
+Prometheus text format, served by the scheduler. Monitoring tools such
+as Prometheus or Grafana Agent read it directly - no log parsing.
+
+What it shows:
+- videos made and failed
+- how long every stage takes (histograms)
+- bytes downloaded and uploaded
+- cache hits and misses (trends, background videos)
+- videos waiting in the upload outbox and YouTube quota left
+- when the next scheduled run starts
+
+Uses only the Python standard library.
+"""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import instrumentation
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Stage duration buckets in seconds (a few seconds up to an hour)
+STAGE_BUCKETS = (1, 5, 15, 30, 60, 120, 300, 600, 1200, 1800, 3600)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _label_text(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help_text = help_text
+        self.values = {}
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def _key(labels):
+        return tuple(sorted(labels.items()))
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+        with self.lock:
+            for labels, value in sorted(self.values.items()):
+                lines.append(f"{self.name}{_label_text(labels)} {_number(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    """A number that only goes up"""
+
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        with self.lock:
+            key = self._key(labels)
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def set_total(self, value, **labels):
+        """Copy a running total kept elsewhere"""
+        with self.lock:
+            self.values[self._key(labels)] = value
+
+
+class Gauge(_Metric):
+    """A number that goes up and down"""
+
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        with self.lock:
+            self.values[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    """Counts observations in buckets, plus their sum and count"""
+
+    kind = "histogram"
+
+    def __init__(self, name, help_text, buckets):
+        super().__init__(name, help_text)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+
+    def observe(self, value, **labels):
+        with self.lock:
+            key = self._key(labels)
+            entry = self.values.setdefault(key, {"buckets": [0] * len(self.buckets), "sum": 0.0, "count": 0})
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry["buckets"][i] += 1
+            entry["sum"] += value
+            entry["count"] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+        with self.lock:
+            for labels, entry in sorted(self.values.items()):
+                for bound, count in zip(self.buckets, entry["buckets"]):
+                    bucket_labels = labels + (("le", _number(bound) if bound == float("inf") else str(bound)),)
+                    lines.append(f"{self.name}_bucket{_label_text(bucket_labels)} {count}")
+                lines.append(f"{self.name}_sum{_label_text(labels)} {_number(entry['sum'])}")
+                lines.append(f"{self.name}_count{_label_text(labels)} {entry['count']}")
+        return lines
+
+
+class MetricsRegistry:
+    """All metrics of this process, plus functions that refresh them on every scrape"""
+
+    def __init__(self):
+        self.metrics = []
+        self.collectors = []
+
+    def counter(self, name, help_text):
+        return self._add(Counter(name, help_text))
+
+    def gauge(self, name, help_text):
+        return self._add(Gauge(name, help_text))
+
+    def histogram(self, name, help_text, buckets=STAGE_BUCKETS):
+        return self._add(Histogram(name, help_text, buckets))
+
+    def add_collector(self, func):
+        """func() is called before every scrape to update gauges"""
+        self.collectors.append(func)
+
+    def render(self):
+        for collect in self.collectors:
+            try:
+                collect()
+            except Exception as e:
+                print(f"  Warning: Metrics collector failed: {e}")
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def _add(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+
+class PipelineMetrics:
+    """The standard metrics of the video pipeline for one channel"""
+
+    def __init__(self, channel, registry=None):
+        self.channel = channel
+        self.registry = registry or MetricsRegistry()
+        r = self.registry
+
+        self.videos = r.counter("faceless_videos_total", "Pipeline runs by result")
+        self.stage_seconds = r.histogram("faceless_stage_duration_seconds", "Wall time of each pipeline stage")
+        self.stage_failures = r.counter("faceless_stage_failures_total", "Pipeline stages that failed")
+        self.bytes = r.counter("faceless_bytes_total", "Bytes moved over the network")
+        self.cache = r.counter("faceless_cache_lookups_total", "Cache lookups by cache and result")
+        self.cache_ratio = r.gauge("faceless_cache_hit_ratio", "Share of cache lookups that were hits")
+        self.outbox = r.gauge("faceless_upload_queue_depth", "Videos waiting in the upload outbox")
+        self.quota = r.gauge("faceless_upload_quota_remaining", "YouTube API quota units available now")
+        self.next_run = r.gauge("faceless_next_run_timestamp_seconds", "Unix time of the next scheduled run")
+        self.errors = r.counter("faceless_scheduler_errors_total", "Errors in the scheduler loop")
+
+        instrumentation.add_listener(self.record_stage)
+        r.add_collector(self.collect_counters)
+
+    def record_stage(self, record):
+        """Listener for every stage/run recorded by instrumentation"""
+        labels = {"channel": self.channel, "pipeline": record["pipeline"]}
+        if record["stage"] == "total":
+            self.videos.inc(result="success" if record["ok"] else "failed", **labels)
+            return
+        self.stage_seconds.observe(record["wall_seconds"], stage=record["stage"], **labels)
+        if not record["ok"]:
+            self.stage_failures.inc(stage=record["stage"], **labels)
+
+    def collect_counters(self):
+        for direction, total in instrumentation.byte_counters().items():
+            self.bytes.set_total(total, channel=self.channel, direction=direction)
+        for cache, counts in instrumentation.cache_counters().items():
+            for result, total in counts.items():
+                self.cache.set_total(total, channel=self.channel, cache=cache, result=result)
+            lookups = counts["hit"] + counts["miss"]
+            if lookups:
+                self.cache_ratio.set(round(counts["hit"] / lookups, 4), channel=self.channel, cache=cache)
+
+    def watch_upload_queue(self, queue):
+        """Report outbox depth and quota of an UploadQueue on every scrape"""
+        def collect():
+            self.outbox.set(len(queue.pending_jobs()), channel=self.channel)
+            self.quota.set(queue.quota.available(), channel=self.channel)
+        self.registry.add_collector(collect)
+
+
+def start_server(registry, port, host="127.0.0.1"):
+    """Serve registry on http://host:port/metrics from a background thread"""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] not in ("/metrics", "/"):
+                self.send_error(404)
+                return
+            body = registry.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    return server
@@ -0,0 +1,241 @@
+"""
+BACKGROUND MUSIC - A QUIET MUSIC BED UNDER THE VOICE
+====================================================
+Put royalty-free music files (mp3, wav, m4a, ogg, flac) in MUSIC_FOLDER
+(see config.py) and every video gets one of them under the narration.
+
+The music gets quieter whenever the voice speaks ("ducking") and comes
+back up in the pauses. WHEN the voice speaks is already known from the
+voiceover word timings, so the whole volume curve is worked out before
+mixing - no slow per-frame volume functions in MoviePy.
+
+The mix is made once with NumPy, streamed through ffmpeg one second at
+a time (memory stays flat for long videos), and cached per voiceover,
+track and settings. Rendering the same video again reuses the mix.
+
+The track is picked from the voiceover content, so the same video
+always gets the same music.
+
+EDL renders add the music as an audio track (edl.add_audio_track).
+Videos made without an EDL (still-picture videos, master_automation.py
+placeholders) use voice_with_music() - the same mixing and mix cache.
+"""
+
+import hashlib
+import json
+import os
+import subprocess
+
+import ffmpeg_tools
+from artifact_index import file_hash
+from asset_cache import MixCache
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+AUDIO_EXTENSIONS = (".mp3", ".wav", ".m4a", ".aac", ".ogg", ".flac")
+
+# Mixing format: 44.1 kHz stereo, 32-bit float samples
+SAMPLE_RATE = 44100
+FRAME_BYTES = 2 * 4
+
+# Samples mixed per step (one second)
+CHUNK_FRAMES = SAMPLE_RATE
+
+# Bump when the mixing changes, so old cached mixes are not reused
+MIX_FORMAT = 1
+
+DEFAULT_SETTINGS = {
+    "volume": 0.25,
+    "ducked_volume": 0.06,
+    "attack": 0.15,
+    "release": 0.6,
+    "fade": 2.0,
+}
+
+
+def find_tracks(folder):
+    """Music files in the library folder (empty list if there is none)"""
+    if not folder or not os.path.isdir(folder):
+        return []
+    return sorted(
+        os.path.join(folder, name) for name in os.listdir(folder)
+        if name.lower().endswith(AUDIO_EXTENSIONS)
+    )
+
+
+def choose_track(tracks, seed):
+    """Pick a track from a hex seed (the voiceover hash): same voiceover, same music"""
+    return tracks[int(seed[:8], 16) % len(tracks)]
+
+
+def speech_intervals(words, min_pause):
+    """
+    When the voice is speaking, as [start, end] pairs.
+
+    Words closer together than min_pause are joined, so the music does
+    not pump up and down between words.
+    """
+    intervals = []
+    for word in words:
+        if intervals and word["start"] - intervals[-1][1] < min_pause:
+            intervals[-1][1] = max(intervals[-1][1], word["end"])
+        else:
+            intervals.append([word["start"], word["end"]])
+    return [[round(start, 3), round(end, 3)] for start, end in intervals]
+
+
+def music_track(track_file, words, settings=None):
+    """The music as an EDL audio track, with its ducking worked out"""
+    settings = dict(DEFAULT_SETTINGS, **(settings or {}))
+    # Pauses shorter than the duck in + out time would never let the music back up
+    min_pause = settings["attack"] + settings["release"]
+    return {
+        "source": os.path.abspath(track_file),
+        "role": "music",
+        "start": 0.0,
+        "gain": settings["volume"],
+        "loop": True,
+        "fade": settings["fade"],
+        "duck": {
+            "gain": settings["ducked_volume"],
+            "attack": settings["attack"],
+            "release": settings["release"],
+            "speech": speech_intervals(words, min_pause),
+        },
+    }
+
+
+def gain_curve(track, duration):
+    """
+    Music volume over time for a track: returns a function that takes
+    an array of times (seconds) and gives the volume at each.
+    """
+    volume = track["gain"]
+    duck = track.get("duck") or {}
+    ducked = duck.get("gain", volume)
+    attack = duck.get("attack", 0.0)
+    release = duck.get("release", 0.0)
+
+    times = [0.0]
+    gains = [volume]
+    for start, end in duck.get("speech", []):
+        times += [start - attack, start, end, end + release]
+        gains += [volume, ducked, ducked, volume]
+    times = np.maximum.accumulate(np.clip(np.array(times), 0.0, None))
+    gains = np.array(gains)
+
+    fade = min(track.get("fade", 0.0), duration / 2)
+
+    def gain_at(t):
+        gain = np.interp(t, times, gains)
+        if fade:
+            gain = gain * np.interp(t, [0.0, fade, duration - fade, duration], [0.0, 1.0, 1.0, 0.0])
+        return gain.astype(np.float32)
+
+    return gain_at
+
+
+def mix_key(voice_hash, track_hash, track, duration):
+    """Cache key of one mix: voiceover content, track content, settings, length"""
+    settings = {key: value for key, value in track.items() if key != "source"}
+    text = json.dumps(
+        {"format": MIX_FORMAT, "voice": voice_hash, "music": track_hash,
+         "settings": settings, "duration": round(duration, 3)},
+        sort_keys=True, separators=(",", ":")
+    )
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def mix(voice_file, track, duration, key, cache=None):
+    """The voiceover with the music track under it (cached by key)"""
+    cache = cache or MixCache()
+    cached = cache.get(key)
+    if cached:
+        return cached
+
+    if not NUMPY_AVAILABLE:
+        raise RuntimeError("NumPy is needed to mix music (pip install numpy)")
+
+    print(f"  Mixing music: {os.path.basename(track['source'])}...")
+    made = _render_mix(voice_file, track, duration, cache.path(key) + ".new.m4a")
+    return cache.put(key, made)
+
+
+def voice_with_music(voice_file, words, tracks, settings=None, cache=None):
+    """
+    The voiceover with a track from `tracks` mixed under it, for videos
+    that are not rendered from an EDL. Returns voice_file unchanged when
+    there is no music, no word timings or no NumPy.
+    """
+    if not tracks or not words or not NUMPY_AVAILABLE:
+        return voice_file
+
+    duration = ffmpeg_tools.probe_duration(voice_file)
+    if not duration:
+        return voice_file
+
+    voice_hash = file_hash(voice_file)
+    track_file = choose_track(tracks, voice_hash)
+    track = music_track(track_file, words, settings)
+    key = mix_key(voice_hash, file_hash(track_file), track, duration)
+    return mix(voice_file, track, duration, key, cache)
+
+
+def _decoder(path, loop=False):
+    """ffmpeg decoding a file to raw stereo float samples on stdout"""
+    cmd = [ffmpeg_tools.get_ffmpeg_exe(), "-hide_banner", "-loglevel", "error"]
+    if loop:
+        cmd += ["-stream_loop", "-1"]
+    cmd += ["-i", path, "-f", "f32le", "-ac", "2", "-ar", str(SAMPLE_RATE), "-"]
+    return subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+
+
+def _read(process, frames):
+    data = process.stdout.read(frames * FRAME_BYTES)
+    usable = len(data) - len(data) % FRAME_BYTES
+    return np.frombuffer(data[:usable], dtype=np.float32).reshape(-1, 2)
+
+
+def _render_mix(voice_file, track, duration, output_path):
+    gain_at = gain_curve(track, duration)
+    total_frames = int(duration * SAMPLE_RATE)
+
+    encoder = subprocess.Popen(
+        [ffmpeg_tools.get_ffmpeg_exe(), "-y", "-hide_banner", "-loglevel", "error",
+         "-f", "f32le", "-ac", "2", "-ar", str(SAMPLE_RATE), "-i", "-",
+         "-c:a", "aac", "-b:a", "192k", output_path],
+        stdin=subprocess.PIPE, stderr=subprocess.DEVNULL
+    )
+    voice = _decoder(voice_file)
+    music = _decoder(track["source"], loop=track.get("loop", True))
+
+    position = 0
+    try:
+        while position < total_frames:
+            speech = _read(voice, min(CHUNK_FRAMES, total_frames - position))
+            if not len(speech):
+                break
+            bed = _read(music, len(speech))
+            if len(bed) < len(speech):
+                # Track ended (no looping): silence for the rest
+                bed = np.pad(bed, ((0, len(speech) - len(bed)), (0, 0)))
+
+            t = (position + np.arange(len(speech))) / SAMPLE_RATE
+            mixed = np.clip(speech + bed * gain_at(t)[:, None], -1.0, 1.0)
+            encoder.stdin.write(mixed.astype(np.float32).tobytes())
+            position += len(speech)
+    finally:
+        for decoder in (voice, music):
+            decoder.kill()
+            decoder.stdout.close()
+            decoder.wait()
+        encoder.stdin.close()
+        encoder.wait()
+
+    if encoder.returncode != 0 or not position:
+        raise RuntimeError(f"Could not mix music under {voice_file}")
+    return output_path
@@ -0,0 +1,122 @@
+"""
+PARALLEL RENDERING - ONE WORKER PER SECTION
+===========================================
+One x264 encoder does not get much faster with more threads at this
+size. Instead, every section of the edit plan is rendered as its own
+small video in a separate worker process, and the parts are joined
+afterwards with a stream copy (no second encode).
+
+More CPU cores = more sections rendered at the same time.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import encode_profiles
+
+# Sections a worker renders before it is replaced by a fresh process
+TASKS_PER_WORKER = 4
+
+
+def default_workers(num_jobs):
+    """One worker per CPU core, but never more workers than sections"""
+    return max(1, min(num_jobs, os.cpu_count() or 1))
+
+
+def render_segment(job):
+    """
+    Render one section of the plan to a video-only file.
+
+    Runs inside a worker process, so it opens its own clip and closes
+    it again as soon as the section is done.
+    """
+    from moviepy.editor import VideoFileClip, ImageClip, CompositeVideoClip
+
+    clip = VideoFileClip(job["source"], audio=False)
+    try:
+        end = job["in"] + job["duration"]
+        if job.get("loop"):
+            # Looped pieces are repeated from an encoded segment by
+            # edl.render_with_segments; looping here decodes every pass
+            raise ValueError("Render the clip once and repeat the segment instead of looping it")
+        # Cut the planned piece (a looped piece's base is the whole clip)
+        video = clip.subclip(job["in"], min(end, clip.duration))
+
+        width, height = job["size"]
+        if list(video.size) != [width, height]:
+            video = video.resize((width, height))
+
+        extra_params = []
+        if job.get("subtitles_file"):
+            extra_params = ["-vf", job["subtitles_filter"]]
+        elif job.get("caption_images"):
+            overlays = [
+                ImageClip(png).set_start(start).set_duration(end - start)
+                              .set_position(("center", job["caption_y"]))
+                for png, start, end in job["caption_images"]
+            ]
+            video = CompositeVideoClip([video] + overlays)
+
+        args = encode_profiles.moviepy_args(job["profile"], job["fps"], extra_params)
+        args["threads"] = job["threads"]
+
+        video.write_videofile(job["output"], fps=job["fps"], audio=False, logger=None, **args)
+        video.close()
+    finally:
+        clip.close()
+
+    return job["output"]
+
+
+def make_pool(workers):
+    """Worker pool for one batch of sections"""
+    return ProcessPoolExecutor(max_workers=workers)
+
+
+def batches(jobs, size):
+    """Split the jobs into batches of at most `size`"""
+    return [jobs[i:i + size] for i in range(0, len(jobs), size)]
+
+
+def render_segments(jobs, workers=0):
+    """
+    Render all segment jobs, in parallel when there is more than one worker.
+
+    Returns one segment file per job, in job order. Sections that fail
+    are None (with a warning), just like a clip that cannot be opened.
+    With workers=1 everything runs in this process, one clip open at a
+    time - the lowest-memory mode.
+    """
+    workers = workers or default_workers(len(jobs))
+    threads_per_worker = max(1, (os.cpu_count() or 1) // workers)
+    for job in jobs:
+        job["threads"] = threads_per_worker
+
+    results = [None] * len(jobs)
+
+    if workers == 1:
+        for i, job in enumerate(jobs):
+            try:
+                results[i] = render_segment(job)
+                print(f"  Rendered piece {i + 1}/{len(jobs)} (section {job['section']})")
+            except Exception as e:
+                print(f"  Warning: Could not render section {job['section']}: {e}")
+        return results
+
+    # A fresh pool for every few sections per worker, so worker memory
+    # cannot creep up over a long video. (ProcessPoolExecutor's own
+    # max_tasks_per_child can hang when it replaces workers on 3.11.)
+    print(f"  Rendering {len(jobs)} pieces with {workers} workers...")
+    done = 0
+    for batch in batches(jobs, workers * TASKS_PER_WORKER):
+        with make_pool(workers) as pool:
+            futures = [pool.submit(render_segment, job) for job in batch]
+            for job, future in zip(batch, futures):
+                try:
+                    results[done] = future.result()
+                    print(f"  Rendered piece {done + 1}/{len(jobs)} (section {job['section']})")
+                except Exception as e:
+                    print(f"  Warning: Could not render section {job['section']}: {e}")
+                done += 1
+
+    return results
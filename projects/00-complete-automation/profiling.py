@@ -0,0 +1,180 @@
+"""
+PROFILING - WHAT IS SLOW INSIDE A STAGE?
+========================================
+instrumentation.py tells you WHICH stage is slow. A profile tells you
+WHICH CODE inside it is slow. Profiling is off unless you ask for it:
+
+    python auto_video_creator.py --profile           # same as --profile cpu
+    python auto_video_creator.py --profile memory
+
+Modes:
+- "cpu"     cProfile of every stage (<stage>.pstats) plus a sampled
+            flame graph (<stage>.collapsed.txt)
+- "sample"  only the sampled flame graph - almost no slowdown, like py-spy
+- "memory"  tracemalloc snapshots around assemble_video: what allocated
+            the most memory (assemble_video.memory.txt)
+
+Profiles are saved next to the stage measurements in
+output/runs/<run_id>/profiles/.
+
+Looking at them:
+    python -m pstats output/runs/<run_id>/profiles/assemble_video.pstats
+    Drop a .collapsed.txt file on https://www.speedscope.app
+    or run flamegraph.pl on it for a flame graph.
+
+The scheduler profiles the next video when the file in
+PROFILE_TRIGGER_FILE exists (see config.py) - no restart needed.
+"""
+
+import contextlib
+import cProfile
+import os
+import sys
+import threading
+import tracemalloc
+
+MODES = ("cpu", "sample", "memory")
+
+# Seconds between two stack samples (200 per second)
+SAMPLE_INTERVAL = 0.005
+
+# Stages traced in memory mode (tracemalloc slows everything down)
+MEMORY_STAGES = ("assemble_video",)
+
+# Lines in the memory report
+TOP_ALLOCATIONS = 25
+
+# Frames kept per allocation in memory mode (more = slower, clearer traces)
+MEMORY_TRACE_FRAMES = 10
+
+
+def check_mode(mode):
+    """Fail early on typos"""
+    if mode not in MODES:
+        raise ValueError(f"Unknown profile mode '{mode}' (choose from: {', '.join(MODES)})")
+    return mode
+
+
+def take_trigger(path):
+    """
+    Profile mode asked for in a trigger file, or None.
+
+    The file is removed, so only one run is profiled. An empty file
+    means "cpu".
+    """
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            mode = f.read().strip().lower() or "cpu"
+        os.remove(path)
+    except OSError:
+        return None
+    if mode not in MODES:
+        print(f"  Warning: Unknown profile mode '{mode}' in {path} - using cpu")
+        mode = "cpu"
+    return mode
+
+
+def _frame_name(frame):
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class StackSampler(threading.Thread):
+    """Samples the call stack of one thread, for a flame graph"""
+
+    def __init__(self, thread_id, interval=SAMPLE_INTERVAL):
+        super().__init__(name="stack-sampler", daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.counts = {}
+        self._stopped = threading.Event()
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(_frame_name(frame))
+                frame = frame.f_back
+            if stack:
+                key = ";".join(reversed(stack))
+                self.counts[key] = self.counts.get(key, 0) + 1
+
+    def stop(self):
+        self._stopped.set()
+        self.join()
+
+    def write(self, path):
+        """Collapsed stacks: one 'outer;inner;innermost count' line per stack"""
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in sorted(self.counts.items()):
+                f.write(f"{stack} {count}\n")
+        return path
+
+
+class StageProfiler:
+    """Profiles the stages of one run into <run_dir>/profiles"""
+
+    def __init__(self, mode, run_dir):
+        self.mode = check_mode(mode)
+        self.folder = os.path.join(run_dir, "profiles")
+        os.makedirs(self.folder, exist_ok=True)
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """
+        Profile one stage. Yields a list that holds the written profile
+        files once the stage is done.
+        """
+        files = []
+        profile = cProfile.Profile() if self.mode == "cpu" else None
+        sampler = StackSampler(threading.get_ident()) if self.mode in ("cpu", "sample") else None
+        memory = self.mode == "memory" and name in MEMORY_STAGES
+
+        if memory:
+            before = self._start_memory()
+        if sampler:
+            sampler.start()
+        if profile:
+            profile.enable()
+        try:
+            yield files
+        finally:
+            if profile:
+                profile.disable()
+                path = os.path.join(self.folder, f"{name}.pstats")
+                profile.dump_stats(path)
+                files.append(path)
+            if sampler:
+                sampler.stop()
+                files.append(sampler.write(os.path.join(self.folder, f"{name}.collapsed.txt")))
+            if memory:
+                files.extend(self._finish_memory(name, before))
+
+    def _start_memory(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(MEMORY_TRACE_FRAMES)
+        tracemalloc.reset_peak()
+        return tracemalloc.take_snapshot()
+
+    def _finish_memory(self, name, before):
+        after = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        snapshot_file = os.path.join(self.folder, f"{name}.tracemalloc")
+        after.dump(snapshot_file)
+
+        report_file = os.path.join(self.folder, f"{name}.memory.txt")
+        ignore = [tracemalloc.Filter(False, tracemalloc.__file__)]
+        growth = after.filter_traces(ignore).compare_to(before.filter_traces(ignore), "lineno")
+        with open(report_file, "w", encoding="utf-8") as f:
+            f.write(f"Stage: {name}\n")
+            f.write(f"Peak Python memory during the stage: {peak / 1_000_000:.1f} MB\n")
+            f.write(f"Still allocated at the end: {current / 1_000_000:.1f} MB\n\n")
+            f.write(f"Top {TOP_ALLOCATIONS} lines by memory growth:\n")
+            for stat in growth[:TOP_ALLOCATIONS]:
+                f.write(f"  {stat}\n")
+        return [report_file, snapshot_file]
@@ -0,0 +1,169 @@
+"""
+STARTER PROJECT HELPERS
+=======================
+Code the ten starter projects (projects/01-shark-facts to
+10-superhero-facts) share, kept in one place instead of pasted into
+every run_project.py. The clip downloads are also used by
+auto_video_creator.py and scripts/master_automation.py.
+
+- Topic history: a project warns before making a topic its channel
+  already has, and remembers every video it finishes (the same history
+  files as auto_video_creator.py, see topic_history.py)
+- Clip downloads: only as many seconds of footage as the voiceover
+  needs, in the smallest file that is still sharp enough
+"""
+
+import contextlib
+import os
+
+import requests
+
+import ffmpeg_tools
+from instrumentation import count_bytes
+from topic_history import channel_history
+
+# Pexels video search (the benchmarks point this at a local stand-in)
+PEXELS_VIDEO_SEARCH_URL = "https://api.pexels.com/videos/search"
+
+
+def check_topic(topic, channel):
+    """
+    Look the topic up in the channel's history.
+
+    Returns the history (to record the finished video in), or None if
+    the topic was made before and the user does not want a repeat.
+    """
+    history = channel_history(channel)
+    earlier = history.find_duplicate(topic)
+    if earlier:
+        print(f"  You already made a video about this on {earlier['made'][:10]}:")
+        print(f"    {earlier['title']}")
+        print("  Change TOPIC in config.py to make something new.")
+        answer = input("  Make it again anyway? (y/n): ")
+        if not answer.strip().lower().startswith("y"):
+            return None
+    return history
+
+
+def get_audio_length(audio_file):
+    """How long is the voiceover? (in seconds, None if unknown)"""
+    if not audio_file or not os.path.exists(audio_file):
+        return None
+    return ffmpeg_tools.probe_duration(audio_file)
+
+
+def pick_video_file(video_files, width=1920, height=1080):
+    """
+    Pick the smallest file that is still at least width x height
+    (no giant 4K downloads!). If nothing is that big, the biggest one.
+    """
+    def pixels(vf):
+        return (vf.get("width") or 0) * (vf.get("height") or 0)
+
+    candidates = [vf for vf in video_files if vf.get("link")]
+    big_enough = [vf for vf in candidates
+                  if (vf.get("width") or 0) >= width and (vf.get("height") or 0) >= height]
+    if big_enough:
+        return min(big_enough, key=lambda vf: (pixels(vf), vf.get("size") or 0))
+    if candidates:
+        return max(candidates, key=pixels)
+    return None
+
+
+def download_clips(api_key, search_terms, clips_folder, narration_seconds, num_clips,
+                   width=1920, height=1080, search_url=None):
+    """
+    Download Pexels clips for a voiceover of narration_seconds, split
+    into num_clips equal parts.
+
+    Stops as soon as there are num_clips clips that together cover the
+    narration (at most twice as many clips if they are all short).
+    Every clip is the smallest file of at least width x height, and
+    clips downloaded before are reused, not downloaded again.
+    """
+    os.makedirs(clips_folder, exist_ok=True)
+    clip_seconds = narration_seconds / num_clips
+    print(f"  Need {num_clips} clips of ~{clip_seconds:.0f}s ({narration_seconds:.0f}s of narration)")
+
+    downloaded = []
+    footage_seconds = 0.0
+    seen_ids = set()
+
+    def have_enough():
+        if len(downloaded) >= num_clips * 2:
+            return True
+        return len(downloaded) >= num_clips and footage_seconds >= narration_seconds
+
+    for term in search_terms:
+        if have_enough():
+            break
+        print(f"  Searching for: {term}")
+
+        try:
+            response = requests.get(
+                search_url or PEXELS_VIDEO_SEARCH_URL,
+                headers={"Authorization": api_key},
+                params={"query": term, "per_page": 10, "orientation": "landscape"},
+                timeout=30
+            )
+            if response.status_code != 200:
+                continue
+            videos = [v for v in response.json().get("videos", []) if v.get("id") not in seen_ids]
+
+            # Clips long enough for their part first (the shortest of those -
+            # less to download), then the longest of the short ones
+            def order(video):
+                duration = video.get("duration") or 0
+                if duration >= clip_seconds:
+                    return (0, duration)
+                return (1, -duration)
+
+            videos.sort(key=order)
+
+            for video in videos:
+                if have_enough():
+                    break
+                vf = pick_video_file(video.get("video_files", []), width, height)
+                if not vf:
+                    continue
+
+                seen_ids.add(video.get("id"))
+                filename = os.path.join(clips_folder, f"pexels_{video.get('id')}_{vf.get('width')}x{vf.get('height')}.mp4")
+                # Same Pexels video + size downloaded before? Reuse it
+                if not os.path.exists(filename):
+                    print(f"    Downloading video {video.get('id')} ({vf.get('width')}x{vf.get('height')})...")
+                    if not download_file(vf["link"], filename):
+                        continue
+
+                downloaded.append(filename)
+                footage_seconds += video.get("duration") or clip_seconds
+                print(f"    Clip {len(downloaded)}: {video.get('duration', '?')}s "
+                      f"({footage_seconds:.0f}/{narration_seconds:.0f}s)")
+
+        except Exception as e:
+            print(f"    Error: {e}")
+
+    return downloaded
+
+
+def download_file(url, filename):
+    """
+    Download a file, to a temporary name first so no half files are
+    kept. Returns False if it could not be downloaded.
+    """
+    temp_filename = filename + ".part"
+    try:
+        response = requests.get(url, stream=True, timeout=60)
+        if response.status_code != 200:
+            return False
+        with open(temp_filename, "wb") as f:
+            for chunk in response.iter_content(chunk_size=1024 * 1024):
+                f.write(chunk)
+                count_bytes("downloaded", len(chunk))
+    except (requests.RequestException, OSError) as e:
+        print(f"    Download failed: {e}")
+        with contextlib.suppress(OSError):
+            os.remove(temp_filename)
+        return False
+    os.replace(temp_filename, filename)
+    return True
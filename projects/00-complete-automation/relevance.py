@@ -0,0 +1,152 @@
+"""
+NICHE RELEVANCE - HOW WELL DOES A TREND FIT YOUR CHANNEL?
+=========================================================
+Gives every trend a score from 0 to 1 instead of a plain yes/no
+"does it contain a keyword" check:
+
+- Keyword match: all NICHE_KEYWORDS are compiled into ONE regular
+  expression, so a title is scanned once (not once per keyword).
+  "fact" also matches "facts", "amazing" also matches "amazingly".
+- Word overlap: how many words of the title share a stem with the
+  niche vocabulary ("planets" and "planet" count as the same word).
+- Similarity: a small local "embedding" (hashed letter groups) of the
+  niche, compared with the title. It catches near-misses like
+  "astronaut" for a space channel without any download or API.
+
+Everything about a niche is prepared once and reused, so ranking
+hundreds of trends for many channels takes milliseconds.
+"""
+
+import math
+import re
+import threading
+import zlib
+
+# Weights of the three parts of the score (they add up to 1)
+KEYWORD_WEIGHT = 0.5
+OVERLAP_WEIGHT = 0.25
+SIMILARITY_WEIGHT = 0.25
+
+# Size of the hashed letter-group vectors
+EMBEDDING_DIMENSIONS = 4096
+NGRAM_SIZE = 3
+
+# Small words that say nothing about the topic
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "how", "in",
+    "is", "it", "of", "on", "or", "that", "the", "this", "to", "vs", "was",
+    "what", "when", "who", "why", "will", "with", "you", "your",
+}
+
+SUFFIXES = ("ingly", "ation", "ness", "ing", "ies", "ied", "ed", "ly", "es", "s")
+
+WORD_PATTERN = re.compile(r"[a-z0-9]+")
+
+# One scorer per niche, shared by every channel in this process
+_scorers = {}
+_scorers_lock = threading.Lock()
+
+
+def stem(word):
+    """Very small suffix stripper: 'planets' -> 'planet', 'amazing' -> 'amaz'"""
+    for suffix in SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            return word[:-len(suffix)]
+    return word
+
+
+def tokens(text):
+    """Lowercase words of a text, without stopwords"""
+    return [word for word in WORD_PATTERN.findall(text.lower()) if word not in STOPWORDS]
+
+
+def embed(text):
+    """Hashed letter-group vector of a text, normalized to length 1"""
+    vector = {}
+    for word in tokens(text):
+        padded = f" {word} "
+        for i in range(max(1, len(padded) - NGRAM_SIZE + 1)):
+            bucket = zlib.crc32(padded[i:i + NGRAM_SIZE].encode()) % EMBEDDING_DIMENSIONS
+            vector[bucket] = vector.get(bucket, 0.0) + 1.0
+
+    norm = math.sqrt(sum(value * value for value in vector.values()))
+    if norm:
+        for bucket in vector:
+            vector[bucket] /= norm
+    return vector
+
+
+def cosine(a, b):
+    """Similarity of two normalized vectors (0 = unrelated, 1 = identical)"""
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(value * b.get(bucket, 0.0) for bucket, value in a.items())
+
+
+class NicheScorer:
+    """Scores trend titles against one niche; build once, score many times"""
+
+    def __init__(self, keywords, extra_texts=(), use_embeddings=True):
+        self.keywords = [keyword.strip().lower() for keyword in keywords if keyword.strip()]
+        self.use_embeddings = use_embeddings
+
+        # One regex for all keywords, longest first so phrases win
+        phrases = sorted(
+            {r"\w*\s+".join(re.escape(stem(word)) for word in WORD_PATTERN.findall(keyword))
+             for keyword in self.keywords},
+            key=len, reverse=True
+        )
+        phrases = [phrase for phrase in phrases if phrase]
+        self.pattern = re.compile(r"\b(?:" + "|".join(phrases) + r")\w*") if phrases else None
+
+        # Stems of everything that describes the niche
+        vocabulary_texts = list(self.keywords) + list(extra_texts)
+        self.vocabulary = {stem(word) for text in vocabulary_texts for word in tokens(text)}
+
+        # Similarity index: one vector per keyword and example title
+        self.index = [embed(text) for text in vocabulary_texts] if use_embeddings else []
+        self.index = [vector for vector in self.index if vector]
+
+    def score(self, title):
+        """Relevance of one title, from 0 (off-niche) to 1"""
+        keyword_score = 1.0 if self.pattern and self.pattern.search(title.lower()) else 0.0
+
+        title_stems = {stem(word) for word in tokens(title)}
+        overlap_score = len(title_stems & self.vocabulary) / len(title_stems) if title_stems else 0.0
+
+        similarity_score = 0.0
+        if self.index:
+            vector = embed(title)
+            if vector:
+                similarity_score = max(cosine(vector, entry) for entry in self.index)
+
+        if not self.index:
+            # Share the similarity weight between the other two parts
+            total = KEYWORD_WEIGHT + OVERLAP_WEIGHT
+            return round((KEYWORD_WEIGHT * keyword_score + OVERLAP_WEIGHT * overlap_score) / total, 3)
+
+        return round(
+            KEYWORD_WEIGHT * keyword_score
+            + OVERLAP_WEIGHT * overlap_score
+            + SIMILARITY_WEIGHT * similarity_score, 3
+        )
+
+    def rank(self, titles, min_score=0.0):
+        """
+        Titles with their scores, best first: [(score, title), ...]
+
+        Titles scoring below min_score are left out.
+        """
+        scored = [(self.score(title), title) for title in titles]
+        ranked = [item for item in scored if item[0] >= min_score]
+        ranked.sort(key=lambda item: item[0], reverse=True)
+        return ranked
+
+
+def get_scorer(niche, keywords, extra_texts=(), use_embeddings=True):
+    """Shared scorer for a niche (built the first time it is asked for)"""
+    key = (niche.lower(), tuple(keywords), tuple(extra_texts), use_embeddings)
+    with _scorers_lock:
+        if key not in _scorers:
+            _scorers[key] = NicheScorer(keywords, [niche] + list(extra_texts), use_embeddings)
+        return _scorers[key]
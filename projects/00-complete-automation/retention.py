@@ -0,0 +1,247 @@
+"""
+RETENTION - CLEAN UP OLD FILES SAFELY
+=====================================
+Videos, voiceovers and clips pile up run after run until the disk is
+full. This removes the files that are no longer needed, following one
+rule per kind of file (set in config.py):
+
+- final videos       kept N days after they were uploaded
+                     (videos never uploaded: kept M days)
+- voiceovers etc.    deleted once the video is on YouTube
+- downloaded clips   kept while any recent video still uses them
+- backgrounds        cached placeholders unused for N days
+- video sections     cached renders (edl.py) and music mixes unused for N days
+- script, captions, thumbnail, metadata: small, always kept
+
+Which video uses which file comes from the artifact index
+(artifact_index.py). A file is only deleted when EVERY run that used it
+is done with it, and only if it is still exactly the file that was
+recorded - a file that was replaced or is in use by a running video is
+left alone.
+
+The scheduler cleans up a little in its idle time (see
+RETENTION_SECONDS_PER_PASS). To see or clean up right now:
+
+    python retention.py --dry-run        # what would be deleted
+    python retention.py                  # delete it
+"""
+
+import argparse
+import datetime
+import os
+import time
+
+from artifact_index import ArtifactIndex, MANIFEST_NAME
+
+# Files only needed until the video is on YouTube
+INTERMEDIATE_KINDS = ("voiceover", "word_timings")
+
+# Files shared between runs (kept while a recent run used them)
+SHARED_KINDS = ("clip",)
+
+# A run folder without a manifest that changed this recently is still running
+ACTIVE_RUN_HOURS = 6
+
+
+def _parse_time(text):
+    return datetime.datetime.fromisoformat(text) if text else None
+
+
+class RetentionPolicy:
+    """How long each kind of file is kept"""
+
+    def __init__(self, video_days_after_upload=7, unuploaded_video_days=30, clip_days=14,
+                 delete_intermediates_after_upload=True, background_days=30, segment_days=7):
+        self.video_days_after_upload = video_days_after_upload
+        self.unuploaded_video_days = unuploaded_video_days
+        self.clip_days = clip_days
+        self.delete_intermediates_after_upload = delete_intermediates_after_upload
+        self.background_days = background_days
+        self.segment_days = segment_days
+
+    def expires(self, reference):
+        """When one run is done with one file (None = keep it)"""
+        kind = reference["kind"]
+        started = _parse_time(reference["started"])
+        uploaded = _parse_time(reference["uploaded"])
+
+        if kind in SHARED_KINDS:
+            if self.clip_days is None or started is None:
+                return None
+            return started + datetime.timedelta(days=self.clip_days)
+
+        if kind == "video" or kind in INTERMEDIATE_KINDS:
+            if uploaded:
+                if kind in INTERMEDIATE_KINDS and self.delete_intermediates_after_upload:
+                    return uploaded
+                if self.video_days_after_upload is None:
+                    return None
+                return uploaded + datetime.timedelta(days=self.video_days_after_upload)
+            if self.unuploaded_video_days is None or started is None:
+                return None
+            return started + datetime.timedelta(days=self.unuploaded_video_days)
+
+        # Scripts, captions, thumbnails, metadata: the record of what was made
+        return None
+
+
+class RetentionManager:
+    """Finds expired files in the artifact index and deletes them bit by bit"""
+
+    def __init__(self, index, policy, asset_cache=None, segment_cache=None, mix_cache=None):
+        self.index = index
+        self.policy = policy
+        self.asset_cache = asset_cache
+        self.segment_cache = segment_cache
+        self.mix_cache = mix_cache
+
+    def expired_files(self, now=None):
+        """Files every run is done with, oldest first"""
+        now = now or datetime.datetime.now()
+        files = {}
+        for reference in self.index.file_references():
+            key = (reference["path"], reference["mtime_ns"])
+            entry = files.setdefault(key, {
+                "path": reference["path"],
+                "mtime_ns": reference["mtime_ns"],
+                "size": reference["size"],
+                "kind": reference["kind"],
+                "runs": 0,
+                "expires": datetime.datetime.min,
+            })
+            entry["runs"] += 1
+            expires = self.policy.expires(reference)
+            # One run that still needs the file keeps it
+            entry["expires"] = None if expires is None or entry["expires"] is None else max(entry["expires"], expires)
+
+        expired = [f for f in files.values() if f["expires"] is not None and f["expires"] <= now]
+        return sorted(expired, key=lambda f: f["expires"])
+
+    def active_runs(self):
+        """Runs that are making a video right now (no manifest yet, recently changed)"""
+        active = []
+        cutoff = time.time() - ACTIVE_RUN_HOURS * 3600
+        for folder in self.index.runs_folders():
+            try:
+                names = os.listdir(folder)
+            except OSError:
+                continue
+            for run_id in names:
+                run_dir = os.path.join(folder, run_id)
+                if not os.path.isdir(run_dir) or os.path.exists(os.path.join(run_dir, MANIFEST_NAME)):
+                    continue
+                try:
+                    if os.path.getmtime(run_dir) > cutoff or any(
+                        os.path.getmtime(os.path.join(run_dir, name)) > cutoff for name in os.listdir(run_dir)
+                    ):
+                        active.append(run_id)
+                except OSError:
+                    continue
+        return active
+
+    def run_pass(self, budget_seconds=None, dry_run=False):
+        """
+        Delete expired files until budget_seconds is used up (None = all).
+        Safe to stop at any point; the next pass continues.
+        """
+        deadline = time.time() + budget_seconds if budget_seconds else None
+        stats = {"deleted": 0, "bytes": 0, "skipped": 0, "left": 0, "backgrounds": 0, "segments": 0, "mixes": 0}
+
+        # Clips and backgrounds may be in use by a video being made right now
+        busy = bool(self.active_runs())
+
+        expired = self.expired_files()
+        for number, entry in enumerate(expired):
+            if deadline and time.time() > deadline:
+                stats["left"] = len(expired) - number
+                break
+            if busy and entry["kind"] in SHARED_KINDS:
+                stats["skipped"] += 1
+                continue
+            if dry_run:
+                print(f"  Would delete {entry['path']} ({entry['size'] / 1_000_000:.1f} MB, "
+                      f"{entry['kind']}, used by {entry['runs']} run(s))")
+                stats["deleted"] += 1
+                stats["bytes"] += entry["size"]
+                continue
+            self._delete(entry, stats)
+
+        caches = [
+            (self.asset_cache, self.policy.background_days, "backgrounds"),
+            (self.segment_cache, self.policy.segment_days, "segments"),
+            (self.mix_cache, self.policy.segment_days, "mixes"),
+        ]
+        for cache, days, name in caches:
+            if not cache or days is None or busy or dry_run:
+                continue
+            if not deadline or time.time() < deadline:
+                files, removed = cache.remove_unused(days, deadline)
+                stats[name] += files
+                stats["bytes"] += removed
+        return stats
+
+    def _delete(self, entry, stats):
+        path = entry["path"]
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            self.index.mark_deleted(path, entry["mtime_ns"], entry["size"], "missing")
+            return
+
+        if stat.st_mtime_ns != entry["mtime_ns"] or stat.st_size != entry["size"]:
+            # Something newer has this name now - that file is not ours to delete
+            self.index.mark_deleted(path, entry["mtime_ns"], entry["size"], "replaced")
+            stats["skipped"] += 1
+            return
+
+        try:
+            os.remove(path)
+        except OSError as e:
+            print(f"  Warning: Could not delete {path}: {e}")
+            stats["skipped"] += 1
+            return
+        self.index.mark_deleted(path, entry["mtime_ns"], entry["size"], "expired")
+        stats["deleted"] += 1
+        stats["bytes"] += entry["size"]
+
+
+def make_manager():
+    """RetentionManager with the settings from config.py"""
+    from asset_cache import AssetCache, MixCache, SegmentCache
+    from config import (
+        ARTIFACT_INDEX_FILE, ASSET_CACHE_FOLDER, KEEP_VIDEOS_DAYS_AFTER_UPLOAD, KEEP_UNUPLOADED_VIDEOS_DAYS,
+        KEEP_CLIPS_DAYS, DELETE_INTERMEDIATES_AFTER_UPLOAD, KEEP_BACKGROUNDS_DAYS, KEEP_SEGMENTS_DAYS
+    )
+
+    policy = RetentionPolicy(
+        video_days_after_upload=KEEP_VIDEOS_DAYS_AFTER_UPLOAD,
+        unuploaded_video_days=KEEP_UNUPLOADED_VIDEOS_DAYS,
+        clip_days=KEEP_CLIPS_DAYS,
+        delete_intermediates_after_upload=DELETE_INTERMEDIATES_AFTER_UPLOAD,
+        background_days=KEEP_BACKGROUNDS_DAYS,
+        segment_days=KEEP_SEGMENTS_DAYS,
+    )
+    return RetentionManager(ArtifactIndex(ARTIFACT_INDEX_FILE), policy,
+                            AssetCache(ASSET_CACHE_FOLDER), SegmentCache(ASSET_CACHE_FOLDER),
+                            MixCache(ASSET_CACHE_FOLDER))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Delete videos, voiceovers and clips that are no longer needed")
+    parser.add_argument("--dry-run", action="store_true", help="Only show what would be deleted")
+    parser.add_argument("--budget", type=float, help="Stop after this many seconds")
+    args = parser.parse_args()
+
+    stats = make_manager().run_pass(args.budget, dry_run=args.dry_run)
+    verb = "Would free" if args.dry_run else "Freed"
+    print(f"\n  {verb} {stats['bytes'] / 1_000_000:.1f} MB "
+          f"({stats['deleted']} files, {stats['backgrounds']} cached backgrounds, "
+          f"{stats['segments']} cached sections, {stats['mixes']} music mixes)")
+    if stats["skipped"]:
+        print(f"  Skipped {stats['skipped']} files (in use or replaced)")
+    if stats["left"]:
+        print(f"  {stats['left']} more files next time")
+
+
+if __name__ == "__main__":
+    main()
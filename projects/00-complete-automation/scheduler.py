@@ -8,6 +8,13 @@ NO MANUAL INTERVENTION REQUIRED!
 
 Usage:
     python scheduler.py
+    python scheduler.py --profile        (profile every video)
+    python scheduler.py --encode-profile fast   (encode every video with "fast")
+
+To profile just the next video without a restart, create the file named in
+PROFILE_TRIGGER_FILE (config.py) in the folder the scheduler runs in.
+To encode just the next video with another profile, write its name in the
+file named in ENCODE_PROFILE_TRIGGER_FILE.
 
 To run in background on Windows:
     pythonw scheduler.py
@@ -18,6 +25,7 @@ To stop: Close the window or press Ctrl+C
 import os
 import sys
 import time
+import argparse
 import datetime
 import threading
 import logging
@@ -33,18 +41,36 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-from config import VIDEOS_PER_DAY, SCHEDULE_HOUR, SCHEDULE_MINUTE
+from config import (
+    VIDEOS_PER_DAY, SCHEDULE_HOUR, SCHEDULE_MINUTE, UPLOAD_IN_BACKGROUND, METRICS_PORT, METRICS_HOST, YOUTUBE_CHANNEL,
+    PROFILE_TRIGGER_FILE, RETENTION_ENABLED, RETENTION_SECONDS_PER_PASS, ENCODE_PROFILE,
+    ENCODE_PROFILE_TRIGGER_FILE
+)
+import encode_profiles
+import profiling
 
 
-def run_automation():
+def run_automation(profile=None, encode_profile=None):
     """Run the video automation script"""
     try:
         logger.info("Starting video automation...")
         
+        # A trigger file profiles just this video (no restart needed)
+        requested = profiling.take_trigger(PROFILE_TRIGGER_FILE)
+        if requested:
+            logger.info(f"Profiling this video ({requested}) - asked for in {PROFILE_TRIGGER_FILE}")
+        
+        # Same for the encode profile of just this video
+        requested_encode = encode_profiles.take_trigger(ENCODE_PROFILE_TRIGGER_FILE)
+        if requested_encode:
+            logger.info(f"Encoding this video with '{requested_encode}' - asked for in {ENCODE_PROFILE_TRIGGER_FILE}")
+        
         # Import and run automation
         from auto_video_creator import YouTubeAutomation
         
-        automation = YouTubeAutomation()
+        automation = YouTubeAutomation(encode_profile=requested_encode or encode_profile,
+                                       upload_in_background=UPLOAD_IN_BACKGROUND,
+                                       profile=requested or profile)
         success = automation.run()
         
         if success:
@@ -59,6 +85,58 @@ def run_automation():
         return False
 
 
+def start_upload_worker():
+    """Start the background worker that uploads videos from the outbox"""
+    try:
+        from upload_queue import UploadWorker, make_queue
+        
+        worker = UploadWorker(make_queue())
+        worker.start()
+        logger.info("Upload worker started (uploads videos as YouTube quota allows)")
+        return worker
+        
+    except Exception as e:
+        logger.error(f"Could not start upload worker: {e}")
+        return None
+
+
+def start_metrics(upload_worker=None):
+    """Start the metrics web page for monitoring (if METRICS_PORT is set)"""
+    if not METRICS_PORT:
+        return None
+    try:
+        import metrics_server
+        
+        metrics = metrics_server.PipelineMetrics(YOUTUBE_CHANNEL)
+        if upload_worker:
+            metrics.watch_upload_queue(upload_worker.queue)
+        metrics_server.start_server(metrics.registry, METRICS_PORT, METRICS_HOST)
+        logger.info(f"Metrics at http://{METRICS_HOST}:{METRICS_PORT}/metrics")
+        return metrics
+        
+    except Exception as e:
+        logger.error(f"Could not start metrics server: {e}")
+        return None
+
+
+def run_cleanup(budget_seconds):
+    """Delete files that are no longer needed, for at most budget_seconds"""
+    if not RETENTION_ENABLED:
+        return
+    try:
+        from retention import make_manager
+        
+        stats = make_manager().run_pass(budget_seconds)
+        cached = stats["backgrounds"] + stats["segments"] + stats["mixes"]
+        if stats["deleted"] or cached:
+            logger.info(f"Cleanup freed {stats['bytes'] / 1_000_000:.0f} MB "
+                        f"({stats['deleted']} files, {cached} cached renders"
+                        f"{', more next time' if stats['left'] else ''})")
+        
+    except Exception as e:
+        logger.error(f"Cleanup failed: {e}")
+
+
 def get_next_run_time():
     """Calculate the next scheduled run time"""
     now = datetime.datetime.now()
@@ -88,6 +166,11 @@ def wait_until(target_time):
         # Calculate remaining time
         remaining = (target_time - now).total_seconds()
         
+        # Use the waiting time to clean up (never close to a run)
+        if remaining > 300:
+            run_cleanup(RETENTION_SECONDS_PER_PASS)
+            remaining = (target_time - datetime.datetime.now()).total_seconds()
+        
         # Show countdown every hour
         if remaining > 3600:
             hours = int(remaining / 3600)
@@ -115,11 +198,22 @@ def print_banner():
 
 def main():
     """Main scheduler loop"""
+    parser = argparse.ArgumentParser(description="Krwutarth's daily video scheduler")
+    parser.add_argument("--profile", nargs="?", const="cpu", choices=profiling.MODES,
+                        help="Profile every video (cpu, sample or memory; default: cpu)")
+    parser.add_argument("--encode-profile", choices=list(encode_profiles.ENCODE_PROFILES),
+                        help=f"Encode profile for every video (default: {ENCODE_PROFILE})")
+    args = parser.parse_args()
+    
     print_banner()
     
     logger.info("Scheduler started!")
     logger.info(f"Will create {VIDEOS_PER_DAY} video(s) at {SCHEDULE_HOUR:02d}:{SCHEDULE_MINUTE:02d} daily")
     
+    # Uploads run on their own, so a slow upload never holds up the next render
+    upload_worker = start_upload_worker() if UPLOAD_IN_BACKGROUND else None
+    metrics = start_metrics(upload_worker)
+    
     # Ask if user wants to run immediately
     try:
         response = input("\nRun automation now? (y/n): ").strip().lower()
@@ -127,7 +221,7 @@ def main():
             logger.info("Running automation now...")
             for i in range(VIDEOS_PER_DAY):
                 logger.info(f"Creating video {i+1}/{VIDEOS_PER_DAY}...")
-                run_automation()
+                run_automation(args.profile, args.encode_profile)
                 if i < VIDEOS_PER_DAY - 1:
                     logger.info("Waiting 5 minutes before next video...")
                     time.sleep(300)
@@ -140,6 +234,8 @@ def main():
             # Get next run time
             next_run = get_next_run_time()
             logger.info(f"Next scheduled run: {next_run.strftime('%Y-%m-%d %H:%M:%S')}")
+            if metrics:
+                metrics.next_run.set(next_run.timestamp(), channel=YOUTUBE_CHANNEL)
             
             # Wait until scheduled time
             wait_until(next_run)
@@ -147,7 +243,7 @@ def main():
             # Run automation for each video
             for i in range(VIDEOS_PER_DAY):
                 logger.info(f"Creating scheduled video {i+1}/{VIDEOS_PER_DAY}...")
-                run_automation()
+                run_automation(args.profile, args.encode_profile)
                 
                 # Wait between videos
                 if i < VIDEOS_PER_DAY - 1:
@@ -161,6 +257,8 @@ def main():
             break
         except Exception as e:
             logger.error(f"Scheduler error: {e}")
+            if metrics:
+                metrics.errors.inc(channel=YOUTUBE_CHANNEL)
             logger.info("Retrying in 1 hour...")
             time.sleep(3600)
 
@@ -0,0 +1,225 @@
+"""
+TOPIC HISTORY - NEVER MAKE THE SAME VIDEO TWICE
+===============================================
+Remembers every topic a channel has already made, so the automation
+picks something new next time.
+
+- Exact repeats: titles are normalized ("5 Amazing Facts About Dolphins!"
+  and "amazing facts about dolphins" are the same) and hashed, so
+  checking a title is one dictionary lookup.
+- Near repeats: every title gets a MinHash signature (a short
+  fingerprint of its letter groups). Similar titles share parts of
+  their fingerprint, so only those few are compared - even with
+  thousands of videos in the history.
+
+One JSON file per channel (YOUTUBE_CHANNEL), in TOPIC_HISTORY_FOLDER.
+The starter projects and scripts/master_automation.py use the same
+files (channel_history), so no script repeats another one's topic.
+The file is locked and read again before every save, so runs at the
+same time never lose each other's topics.
+"""
+
+import datetime
+import hashlib
+import json
+import os
+import re
+import threading
+import zlib
+
+from relevance import stem, tokens
+from youtube_auth import file_lock
+
+# MinHash fingerprint: NUM_BANDS x ROWS_PER_BAND numbers
+NUM_BANDS = 16
+ROWS_PER_BAND = 4
+NUM_HASHES = NUM_BANDS * ROWS_PER_BAND
+
+# Shared history folder for scripts that run from other folders
+DEFAULT_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "topic_history")
+
+SHINGLE_SIZE = 4
+_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+
+def _hash_params():
+    """Fixed random-looking (a, b) pairs, the same on every computer"""
+    params = []
+    for i in range(NUM_HASHES):
+        digest = hashlib.sha1(f"minhash-{i}".encode()).digest()
+        a = int.from_bytes(digest[:8], "big") % _PRIME or 1
+        b = int.from_bytes(digest[8:16], "big") % _PRIME
+        params.append((a, b))
+    return params
+
+
+HASH_PARAMS = _hash_params()
+
+
+def normalize_title(title):
+    """Word stems of a title in sorted order, without numbers or filler words"""
+    words = {stem(word) for word in tokens(title) if not word.isdigit()}
+    return " ".join(sorted(words))
+
+
+def title_key(title):
+    """Exact-match key of a title"""
+    return hashlib.sha1(normalize_title(title).encode()).hexdigest()
+
+
+def shingles(title):
+    """Overlapping letter groups of the normalized title"""
+    text = normalize_title(title)
+    if len(text) <= SHINGLE_SIZE:
+        return {text}
+    return {text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+
+
+def minhash(title):
+    """MinHash signature of a title (NUM_HASHES numbers)"""
+    values = [zlib.crc32(shingle.encode()) for shingle in shingles(title)]
+    return [min(((a * v + b) % _PRIME) & _MAX_HASH for v in values) for a, b in HASH_PARAMS]
+
+
+def similarity(signature_a, signature_b):
+    """Estimated share of letter groups two titles have in common (0 to 1)"""
+    same = sum(1 for x, y in zip(signature_a, signature_b) if x == y)
+    return same / NUM_HASHES
+
+
+def _bands(signature):
+    for band in range(NUM_BANDS):
+        rows = signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]
+        yield f"{band}:{'-'.join(map(str, rows))}"
+
+
+def history_file(folder, channel):
+    """History file of one channel"""
+    slug = re.sub(r"[^a-z0-9]+", "_", channel.lower()).strip("_") or "default"
+    return os.path.join(folder, f"{slug}.json")
+
+
+def channel_history(channel, folder=None, threshold=0.6):
+    """The TopicHistory of one channel (in the shared folder by default)"""
+    return TopicHistory(history_file(folder or DEFAULT_FOLDER, channel or "main"), threshold)
+
+
+class TopicHistory:
+    """All topics one channel has made, with fast duplicate checks"""
+
+    def __init__(self, path, threshold=0.6):
+        self.path = path
+        self.threshold = threshold
+        self.topics = []
+        self._exact = {}
+        self._buckets = {}
+        self._loaded_mtime = None
+        self._lock = threading.Lock()
+        self._load()
+
+    def __len__(self):
+        return len(self.topics)
+
+    def find_duplicate(self, title):
+        """
+        The earlier topic this title repeats, or None.
+
+        Exact repeats are found with one lookup; near repeats only
+        compare titles that share at least one fingerprint band.
+        """
+        key = title_key(title)
+        signature = minhash(title)
+
+        with self._lock:
+            # Pick up topics other runs have made meanwhile
+            self._reload_if_changed()
+            if key in self._exact:
+                return self._exact[key]
+
+            candidates = set()
+            for band in _bands(signature):
+                candidates.update(self._buckets.get(band, ()))
+
+            best, best_score = None, self.threshold
+            for index in candidates:
+                score = similarity(signature, self.topics[index]["signature"])
+                if score >= best_score:
+                    best, best_score = self.topics[index], score
+            return best
+
+    def is_new(self, title):
+        """True if this channel has not made this (or a very similar) topic"""
+        return self.find_duplicate(title) is None
+
+    def filter_new(self, titles):
+        """Only the titles that have not been made yet (order kept)"""
+        return [title for title in titles if self.is_new(title)]
+
+    def record(self, title, video_file=None):
+        """Remember a finished topic and save the history"""
+        entry = {
+            "title": title,
+            "key": title_key(title),
+            "signature": minhash(title),
+            "made": datetime.datetime.now().isoformat(timespec="seconds"),
+            "video": video_file,
+        }
+        # Another run may have saved topics since this history was read
+        with self._lock, file_lock(self.path):
+            self._reload()
+            self._add(entry)
+            self._save()
+        return entry
+
+    # ----- storage -----
+
+    def _add(self, entry):
+        index = len(self.topics)
+        self.topics.append(entry)
+        self._exact.setdefault(entry["key"], entry)
+        for band in _bands(entry["signature"]):
+            self._buckets.setdefault(band, []).append(index)
+
+    def _reload_if_changed(self):
+        if self._mtime() != self._loaded_mtime:
+            self._reload()
+
+    def _reload(self):
+        self.topics = []
+        self._exact = {}
+        self._buckets = {}
+        self._load()
+
+    def _mtime(self):
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _load(self):
+        self._loaded_mtime = self._mtime()
+        if self._loaded_mtime is None:
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"  Warning: Could not read topic history {self.path}: {e}")
+            return
+
+        for entry in data.get("topics", []):
+            # Older or hand-edited entries may lack a fingerprint
+            if len(entry.get("signature") or []) != NUM_HASHES:
+                entry["signature"] = minhash(entry["title"])
+            entry["key"] = entry.get("key") or title_key(entry["title"])
+            self._add(entry)
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        # Write to a temporary file first so a crash never loses the history
+        temp_file = f"{self.path}.{os.getpid()}.tmp"
+        with open(temp_file, "w", encoding="utf-8") as f:
+            json.dump({"topics": self.topics}, f)
+        os.replace(temp_file, self.path)
+        self._loaded_mtime = self._mtime()
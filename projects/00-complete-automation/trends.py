@@ -0,0 +1,234 @@
+"""
+TREND DISCOVERY - MANY SOURCES AT ONCE
+======================================
+Looks for video topics in several places at the same time:
+- Google Trends trending searches for every country in TREND_REGIONS
+- Google Trends related queries for your NICHE_KEYWORDS
+- Your own topics file (one topic per line)
+
+Every source is cached for TREND_CACHE_MINUTES, so making several
+videos (or running several channels) only asks Google once.
+
+For tests and benchmarks, point TRENDS_FIXTURE (environment variable)
+or TREND_FIXTURE_FILE (config) at a JSON file and no network is used:
+    {"trending": {"US": ["topic", ...]},
+     "related": {"facts": ["query", ...]},
+     "topics": ["topic", ...]}
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from instrumentation import count_cache
+
+# Google Trends names countries instead of using country codes
+PYTRENDS_REGIONS = {
+    "US": "united_states",
+    "GB": "united_kingdom",
+    "CA": "canada",
+    "AU": "australia",
+    "IN": "india",
+    "DE": "germany",
+    "FR": "france",
+    "JP": "japan",
+    "BR": "brazil",
+    "MX": "mexico",
+}
+
+# Google Trends accepts at most 5 keywords per request
+KEYWORDS_PER_REQUEST = 5
+
+# Shared by every TrendFetcher in this process (e.g. the scheduler)
+_memory_cache = {}
+_memory_lock = threading.Lock()
+_source_locks = {}
+
+
+class TrendFetcher:
+    """Fetches trend candidates from all sources in parallel, with caching"""
+
+    def __init__(self, regions, niche_keywords, topics_file=None, cache_file=None,
+                 ttl_minutes=60, fixture_file=None, max_results=20):
+        self.regions = list(dict.fromkeys(regions))
+        self.niche_keywords = list(niche_keywords)
+        self.topics_file = topics_file
+        self.cache_file = cache_file
+        self.ttl_seconds = ttl_minutes * 60
+        self.fixture_file = fixture_file or os.environ.get("TRENDS_FIXTURE")
+        self.max_results = max_results
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._fixture = None
+
+    # ----- public -----
+
+    def fetch(self):
+        """
+        Return a list of unique candidates: {"title", "source", "region"}.
+
+        Sources that fail are skipped; the others still count.
+        """
+        sources = self.sources()
+
+        with ThreadPoolExecutor(max_workers=max(1, len(sources))) as pool:
+            futures = [(name, pool.submit(self.fetch_source, name, func)) for name, func in sources]
+            results = []
+            for name, future in futures:
+                try:
+                    results.append((name, future.result()))
+                except Exception as e:
+                    print(f"  Warning: Trend source '{name}' failed: {e}")
+
+        candidates = []
+        seen = set()
+        for name, titles in results:
+            source, _, detail = name.partition(":")
+            region = detail if source == "trending" else ""
+            for title in titles[:self.max_results]:
+                key = title.strip().lower()
+                if key and key not in seen:
+                    seen.add(key)
+                    candidates.append({"title": title.strip(), "source": source, "region": region})
+
+        return candidates
+
+    def sources(self):
+        """All (cache name, fetch function) pairs to query"""
+        sources = [(f"trending:{region}", self._trending_fetcher(region)) for region in self.regions]
+
+        for i in range(0, len(self.niche_keywords), KEYWORDS_PER_REQUEST):
+            batch = self.niche_keywords[i:i + KEYWORDS_PER_REQUEST]
+            sources.append((f"related:{'|'.join(batch)}", self._related_fetcher(batch)))
+
+        if self.topics_file:
+            sources.append((f"file:{os.path.basename(self.topics_file)}", self._topics_from_file))
+
+        return sources
+
+    def fetch_source(self, name, func):
+        """Return one source's titles from cache, or fetch (once) and cache them"""
+        key = self._cache_key(name)
+
+        cached = self._cached(key)
+        if cached is not None:
+            self.cache_hits += 1
+            count_cache("trends", hit=True)
+            return cached
+
+        # Only one thread fetches a given source; the others get its result
+        with _memory_lock:
+            source_lock = _source_locks.setdefault(key, threading.Lock())
+
+        with source_lock:
+            cached = self._cached(key)
+            if cached is not None:
+                self.cache_hits += 1
+                count_cache("trends", hit=True)
+                return cached
+
+            self.cache_misses += 1
+            count_cache("trends", hit=False)
+            titles = [str(title) for title in func()]
+            self._store(key, titles)
+            return titles
+
+    # ----- sources -----
+
+    def _trending_fetcher(self, region):
+        def fetch():
+            if self._use_fixture():
+                return self._load_fixture().get("trending", {}).get(region, [])
+            if region not in PYTRENDS_REGIONS:
+                # Not silently US trends: fetch() reports this source as failed
+                raise ValueError(f"Unknown trend region '{region}' "
+                                 f"(known: {', '.join(PYTRENDS_REGIONS)})")
+            from pytrends.request import TrendReq
+            pytrends = TrendReq(hl="en-US", tz=360)
+            result = pytrends.trending_searches(pn=PYTRENDS_REGIONS[region])
+            return result[0].tolist()
+        return fetch
+
+    def _related_fetcher(self, keywords):
+        def fetch():
+            if self._use_fixture():
+                related = self._load_fixture().get("related", {})
+                return [query for keyword in keywords for query in related.get(keyword, [])]
+            from pytrends.request import TrendReq
+            pytrends = TrendReq(hl="en-US", tz=360)
+            pytrends.build_payload(keywords, geo=self.regions[0] if self.regions else "")
+            queries = []
+            for data in pytrends.related_queries().values():
+                for kind in ("rising", "top"):
+                    frame = (data or {}).get(kind)
+                    if frame is not None and not frame.empty:
+                        queries.extend(frame["query"].tolist())
+            return queries
+        return fetch
+
+    def _topics_from_file(self):
+        if self._use_fixture():
+            return self._load_fixture().get("topics", [])
+        if not os.path.exists(self.topics_file):
+            return []
+        with open(self.topics_file, "r", encoding="utf-8") as f:
+            return [line.strip() for line in f if line.strip() and not line.startswith("#")]
+
+    # ----- fixture -----
+
+    def _use_fixture(self):
+        return bool(self.fixture_file)
+
+    def _load_fixture(self):
+        if self._fixture is None:
+            with open(self.fixture_file, "r", encoding="utf-8") as f:
+                self._fixture = json.load(f)
+        return self._fixture
+
+    # ----- cache -----
+
+    def _cache_key(self, name):
+        # Fixture results must never mix with real ones
+        if self._use_fixture():
+            digest = hashlib.sha1(os.path.abspath(self.fixture_file).encode()).hexdigest()[:8]
+            return f"fixture-{digest}:{name}"
+        return name
+
+    def _cached(self, key):
+        now = time.time()
+        with _memory_lock:
+            entry = _memory_cache.get(key)
+        if entry is None:
+            entry = self._read_cache_file().get(key)
+            if entry:
+                with _memory_lock:
+                    _memory_cache[key] = entry
+        if entry and now - entry["fetched"] < self.ttl_seconds:
+            return entry["titles"]
+        return None
+
+    def _store(self, key, titles):
+        entry = {"fetched": time.time(), "titles": titles}
+        with _memory_lock:
+            _memory_cache[key] = entry
+            if not self.cache_file:
+                return
+            data = self._read_cache_file()
+            data[key] = entry
+            # Write to a temporary file first so readers never see half a file
+            temp_file = f"{self.cache_file}.{os.getpid()}.tmp"
+            with open(temp_file, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(temp_file, self.cache_file)
+
+    def _read_cache_file(self):
+        if not self.cache_file or not os.path.exists(self.cache_file):
+            return {}
+        try:
+            with open(self.cache_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
@@ -0,0 +1,560 @@
+"""
+UPLOAD QUEUE - RENDER NOW, UPLOAD WHEN YOUTUBE ALLOWS
+=====================================================
+Finished videos are put in the outbox folder (output/outbox) instead of
+being uploaded straight away. An upload worker empties the outbox in
+the background, so the next video can render while this one uploads.
+
+- Videos, thumbnails and captions upload at the same time, up to
+  UPLOAD_CONCURRENCY at once (thumbnail and captions start as soon as
+  their video is on YouTube)
+- YouTube allows 10,000 API "units" per day and every upload costs
+  units (video 1600, thumbnail 50, captions 400). A token bucket
+  refills the allowance bit by bit, and uploads wait when it is empty
+  instead of failing with "quota exceeded"
+- Everything is saved in the outbox, so nothing is lost on a restart
+- A job is claimed (outbox/claims) before any quota is spent on it, so
+  the scheduler's upload worker and a manual upload_queue.py never
+  upload the same video twice
+
+Usage:
+    python upload_queue.py            # upload what the quota allows now
+    python upload_queue.py --watch    # keep uploading as quota refills
+    python upload_queue.py --status   # show the outbox and quota
+"""
+
+import argparse
+import contextlib
+import datetime
+import json
+import os
+import re
+import shutil
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from instrumentation import same_stage
+from uploader import ResumableUploader
+from youtube_auth import FORCE_SSL_SCOPE, UPLOAD_SCOPE, file_lock, get_auth
+
+# YouTube Data API quota cost of each upload step
+QUOTA_COSTS = {
+    "video": 1600,
+    "thumbnail": 50,
+    "captions": 400,
+}
+
+# A video that failed this many times is moved to outbox/failed
+MAX_ATTEMPTS = 5
+
+# How often the background worker looks for new videos (seconds)
+POLL_SECONDS = 30
+
+
+def is_refused(error):
+    """
+    True if YouTube refuses a thumbnail or captions upload for good:
+    403 Forbidden (thumbnails need a verified channel, captions the
+    youtube.force-ssl permission). Anything else is worth retrying.
+    """
+    response = getattr(error, "resp", None)
+    status = getattr(response, "status", None) or getattr(error, "status_code", None)
+    if status is not None:
+        try:
+            return int(status) == 403
+        except (TypeError, ValueError):
+            pass
+    text = str(error).lower()
+    return "forbidden" in text or "verif" in text
+
+
+class QuotaBucket:
+    """
+    Token bucket for the YouTube API quota.
+
+    Holds at most daily_quota units and refills daily_quota units per
+    24 hours, a little every second. Saved to disk so restarts do not
+    hand out the day's quota twice, and the state file is locked while
+    units are spent, so two processes (the scheduler and a manual
+    upload_queue.py) can never spend the same units.
+    """
+
+    def __init__(self, state_file, daily_quota=10000):
+        self.state_file = state_file
+        self.capacity = daily_quota
+        self.refill_per_second = daily_quota / 86400
+        self._lock = threading.Lock()
+        self.tokens, self.updated = self._load()
+
+    def available(self):
+        """Units that can be spent right now"""
+        with self._lock:
+            self._refill()
+            return int(self.tokens)
+
+    def take(self, cost):
+        """Spend cost units if there are enough; returns True if spent"""
+        with self._lock, file_lock(self.state_file):
+            self._refill()
+            if self.tokens < cost:
+                return False
+            self.tokens -= cost
+            self._save()
+            return True
+
+    def seconds_until(self, cost):
+        """How long until cost units are available"""
+        with self._lock:
+            self._refill()
+            missing = cost - self.tokens
+        return max(0.0, missing / self.refill_per_second)
+
+    def _refill(self):
+        # Another process (e.g. upload_queue.py) may have spent units too
+        self.tokens, self.updated = self._load()
+        now = time.time()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.refill_per_second)
+        self.updated = now
+
+    def _load(self):
+        try:
+            with open(self.state_file, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            return min(float(state["tokens"]), self.capacity), float(state["updated"])
+        except (OSError, ValueError, KeyError):
+            return float(self.capacity), time.time()
+
+    def _save(self):
+        temp_file = f"{self.state_file}.{os.getpid()}.tmp"
+        with open(temp_file, "w", encoding="utf-8") as f:
+            json.dump({"tokens": self.tokens, "updated": self.updated}, f)
+        os.replace(temp_file, self.state_file)
+
+
+class UploadQueue:
+    """The outbox folder plus everything needed to empty it"""
+
+    def __init__(self, outbox_folder, auth, upload_url, chunk_mb=32,
+                 max_retries=8, concurrency=2, daily_quota=10000, log_file=None, artifact_index=None):
+        self.outbox = outbox_folder
+        self.auth = auth
+        self.upload_url = upload_url
+        self.chunk_mb = chunk_mb
+        self.max_retries = max_retries
+        self.concurrency = max(1, concurrency)
+        self.log_file = log_file
+        self.artifact_index = artifact_index
+        for folder in ("", "done", "failed", "claims"):
+            os.makedirs(os.path.join(self.outbox, folder), exist_ok=True)
+        self.quota = QuotaBucket(os.path.join(self.outbox, "quota.json"), daily_quota)
+        self._job_lock = threading.Lock()
+
+    # ----- adding videos -----
+
+    def add(self, video_file, body, thumbnail_file=None, captions_file=None,
+            captions_language="en", topic=None, run_id=None):
+        """Put a finished video in the outbox; returns the job id"""
+        slug = re.sub(r"[^a-z0-9]+", "-", (topic or "video").lower()).strip("-")[:40]
+        base_id = f"{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}_{slug}"
+        job_id, number = base_id, 1
+        while os.path.exists(os.path.join(self.outbox, job_id)):
+            number += 1
+            job_id = f"{base_id}_{number}"
+        job_folder = os.path.join(self.outbox, job_id)
+        os.makedirs(job_folder)
+
+        # Thumbnail and captions are overwritten by the next video, so keep copies
+        def keep(path):
+            if not path or not os.path.exists(path):
+                return None
+            copy = os.path.join(job_folder, os.path.basename(path))
+            shutil.copy2(path, copy)
+            return copy
+
+        job = {
+            "id": job_id,
+            "created": datetime.datetime.now().isoformat(timespec="seconds"),
+            "topic": topic,
+            "run_id": run_id,
+            "body": body,
+            "video": os.path.abspath(video_file),
+            "thumbnail": keep(thumbnail_file),
+            "captions": keep(captions_file),
+            "captions_language": captions_language,
+            "video_id": None,
+            "thumbnail_done": False,
+            "captions_done": False,
+            "attempts": 0,
+            "last_error": None,
+        }
+        self._write_job(job)
+        return job_id
+
+    # ----- looking at the outbox -----
+
+    def pending_jobs(self, job_ids=None):
+        """Jobs still waiting in the outbox, oldest first"""
+        jobs = []
+        for name in sorted(os.listdir(self.outbox)):
+            if job_ids is not None and name not in job_ids:
+                continue
+            try:
+                jobs.append(self._read_job(name))
+            except (OSError, ValueError):
+                # Not a job, or just moved to done/failed
+                continue
+        return jobs
+
+    def find_job(self, job_id):
+        """A job wherever it is now (waiting, done or failed), or None"""
+        for folder in ("", "done", "failed"):
+            path = os.path.join(self.outbox, folder, job_id, "job.json")
+            if os.path.exists(path):
+                with open(path, "r", encoding="utf-8") as f:
+                    return json.load(f)
+        return None
+
+    @staticmethod
+    def steps_left(job):
+        """Upload steps this job still needs, in order"""
+        if not job["video_id"]:
+            return ["video"]
+        steps = []
+        if job["thumbnail"] and not job["thumbnail_done"]:
+            steps.append("thumbnail")
+        if job["captions"] and not job["captions_done"]:
+            steps.append("captions")
+        return steps
+
+    def status(self):
+        """Short text overview of the outbox and quota"""
+        lines = [f"Quota available: {self.quota.available()} / {self.quota.capacity} units"]
+        for job in self.pending_jobs():
+            left = ", ".join(self.steps_left(job)) or "finishing"
+            error = f" (last error: {job['last_error']})" if job["last_error"] else ""
+            lines.append(f"  {job['id']}: waiting for {left}{error}")
+        lines.append(f"Done: {len(os.listdir(os.path.join(self.outbox, 'done')))}, "
+                     f"failed: {len(os.listdir(os.path.join(self.outbox, 'failed')))}")
+        return "\n".join(lines)
+
+    # ----- uploading -----
+
+    def drain(self, job_ids=None):
+        """
+        Upload everything the quota allows right now.
+
+        Returns the number of seconds until the quota allows the next
+        waiting step (0 when nothing is waiting).
+        """
+        running = {}
+        tried = set()
+        wait_seconds = 0.0
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            while True:
+                wait_seconds = 0.0
+                for job in self.pending_jobs(job_ids):
+                    for step in self.steps_left(job):
+                        task = (job["id"], step)
+                        if task in tried or len(running) >= self.concurrency:
+                            continue
+
+                        # Busy in another process (or with another step here): later
+                        claim = self._claim(job["id"])
+                        if claim is None:
+                            continue
+                        if not self._still_needed(job["id"], step):
+                            claim.close()
+                            continue
+                        if not self.quota.take(QUOTA_COSTS[step]):
+                            claim.close()
+                            wait_seconds = max(wait_seconds, self.quota.seconds_until(QUOTA_COSTS[step]))
+                            continue
+                        tried.add(task)
+                        running[pool.submit(same_stage(self.run_step), job["id"], step, claim)] = task
+
+                if not running:
+                    break
+
+                # Thumbnail and captions of a video show up once the video is done
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    running.pop(future)
+
+        return wait_seconds
+
+    def run_step(self, job_id, step, claim=None):
+        """
+        Do one upload step of one job; returns True on success.
+
+        claim is the job's claim from drain() (released when the step is
+        done); without one the job is claimed here.
+        """
+        claim = claim or self._claim(job_id)
+        if claim is None:
+            print(f"  {job_id} is being uploaded by another process")
+            return False
+        with claim:
+            return self._run_step(job_id, step)
+
+    def _run_step(self, job_id, step):
+        job = self._read_job(job_id)
+        try:
+            if step == "video":
+                self._upload_video(job)
+            elif step == "thumbnail":
+                self._upload_thumbnail(job)
+            else:
+                self._upload_captions(job)
+            success = True
+        except Exception as e:
+            success = False
+            print(f"  Upload {step} of {job_id} failed: {e}")
+
+            with self._job_lock:
+                job = self._read_job(job_id)
+                if step == "video":
+                    job["attempts"] += 1
+                    job["last_error"] = str(e)
+                elif is_refused(e):
+                    # Thumbnails need a verified channel; don't keep paying quota for them
+                    job[f"{step}_done"] = "skipped"
+                    print(f"  Note: {step} skipped (thumbnails need channel verification, "
+                          f"captions need the youtube.force-ssl permission)")
+                else:
+                    # Network trouble, server errors: try again on the next round.
+                    # The video is already on YouTube, so giving up only skips this step
+                    job[f"{step}_attempts"] = job.get(f"{step}_attempts", 0) + 1
+                    job["last_error"] = str(e)
+                    if job[f"{step}_attempts"] >= MAX_ATTEMPTS:
+                        job[f"{step}_done"] = "skipped"
+                        print(f"  Giving up on the {step} of {job_id} after {MAX_ATTEMPTS} attempts")
+                self._write_job(job)
+
+        self._finish_if_done(job_id)
+        return success
+
+    def _claim(self, job_id):
+        """
+        Claim a job for this process: a lock file in outbox/claims, held
+        until the step is done. Returns None if the job is taken.
+        """
+        claim = contextlib.ExitStack()
+        try:
+            claim.enter_context(file_lock(os.path.join(self.outbox, "claims", job_id), timeout=0))
+        except TimeoutError:
+            return None
+        return claim
+
+    def _still_needed(self, job_id, step):
+        """Read the job again once claimed: another process may have done the step"""
+        try:
+            return step in self.steps_left(self._read_job(job_id))
+        except (OSError, ValueError):
+            # Moved to done/failed meanwhile
+            return False
+
+    def _upload_video(self, job):
+        print(f"  Uploading {job['id']}...")
+        uploader = ResumableUploader(
+            self._session(),
+            job["video"],
+            job["body"],
+            self.upload_url,
+            part=",".join(job["body"].keys()),
+            chunk_mb=self.chunk_mb,
+            max_retries=self.max_retries,
+            sessions_file=os.path.join(self.outbox, "upload_sessions.json"),
+        )
+        response = uploader.upload()
+        if uploader.stats["seconds"]:
+            print(f"  Uploaded {job['id']} at {uploader.throughput_mbps():.1f} MB/s")
+
+        with self._job_lock:
+            job = self._read_job(job["id"])
+            job["video_id"] = response["id"]
+            job["last_error"] = None
+            self._write_job(job)
+        self._log_upload(job)
+        self._index_upload(job)
+
+    def _upload_thumbnail(self, job):
+        from googleapiclient.http import MediaFileUpload
+
+        self._service().thumbnails().set(
+            videoId=job["video_id"],
+            media_body=MediaFileUpload(job["thumbnail"])
+        ).execute()
+        self._mark_done(job["id"], "thumbnail")
+        print(f"  Thumbnail uploaded for {job['id']}")
+
+    def _upload_captions(self, job):
+        from googleapiclient.http import MediaFileUpload
+
+        self._service().captions().insert(
+            part="snippet",
+            body={
+                "snippet": {
+                    "videoId": job["video_id"],
+                    "language": job["captions_language"],
+                    "name": "Captions",
+                    "isDraft": False,
+                }
+            },
+            media_body=MediaFileUpload(job["captions"], mimetype="application/octet-stream")
+        ).execute()
+        self._mark_done(job["id"], "captions")
+        print(f"  Captions uploaded for {job['id']}")
+
+    def _finish_if_done(self, job_id):
+        with self._job_lock:
+            if not os.path.exists(self._job_file(job_id)):
+                return
+            job = self._read_job(job_id)
+            if job["video_id"] and not self.steps_left(job):
+                shutil.move(os.path.join(self.outbox, job_id), os.path.join(self.outbox, "done", job_id))
+            elif job["attempts"] >= MAX_ATTEMPTS:
+                print(f"  Giving up on {job_id} after {MAX_ATTEMPTS} attempts (see outbox/failed)")
+                shutil.move(os.path.join(self.outbox, job_id), os.path.join(self.outbox, "failed", job_id))
+
+    def _mark_done(self, job_id, step):
+        with self._job_lock:
+            job = self._read_job(job_id)
+            job[f"{step}_done"] = True
+            self._write_job(job)
+
+    def _log_upload(self, job):
+        if not self.log_file:
+            return
+        with self._job_lock, open(self.log_file, "a", encoding="utf-8") as f:
+            f.write(f"\n{'=' * 50}\n")
+            f.write(f"Upload: {datetime.datetime.now()}\n")
+            f.write(f"Topic: {job['topic']}\n")
+            f.write(f"Video ID: {job['video_id']}\n")
+            f.write(f"URL: https://www.youtube.com/watch?v={job['video_id']}\n")
+
+    def _index_upload(self, job):
+        """Add the YouTube id to the run's manifest and the artifact index"""
+        if not self.artifact_index or not job.get("run_id"):
+            return
+        try:
+            self.artifact_index.record_upload(job["run_id"], job["video_id"], job_id=job["id"])
+        except Exception as e:
+            print(f"  Warning: Could not add upload of {job['id']} to the artifact index: {e}")
+
+    # ----- API clients (one per upload thread, see youtube_auth.py) -----
+
+    def _session(self):
+        return self.auth.session()
+
+    def _service(self):
+        return self.auth.service()
+
+    # ----- job files -----
+
+    def _job_file(self, job_id):
+        return os.path.join(self.outbox, job_id, "job.json")
+
+    def _read_job(self, job_id):
+        with open(self._job_file(job_id), "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _write_job(self, job):
+        path = self._job_file(job["id"])
+        with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+            json.dump(job, f, indent=2)
+        os.replace(f"{path}.tmp", path)
+
+
+class UploadWorker(threading.Thread):
+    """Background thread that keeps emptying the outbox"""
+
+    def __init__(self, queue, poll_seconds=POLL_SECONDS):
+        super().__init__(name="upload-worker", daemon=True)
+        self.queue = queue
+        self.poll_seconds = poll_seconds
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            try:
+                wait_seconds = self.queue.drain()
+            except Exception as e:
+                print(f"  Upload worker error: {e}")
+                wait_seconds = 0
+            # Come back when the quota has refilled, or to check for new videos
+            self._stop_event.wait(min(wait_seconds, 3600) if wait_seconds else self.poll_seconds)
+
+    def stop(self):
+        self._stop_event.set()
+
+
+def make_auth():
+    """Shared YouTube login for the channel in config.py (tokens/<channel>.json)"""
+    from config import CAPTIONS_UPLOAD, YOUTUBE_CHANNEL, YOUTUBE_CLIENT_SECRETS
+
+    scopes = [UPLOAD_SCOPE]
+    if CAPTIONS_UPLOAD:
+        scopes.append(FORCE_SSL_SCOPE)
+    here = os.path.dirname(os.path.abspath(__file__))
+    return get_auth(
+        YOUTUBE_CHANNEL,
+        os.path.join(here, "tokens"),
+        os.path.join(here, YOUTUBE_CLIENT_SECRETS),
+        scopes,
+        legacy_pickle=os.path.join(here, "token.pickle")
+    )
+
+
+def make_queue(output_folder=None):
+    """Upload queue using the settings from config.py"""
+    from artifact_index import ArtifactIndex
+    from config import (
+        ARTIFACT_INDEX_FILE, OUTPUT_FOLDER, UPLOAD_CHUNK_MB, UPLOAD_CONCURRENCY, UPLOAD_MAX_RETRIES,
+        YOUTUBE_DAILY_QUOTA, YOUTUBE_UPLOAD_URL
+    )
+
+    output_folder = output_folder or OUTPUT_FOLDER
+    return UploadQueue(
+        os.path.join(output_folder, "outbox"),
+        auth=make_auth(),
+        upload_url=YOUTUBE_UPLOAD_URL,
+        chunk_mb=UPLOAD_CHUNK_MB,
+        max_retries=UPLOAD_MAX_RETRIES,
+        concurrency=UPLOAD_CONCURRENCY,
+        daily_quota=YOUTUBE_DAILY_QUOTA,
+        log_file=os.path.join(output_folder, "upload_log.txt"),
+        artifact_index=ArtifactIndex(ARTIFACT_INDEX_FILE)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Upload the videos waiting in the outbox")
+    parser.add_argument("--watch", action="store_true", help="Keep running and upload as quota refills")
+    parser.add_argument("--status", action="store_true", help="Only show what is waiting")
+    args = parser.parse_args()
+
+    queue = make_queue()
+    if args.status:
+        print(queue.status())
+        return
+
+    if args.watch:
+        worker = UploadWorker(queue)
+        worker.start()
+        try:
+            while worker.is_alive():
+                time.sleep(1)
+        except KeyboardInterrupt:
+            worker.stop()
+        return
+
+    wait_seconds = queue.drain()
+    print(queue.status())
+    if wait_seconds:
+        print(f"\nMore quota in {wait_seconds / 60:.0f} minutes - run again then (or use --watch)")
+
+
+if __name__ == "__main__":
+    main()
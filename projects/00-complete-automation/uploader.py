@@ -0,0 +1,298 @@
+"""
+RESUMABLE YOUTUBE UPLOADS
+=========================
+Uploads a video in big pieces using YouTube's resumable upload
+protocol, instead of one long request that starts over on any error.
+
+- Piece size is set with UPLOAD_CHUNK_MB (bigger = fewer round trips)
+- Server errors (5xx) and dropped connections are retried with a
+  growing wait (1s, 2s, 4s, ...), then the upload continues where
+  the server says it stopped
+- The upload address is saved in upload_sessions.json, so if the
+  computer crashes or the script is restarted, the same file
+  continues mid-way instead of from 0%
+- Speed (MB/s) is shown while uploading
+
+Test it without YouTube:
+    python fake_upload_server.py --port 8090
+    python uploader.py output/final_video.mp4 --url http://localhost:8090/upload/youtube/v3/videos
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+
+import requests
+
+from instrumentation import count_bytes
+
+# YouTube requires pieces in multiples of 256 KB
+CHUNK_GRANULARITY = 256 * 1024
+
+RETRY_STATUS_CODES = (500, 502, 503, 504)
+RETRY_EXCEPTIONS = (requests.ConnectionError, requests.Timeout, ConnectionError, TimeoutError)
+
+# Resumable upload addresses stay valid for about a week
+SESSION_MAX_AGE_SECONDS = 6 * 24 * 3600
+
+_sessions_lock = threading.Lock()
+
+
+class UploadError(Exception):
+    """The upload failed for good (retrying will not help)"""
+
+
+class _RetryableStatus(Exception):
+    """Temporary server error (5xx)"""
+
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+def chunk_bytes(chunk_mb):
+    """Piece size in bytes, rounded to what YouTube accepts"""
+    size = int(chunk_mb * 1024 * 1024)
+    return max(CHUNK_GRANULARITY, size - size % CHUNK_GRANULARITY)
+
+
+def file_key(path):
+    """Identifies one version of a file (a re-rendered file gets a new key)"""
+    stat = os.stat(path)
+    text = f"{os.path.abspath(path)}|{stat.st_size}|{int(stat.st_mtime)}"
+    return hashlib.sha1(text.encode()).hexdigest()
+
+
+class ResumableUploader:
+    """Uploads one file with the resumable protocol"""
+
+    def __init__(self, session, file_path, body, upload_url, part="snippet,status",
+                 mimetype="video/mp4", chunk_mb=32, max_retries=8, sessions_file=None,
+                 timeout=120):
+        self.session = session
+        self.file_path = file_path
+        self.body = body
+        self.upload_url = upload_url
+        self.part = part
+        self.mimetype = mimetype
+        self.chunk_size = chunk_bytes(chunk_mb)
+        self.max_retries = max_retries
+        self.sessions_file = sessions_file
+        self.timeout = timeout
+        self.file_size = os.path.getsize(file_path)
+        self.key = file_key(file_path)
+        self.stats = {"bytes_sent": 0, "seconds": 0.0, "retries": 0, "resumed_from": 0}
+        self._failures = 0
+
+    # ----- public -----
+
+    def upload(self):
+        """Upload the whole file and return YouTube's response (the video resource)"""
+        start_time = time.perf_counter()
+
+        session_uri = self._saved_session()
+        offset = 0
+        if session_uri:
+            status, offset, response = self._with_retries(lambda: self._query_status(session_uri))
+            if status == "done":
+                self._forget_session()
+                return response
+            if status == "expired":
+                session_uri = None
+            else:
+                self.stats["resumed_from"] = offset
+                print(f"  Resuming upload at {offset / self.file_size * 100:.0f}%")
+
+        if not session_uri:
+            session_uri = self._with_retries(self._start_session)
+            self._remember_session(session_uri)
+            offset = 0
+
+        response = None
+        with open(self.file_path, "rb") as f:
+            while response is None:
+                f.seek(offset)
+                data = f.read(self.chunk_size)
+                chunk_start = time.perf_counter()
+                try:
+                    offset, response = self._send_chunk(session_uri, offset, data)
+                    self.stats["bytes_sent"] += len(data)
+                    count_bytes("uploaded", len(data))
+                    self._failures = 0
+                except RETRY_EXCEPTIONS + (_RetryableStatus,) as e:
+                    # Ask the server how much it really has, then carry on from there
+                    self._backoff(e)
+                    status, offset, response = self._with_retries(lambda: self._query_status(session_uri))
+                    if status == "expired":
+                        self._forget_session()
+                        raise UploadError("Upload session expired on the server")
+                    continue
+
+                elapsed = time.perf_counter() - chunk_start
+                speed = len(data) / 1_000_000 / elapsed if elapsed else 0.0
+                print(f"  Upload progress: {offset / self.file_size * 100:.0f}% ({speed:.1f} MB/s)")
+
+        self.stats["seconds"] = time.perf_counter() - start_time
+        self._forget_session()
+        return response
+
+    def throughput_mbps(self):
+        """Average upload speed of this upload in MB/s"""
+        if not self.stats["seconds"]:
+            return 0.0
+        return self.stats["bytes_sent"] / 1_000_000 / self.stats["seconds"]
+
+    # ----- protocol -----
+
+    def _start_session(self):
+        response = self.session.request(
+            "POST", self.upload_url,
+            params={"uploadType": "resumable", "part": self.part},
+            headers={
+                "Content-Type": "application/json; charset=UTF-8",
+                "X-Upload-Content-Type": self.mimetype,
+                "X-Upload-Content-Length": str(self.file_size),
+            },
+            data=json.dumps(self.body),
+            timeout=self.timeout,
+        )
+        self._check(response)
+        if "Location" not in response.headers:
+            raise UploadError("Server did not return an upload address")
+        return response.headers["Location"]
+
+    def _send_chunk(self, session_uri, offset, data):
+        """Send one piece; returns (next offset, final response or None)"""
+        end = offset + len(data) - 1
+        response = self.session.request(
+            "PUT", session_uri,
+            headers={
+                "Content-Length": str(len(data)),
+                "Content-Range": f"bytes {offset}-{end}/{self.file_size}",
+            },
+            data=data,
+            timeout=self.timeout,
+        )
+        if response.status_code in (200, 201):
+            return self.file_size, response.json()
+        if response.status_code == 308:
+            return self._received_bytes(response), None
+        self._check(response)
+        raise UploadError(f"Unexpected upload response {response.status_code}")
+
+    def _query_status(self, session_uri):
+        """Ask how much the server has: ("partial"|"done"|"expired", offset, response)"""
+        response = self.session.request(
+            "PUT", session_uri,
+            headers={"Content-Length": "0", "Content-Range": f"bytes */{self.file_size}"},
+            timeout=self.timeout,
+        )
+        if response.status_code in (200, 201):
+            return "done", self.file_size, response.json()
+        if response.status_code == 308:
+            return "partial", self._received_bytes(response), None
+        if response.status_code in (404, 410):
+            return "expired", 0, None
+        self._check(response)
+        raise UploadError(f"Unexpected status response {response.status_code}")
+
+    @staticmethod
+    def _received_bytes(response):
+        # "Range: bytes=0-12345" means bytes 0..12345 arrived
+        received = response.headers.get("Range")
+        if not received:
+            return 0
+        return int(received.rsplit("-", 1)[1]) + 1
+
+    @staticmethod
+    def _check(response):
+        if response.status_code in RETRY_STATUS_CODES:
+            raise _RetryableStatus(response.status_code)
+        if response.status_code >= 400:
+            raise UploadError(f"HTTP {response.status_code}: {response.text[:300]}")
+
+    # ----- retries -----
+
+    def _with_retries(self, func):
+        """Call func, retrying server errors and dropped connections"""
+        while True:
+            try:
+                return func()
+            except RETRY_EXCEPTIONS + (_RetryableStatus,) as e:
+                self._backoff(e)
+
+    def _backoff(self, error):
+        self.stats["retries"] += 1
+        self._failures += 1
+        if self._failures > self.max_retries:
+            raise UploadError(f"Giving up after {self.max_retries} retries in a row ({error})")
+        wait = min(64, 2 ** (self._failures - 1)) + random.random()
+        print(f"  Upload problem ({error}), retrying in {wait:.1f}s...")
+        time.sleep(wait)
+
+    # ----- saved sessions -----
+
+    def _load_sessions(self):
+        if not self.sessions_file or not os.path.exists(self.sessions_file):
+            return {}
+        try:
+            with open(self.sessions_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_sessions(self, sessions):
+        temp_file = f"{self.sessions_file}.{os.getpid()}.tmp"
+        with open(temp_file, "w", encoding="utf-8") as f:
+            json.dump(sessions, f, indent=2)
+        os.replace(temp_file, self.sessions_file)
+
+    def _saved_session(self):
+        with _sessions_lock:
+            entry = self._load_sessions().get(self.key)
+        if entry and time.time() - entry["created"] < SESSION_MAX_AGE_SECONDS:
+            return entry["uri"]
+        return None
+
+    def _remember_session(self, session_uri):
+        if not self.sessions_file:
+            return
+        with _sessions_lock:
+            sessions = self._load_sessions()
+            sessions[self.key] = {"uri": session_uri, "file": self.file_path, "created": time.time()}
+            self._write_sessions(sessions)
+
+    def _forget_session(self):
+        if not self.sessions_file:
+            return
+        with _sessions_lock:
+            sessions = self._load_sessions()
+            if sessions.pop(self.key, None) is not None:
+                self._write_sessions(sessions)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Upload a video with the resumable protocol")
+    parser.add_argument("video", help="Video file to upload")
+    parser.add_argument("--url", required=True, help="Upload URL (e.g. the fake upload server)")
+    parser.add_argument("--chunk-mb", type=float, default=8, help="Piece size in MB")
+    parser.add_argument("--sessions-file", default="upload_sessions.json")
+    args = parser.parse_args()
+
+    body = {"snippet": {"title": os.path.basename(args.video)}, "status": {"privacyStatus": "private"}}
+    uploader = ResumableUploader(
+        requests.Session(), args.video, body, args.url,
+        chunk_mb=args.chunk_mb, sessions_file=args.sessions_file
+    )
+    response = uploader.upload()
+    print(f"\n  Uploaded: {response}")
+    print(f"  {uploader.stats['bytes_sent'] / 1_000_000:.1f} MB in {uploader.stats['seconds']:.1f}s "
+          f"({uploader.throughput_mbps():.1f} MB/s, {uploader.stats['retries']} retries)")
+
+
+if __name__ == "__main__":
+    main()
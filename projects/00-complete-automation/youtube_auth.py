@@ -0,0 +1,256 @@
+"""
+YOUTUBE LOGIN - ONE SHARED, SAFE LOGIN PER CHANNEL
+==================================================
+Keeps the YouTube login (OAuth token) and API client ready for every
+upload, instead of loading, refreshing and rebuilding them each time.
+
+- Tokens are stored as JSON, one file per channel, in the tokens
+  folder (an old token.pickle is converted automatically)
+- The token file is locked while it is read or written, so several
+  upload threads (or the scheduler and a manual run) never break it
+- Tokens are refreshed a few minutes BEFORE they expire, not after an
+  upload has already failed
+- The API description (discovery document) is read from disk, not
+  downloaded for every upload; each upload thread gets its own client
+  built from it in milliseconds
+"""
+
+import contextlib
+import datetime
+import json
+import os
+import pickle
+import re
+import threading
+import time
+
+UPLOAD_SCOPE = "https://www.googleapis.com/auth/youtube.upload"
+FORCE_SSL_SCOPE = "https://www.googleapis.com/auth/youtube.force-ssl"
+
+DISCOVERY_URL = "https://www.googleapis.com/discovery/v1/apis/youtube/v3/rest"
+
+# Refresh the token when it has less than this left
+REFRESH_MARGIN_SECONDS = 300
+
+# A lock file older than this was left behind by a crashed process
+# (a held lock is touched every few seconds, however long it is held)
+STALE_LOCK_SECONDS = 60
+
+_auths = {}
+_auths_lock = threading.Lock()
+
+
+@contextlib.contextmanager
+def file_lock(path, timeout=30):
+    """Lock that also works between processes (a .lock file next to path)"""
+    lock_path = f"{path}.lock"
+    os.makedirs(os.path.dirname(lock_path) or ".", exist_ok=True)
+    deadline = time.time() + timeout
+    while True:
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(lock_path) > STALE_LOCK_SECONDS:
+                    os.remove(lock_path)
+                    continue
+            except OSError:
+                continue
+            if time.time() > deadline:
+                raise TimeoutError(f"Could not lock {path}")
+            time.sleep(0.05)
+
+    # Keep the lock looking fresh while it is held: a token refresh that
+    # hangs on the network (or a whole upload) can take longer than
+    # STALE_LOCK_SECONDS, and must not be mistaken for a crash
+    released = threading.Event()
+
+    def keep_fresh():
+        while not released.wait(STALE_LOCK_SECONDS / 4):
+            with contextlib.suppress(OSError):
+                os.utime(lock_path)
+
+    threading.Thread(target=keep_fresh, name="file-lock", daemon=True).start()
+    try:
+        yield
+    finally:
+        released.set()
+        os.close(fd)
+        with contextlib.suppress(OSError):
+            os.remove(lock_path)
+
+
+class YouTubeAuth:
+    """Login and API clients for one channel, safe to share between threads"""
+
+    def __init__(self, token_file, client_secrets, scopes, legacy_pickle=None,
+                 discovery_cache=None):
+        self.token_file = token_file
+        self.client_secrets = client_secrets
+        self.scopes = list(scopes)
+        self.legacy_pickle = legacy_pickle
+        self.discovery_cache = discovery_cache
+        self._credentials = None
+        self._document = None
+        self._lock = threading.RLock()
+        self._local = threading.local()
+
+    # ----- public -----
+
+    def credentials(self, interactive=True):
+        """
+        Valid credentials, refreshed if they expire soon.
+
+        With interactive=True a browser login is started when there is
+        no usable token yet. Returns None when login is impossible.
+        """
+        with self._lock:
+            if self._credentials is None:
+                self._credentials = self._load()
+
+            if self._credentials is None or not self._has_scopes(self._credentials):
+                if not interactive or not os.path.exists(self.client_secrets):
+                    return None
+                self._credentials = self._login()
+                self._save(self._credentials)
+
+            elif self._expires_soon(self._credentials):
+                self._refresh()
+
+            return self._credentials
+
+    def session(self):
+        """Authorized requests session for this thread"""
+        credentials = self._required_credentials()
+        if getattr(self._local, "session_credentials", None) is not credentials:
+            from google.auth.transport.requests import AuthorizedSession
+            self._local.session = AuthorizedSession(credentials)
+            self._local.session_credentials = credentials
+        return self._local.session
+
+    def service(self):
+        """YouTube API client for this thread (clients are not thread-safe)"""
+        credentials = self._required_credentials()
+        if getattr(self._local, "service_credentials", None) is not credentials:
+            from googleapiclient.discovery import build_from_document
+            self._local.service = build_from_document(self._discovery_document(), credentials=credentials)
+            self._local.service_credentials = credentials
+        return self._local.service
+
+    # ----- tokens -----
+
+    def _required_credentials(self):
+        credentials = self.credentials(interactive=False)
+        if credentials is None:
+            raise RuntimeError("YouTube upload is not configured (no login)")
+        return credentials
+
+    def _has_scopes(self, credentials):
+        granted = set(credentials.scopes or self.scopes)
+        return set(self.scopes) <= granted
+
+    @staticmethod
+    def _expires_soon(credentials):
+        if not credentials.expiry:
+            return not credentials.valid
+        # google-auth keeps expiry as a naive UTC time
+        left = credentials.expiry - datetime.datetime.utcnow()
+        return left.total_seconds() < REFRESH_MARGIN_SECONDS
+
+    def _refresh(self):
+        from google.auth.transport.requests import Request
+
+        with file_lock(self.token_file):
+            # Another process may have refreshed it already
+            stored = self._read_token_file()
+            if stored is not None and not self._expires_soon(stored):
+                self._credentials = stored
+                return
+            self._credentials.refresh(Request())
+            self._write_token_file(self._credentials)
+
+    def _login(self):
+        from google_auth_oauthlib.flow import InstalledAppFlow
+
+        flow = InstalledAppFlow.from_client_secrets_file(self.client_secrets, self.scopes)
+        return flow.run_local_server(port=0)
+
+    def _load(self):
+        with file_lock(self.token_file):
+            credentials = self._read_token_file()
+            if credentials is None and self.legacy_pickle and os.path.exists(self.legacy_pickle):
+                # One-time move from token.pickle to the JSON token store
+                with open(self.legacy_pickle, "rb") as token:
+                    credentials = pickle.load(token)
+                self._write_token_file(credentials)
+                print(f"  Moved YouTube login from {os.path.basename(self.legacy_pickle)} "
+                      f"to {self.token_file}")
+            return credentials
+
+    def _save(self, credentials):
+        with file_lock(self.token_file):
+            self._write_token_file(credentials)
+
+    def _read_token_file(self):
+        if not os.path.exists(self.token_file):
+            return None
+        from google.oauth2.credentials import Credentials
+
+        with open(self.token_file, "r", encoding="utf-8") as f:
+            info = json.load(f)
+        return Credentials.from_authorized_user_info(info, info.get("scopes") or self.scopes)
+
+    def _write_token_file(self, credentials):
+        os.makedirs(os.path.dirname(self.token_file) or ".", exist_ok=True)
+        temp_file = f"{self.token_file}.{os.getpid()}.tmp"
+        with open(temp_file, "w", encoding="utf-8") as f:
+            f.write(credentials.to_json())
+        os.replace(temp_file, self.token_file)
+
+    # ----- discovery document -----
+
+    def _discovery_document(self):
+        with self._lock:
+            if self._document is None:
+                self._document = self._read_discovery_document()
+            return self._document
+
+    def _read_discovery_document(self):
+        if self.discovery_cache and os.path.exists(self.discovery_cache):
+            with open(self.discovery_cache, "r", encoding="utf-8") as f:
+                return f.read()
+
+        try:
+            # google-api-python-client 2.x ships the document with the package
+            from googleapiclient.discovery_cache import get_static_doc
+            document = get_static_doc("youtube", "v3")
+        except ImportError:
+            document = None
+
+        if not document:
+            import requests
+            response = requests.get(DISCOVERY_URL, timeout=30)
+            response.raise_for_status()
+            document = response.text
+
+        if self.discovery_cache:
+            with open(self.discovery_cache, "w", encoding="utf-8") as f:
+                f.write(document)
+        return document
+
+
+def get_auth(channel, token_folder, client_secrets, scopes, legacy_pickle=None):
+    """Shared login for a channel (every caller in this process gets the same one)"""
+    slug = re.sub(r"[^a-z0-9]+", "_", channel.lower()).strip("_") or "default"
+    key = (slug, tuple(sorted(scopes)))
+    with _auths_lock:
+        if key not in _auths:
+            _auths[key] = YouTubeAuth(
+                os.path.join(token_folder, f"{slug}.json"),
+                client_secrets,
+                scopes,
+                legacy_pickle=legacy_pickle,
+                discovery_cache=os.path.join(token_folder, "youtube_v3_discovery.json"),
+            )
+        return _auths[key]
@@ -36,3 +36,8 @@ OUTPUT_FOLDER = "output"
 
 # What to name the video file
 OUTPUT_FILENAME = "shark_facts_video.mp4"
+
+# === CHANNEL ===
+# Which YouTube channel is this video for? Topics you already made are
+# remembered per channel, so you get a warning before making one twice
+YOUTUBE_CHANNEL = "main"
@@ -45,6 +45,10 @@ except ImportError:
 # Import our config
 from config import *
 
+# Shared helpers live with the complete automation project
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "00-complete-automation"))
+import project_tools
+
 
 def print_banner():
     """Show a cool banner!"""
@@ -140,7 +144,7 @@ async def generate_voiceover(script):
         return None
 
 
-def download_videos():
+def download_videos(voiceover_file=None):
     """Download shark videos from Pexels"""
     print("[STEP 3] Downloading video clips...")
     print(f"  Search terms: {VIDEO_SEARCH_TERMS}")
@@ -152,54 +156,10 @@ def download_videos():
         print("  Then add it to config.py")
         return []
     
-    os.makedirs(os.path.join(OUTPUT_FOLDER, "clips"), exist_ok=True)
-    downloaded = []
-    
-    for term in VIDEO_SEARCH_TERMS[:3]:
-        print(f"  Searching for: {term}")
-        
-        try:
-            response = requests.get(
-                "https://api.pexels.com/videos/search",
-                headers={"Authorization": PEXELS_API_KEY},
-                params={
-                    "query": term,
-                    "per_page": 2,
-                    "orientation": "landscape"
-                }
-            )
-            
-            if response.status_code == 200:
-                videos = response.json().get("videos", [])
-                
-                for video in videos[:2]:
-                    video_files = video.get("video_files", [])
-                    
-                    # Find HD version
-                    for vf in video_files:
-                        if vf.get("quality") == "hd" and vf.get("width", 0) >= 1280:
-                            video_url = vf.get("link")
-                            video_id = video.get("id")
-                            filename = os.path.join(OUTPUT_FOLDER, "clips", f"clip_{video_id}.mp4")
-                            
-                            print(f"    Downloading video {video_id}...")
-                            
-                            vid_response = requests.get(video_url, stream=True)
-                            with open(filename, "wb") as f:
-                                for chunk in vid_response.iter_content(chunk_size=8192):
-                                    f.write(chunk)
-                            
-                            downloaded.append(filename)
-                            break
-                            
-                    if len(downloaded) >= NUM_VIDEO_CLIPS:
-                        break
-                        
-            if len(downloaded) >= NUM_VIDEO_CLIPS:
-                break
-                
-        except Exception as e:
-            print(f"    Error: {e}")
+    downloaded = project_tools.download_clips(
+        PEXELS_API_KEY, VIDEO_SEARCH_TERMS, os.path.join(OUTPUT_FOLDER, "clips"),
+        project_tools.get_audio_length(voiceover_file) or 120, NUM_VIDEO_CLIPS
+    )
     
     print(f"  Downloaded {len(downloaded)} video clips!")
     print()
@@ -400,6 +360,12 @@ async def main():
     print("Ollama is running! Let's create your video!")
     print()
     
+    # Already made this topic? (remembered per YouTube channel)
+    history = project_tools.check_topic(TOPIC, YOUTUBE_CHANNEL)
+    if history is None:
+        input("\nPress Enter to close...")
+        return
+    
     # Step 1: Generate script
     script = generate_script()
     if not script:
@@ -415,11 +381,13 @@ async def main():
         return
     
     # Step 3: Download videos
-    video_clips = download_videos()
+    video_clips = download_videos(voiceover)
     
     # Step 4: Assemble video
     if video_clips and MOVIEPY_AVAILABLE:
-        assemble_video(voiceover, video_clips)
+        video = assemble_video(voiceover, video_clips)
+        if video:
+            history.record(TOPIC, video)
     
     # Step 5: Create thumbnail
     create_thumbnail()
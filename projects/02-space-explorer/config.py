@@ -14,3 +14,4 @@ OUTPUT_FILENAME = "space_facts_video.mp4"
 THUMBNAIL_TEXT = "SPACE FACTS!"
 THUMBNAIL_SUBTITLE = "Mind-Blowing!"
 THUMBNAIL_COLORS = {"bg_start": (10, 10, 50), "bg_end": (50, 20, 100), "text": (255, 255, 0)}
+YOUTUBE_CHANNEL = "main"  # topics already made are remembered per channel
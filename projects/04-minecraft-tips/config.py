@@ -13,3 +13,4 @@ OUTPUT_FOLDER = "output"
 OUTPUT_FILENAME = "minecraft_tips_video.mp4"
 THUMBNAIL_TEXT = "MINECRAFT TIPS!"
 THUMBNAIL_SUBTITLE = "Pro Secrets!"
+YOUTUBE_CHANNEL = "main"  # topics already made are remembered per channel
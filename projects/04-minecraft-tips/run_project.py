@@ -3,6 +3,7 @@ KRWUTARTH'S MINECRAFT TIPS VIDEO GENERATOR!
 """
 
 import os
+import sys
 import asyncio
 import requests
 
@@ -26,6 +27,10 @@ except ImportError:
 
 from config import *
 
+# Shared helpers live with the complete automation project
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "00-complete-automation"))
+import project_tools
+
 def print_banner():
     print("\n" + "=" * 60)
     print("   KRWUTARTH'S MINECRAFT TIPS VIDEO GENERATOR!")
@@ -78,37 +83,17 @@ async def generate_voiceover(script):
         print(f"  ERROR: {e}")
         return None
 
-def download_videos():
+def download_videos(voiceover_file=None):
     print("[STEP 3] Downloading video clips...")
     if PEXELS_API_KEY == "YOUR_PEXELS_API_KEY_HERE":
         print("  WARNING: No Pexels API key!")
         return []
     
-    os.makedirs(os.path.join(OUTPUT_FOLDER, "clips"), exist_ok=True)
-    downloaded = []
+    downloaded = project_tools.download_clips(
+        PEXELS_API_KEY, VIDEO_SEARCH_TERMS, os.path.join(OUTPUT_FOLDER, "clips"),
+        project_tools.get_audio_length(voiceover_file) or 120, NUM_VIDEO_CLIPS
+    )
     
-    for term in VIDEO_SEARCH_TERMS[:3]:
-        try:
-            response = requests.get(
-                "https://api.pexels.com/videos/search",
-                headers={"Authorization": PEXELS_API_KEY},
-                params={"query": term, "per_page": 2, "orientation": "landscape"}
-            )
-            if response.status_code == 200:
-                for video in response.json().get("videos", [])[:2]:
-                    for vf in video.get("video_files", []):
-                        if vf.get("quality") == "hd":
-                            filename = os.path.join(OUTPUT_FOLDER, "clips", f"clip_{video.get('id')}.mp4")
-                            vid_response = requests.get(vf.get("link"), stream=True)
-                            with open(filename, "wb") as f:
-                                for chunk in vid_response.iter_content(chunk_size=8192):
-                                    f.write(chunk)
-                            downloaded.append(filename)
-                            break
-                    if len(downloaded) >= NUM_VIDEO_CLIPS:
-                        break
-        except:
-            pass
     print(f"  Downloaded {len(downloaded)} clips!\n")
     return downloaded
 
@@ -184,6 +169,12 @@ async def main():
         input("\nPress Enter to close...")
         return
     
+    # Already made this topic? (remembered per YouTube channel)
+    history = project_tools.check_topic(TOPIC, YOUTUBE_CHANNEL)
+    if history is None:
+        input("\nPress Enter to close...")
+        return
+    
     script = generate_script()
     if not script:
         input("\nPress Enter to close...")
@@ -191,9 +182,11 @@ async def main():
     
     voiceover = await generate_voiceover(script)
     if voiceover:
-        video_clips = download_videos()
+        video_clips = download_videos(voiceover)
         if video_clips:
-            assemble_video(voiceover, video_clips)
+            video = assemble_video(voiceover, video_clips)
+            if video:
+                history.record(TOPIC, video)
         create_thumbnail()
         generate_metadata()
     
@@ -13,3 +13,4 @@ OUTPUT_FOLDER = "output"
 OUTPUT_FILENAME = "science_facts_video.mp4"
 THUMBNAIL_TEXT = "SCIENCE FACTS!"
 THUMBNAIL_SUBTITLE = "Mind-Blowing!"
+YOUTUBE_CHANNEL = "main"  # topics already made are remembered per channel
@@ -13,3 +13,4 @@ OUTPUT_FOLDER = "output"
 OUTPUT_FILENAME = "history_facts_video.mp4"
 THUMBNAIL_TEXT = "HISTORY FACTS!"
 THUMBNAIL_SUBTITLE = "Amazing!"
+YOUTUBE_CHANNEL = "main"  # topics already made are remembered per channel
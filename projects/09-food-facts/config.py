@@ -13,3 +13,4 @@ OUTPUT_FOLDER = "output"
 OUTPUT_FILENAME = "food_facts_video.mp4"
 THUMBNAIL_TEXT = "FOOD FACTS!"
 THUMBNAIL_SUBTITLE = "Yummy!"
+YOUTUBE_CHANNEL = "main"  # topics already made are remembered per channel
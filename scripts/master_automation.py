@@ -18,6 +18,7 @@ pip install edge-tts moviepy Pillow requests python-dotenv google-generativeai
 
 Usage:
 python master_automation.py --topic "Your Video Topic" --length 8
+python master_automation.py --topic "Your Video Topic" --profile    (profile every step)
 
 Author: Faceless YouTube Automation Course
 """
@@ -35,6 +36,22 @@ from dotenv import load_dotenv
 # Load environment variables
 load_dotenv()
 
+# Shared fast-path helpers live with the complete automation project
+AUTOMATION_DIR = Path(__file__).resolve().parent.parent / "projects" / "00-complete-automation"
+sys.path.insert(0, str(AUTOMATION_DIR))
+
+import captions
+import edl
+import encode_profiles
+import ffmpeg_tools
+import music
+import profiling
+import project_tools
+from artifact_index import ArtifactIndex, RunManifest
+from asset_cache import AssetCache, MixCache, SegmentCache
+from instrumentation import RunRecorder
+from topic_history import channel_history
+
 
 class FacelessVideoGenerator:
     """
@@ -42,9 +59,14 @@ class FacelessVideoGenerator:
     100% FREE tools - no paid subscriptions required!
     """
     
-    def __init__(self, project_name=None):
+    def __init__(self, project_name=None, encode_profile='balanced', profile=None):
         """Initialize the video generator"""
         
+        encode_profiles.get_profile(encode_profile)  # fail early on typos
+        if profile:
+            profiling.check_mode(profile)
+        self.profile = profile
+        
         # Generate project name if not provided
         if project_name is None:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -71,9 +93,21 @@ class FacelessVideoGenerator:
             'voice': 'en-US-GuyNeural',
             'width': 1920,
             'height': 1080,
-            'fps': 30
+            'fps': 30,
+            'encode_profile': encode_profile,
+            'render_backend': 'segments',
+            'render_cache': True,
+            'placeholder_seconds': 5,
+            'placeholder_variant': 'solid',
+            'music_folder': 'music'
         }
         
+        # Set when footage is solid color placeholders (no Pexels key)
+        self.using_placeholders = False
+        
+        # Voiceover word timings (for ducking the music under the voice)
+        self.voice_words = []
+        
         print(f"[INIT] Project: {self.project_name}")
         print(f"[INIT] Directory: {self.base_dir}")
     
@@ -128,9 +162,10 @@ Write the complete script now:"""
         """Generate text using local Ollama"""
         try:
             print("[SCRIPT] Using Ollama (local AI)...")
+            ollama_url = os.getenv('OLLAMA_URL', "http://localhost:11434")
             response = requests.post(
-                "http://localhost:11434/api/generate",
-                json={"model": "llama3.1:8b", "prompt": prompt, "stream": False},
+                f"{ollama_url}/api/generate",
+                json={"model": os.getenv('OLLAMA_MODEL', "llama3.1:8b"), "prompt": prompt, "stream": False},
                 timeout=300
             )
             if response.status_code == 200:
@@ -173,23 +208,37 @@ Write the complete script now:"""
         
         async def generate():
             import edge_tts
-            communicate = edge_tts.Communicate(script, voice)
-            await communicate.save(str(output_path))
-        
-        asyncio.run(generate())
+            try:
+                communicate = edge_tts.Communicate(script, voice, boundary="WordBoundary")
+            except TypeError:
+                # Older edge-tts versions always send word boundaries
+                communicate = edge_tts.Communicate(script, voice)
+            
+            words = []
+            with open(output_path, "wb") as audio_file:
+                async for chunk in communicate.stream():
+                    if chunk["type"] == "audio":
+                        audio_file.write(chunk["data"])
+                    elif chunk["type"] == "WordBoundary":
+                        words.append(captions.word_from_boundary(chunk))
+            return words
+        
+        self.voice_words = asyncio.run(generate())
         print(f"[VOICE] Saved to: {output_path}")
         
         return output_path
     
     # ==================== FOOTAGE DOWNLOAD ====================
     
-    def download_footage(self, keywords, clips_per_keyword=3):
+    def download_footage(self, keywords, num_clips=None, target_seconds=None):
         """
         Download stock footage from Pexels (FREE API)
         
         Args:
             keywords: List of search keywords
-            clips_per_keyword: Number of clips per keyword
+            num_clips: At least this many clips (default: one per keyword)
+            target_seconds: Stop once this much footage is downloaded
+                            (normally the voiceover length)
         """
         print("\n[FOOTAGE] Downloading stock footage...")
         
@@ -198,71 +247,43 @@ Write the complete script now:"""
             print("[FOOTAGE] No PEXELS_API_KEY - creating placeholder")
             return self._create_placeholder_footage()
         
-        downloaded = []
-        headers = {"Authorization": api_key}
-        
-        for keyword in keywords:
-            print(f"[FOOTAGE] Searching: {keyword}")
-            
-            try:
-                response = requests.get(
-                    "https://api.pexels.com/videos/search",
-                    headers=headers,
-                    params={"query": keyword, "per_page": clips_per_keyword}
-                )
-                
-                if response.status_code != 200:
-                    continue
-                
-                videos = response.json().get('videos', [])
-                
-                for i, video in enumerate(videos):
-                    video_files = video.get('video_files', [])
-                    hd_files = [f for f in video_files if f.get('height', 0) >= 720]
-                    
-                    if not hd_files:
-                        continue
-                    
-                    video_url = hd_files[0].get('link')
-                    filename = f"{keyword.replace(' ', '_')}_{i+1}.mp4"
-                    output_path = self.dirs['footage'] / filename
-                    
-                    video_response = requests.get(video_url, stream=True)
-                    with open(output_path, 'wb') as f:
-                        for chunk in video_response.iter_content(chunk_size=8192):
-                            f.write(chunk)
-                    
-                    downloaded.append(output_path)
-                    print(f"[FOOTAGE] Downloaded: {filename}")
-                    
-            except Exception as e:
-                print(f"[FOOTAGE] Error: {e}")
+        # Same downloader as the other pipelines (project_tools.py)
+        downloaded = project_tools.download_clips(
+            api_key, keywords, str(self.dirs['footage']), target_seconds or 0,
+            num_clips or max(1, len(keywords)), self.config['width'], self.config['height'],
+            search_url=os.getenv('PEXELS_VIDEO_SEARCH_URL')
+        )
         
         if not downloaded:
             return self._create_placeholder_footage()
         
-        return downloaded
+        return [Path(path) for path in downloaded]
     
     def _create_placeholder_footage(self):
-        """Create placeholder footage if no API key"""
-        from moviepy.editor import ColorClip
+        """
+        Create placeholder footage if no API key
         
-        print("[FOOTAGE] Creating placeholder footage...")
+        Placeholders come from the shared asset cache, so each color is
+        only encoded once (by ffmpeg, as a short segment) and reused by
+        every later run - assembly loops them under the voiceover.
+        """
+        print("[FOOTAGE] Using cached placeholder footage...")
+        cache = AssetCache()
         placeholders = []
         colors = [(30, 60, 90), (60, 30, 90), (90, 60, 30)]
         
-        for i, color in enumerate(colors):
-            path = self.dirs['footage'] / f'placeholder_{i+1}.mp4'
-            clip = ColorClip(
-                size=(self.config['width'], self.config['height']),
-                color=color,
-                duration=30
+        for color in colors:
+            path = cache.background(
+                color,
+                (self.config['width'], self.config['height']),
+                self.config['fps'],
+                self.config['placeholder_seconds'],
+                variant=self.config['placeholder_variant']
             )
-            clip.write_videofile(str(path), fps=self.config['fps'], 
-                               codec='libx264', logger=None)
-            clip.close()
-            placeholders.append(path)
+            placeholders.append(Path(path))
         
+        print(f"[FOOTAGE] Placeholders ready ({cache.hits} cached, {cache.misses} new)")
+        self.using_placeholders = True
         return placeholders
     
     # ==================== VIDEO ASSEMBLY ====================
@@ -277,62 +298,129 @@ Write the complete script now:"""
         """
         print("\n[VIDEO] Assembling video...")
         
-        from moviepy.editor import (
-            VideoFileClip, AudioFileClip, concatenate_videoclips
-        )
+        if self.using_placeholders:
+            return self._assemble_static_video(voiceover_path, footage_paths[0])
+        
+        from moviepy.editor import AudioFileClip
         
         # Load audio
         audio = AudioFileClip(str(voiceover_path))
         duration = audio.duration
+        audio.close()
         print(f"[VIDEO] Audio duration: {duration:.1f} seconds")
         
-        # Load and prepare video clips
-        clips = []
-        total_duration = 0
-        
-        for path in footage_paths:
-            try:
-                clip = VideoFileClip(str(path))
-                clip = clip.resize((self.config['width'], self.config['height']))
-                clips.append(clip)
-                total_duration += clip.duration
-            except Exception as e:
-                print(f"[VIDEO] Could not load {path}: {e}")
-        
-        if not clips:
+        plan = self._plan_footage(footage_paths, duration)
+        if not plan:
             print("[VIDEO] ERROR: No footage available")
             return None
         
-        # Loop footage if needed
-        if total_duration < duration:
-            loops = int(duration / total_duration) + 1
-            clips = clips * loops
+        # The edit is written down first (saved as final_video.edl.json)
+        output_path = self.dirs['output'] / 'final_video.mp4'
+        edit = edl.build_edl(
+            plan, str(voiceover_path), self.config['width'], self.config['height'],
+            self.config['fps'], self.config['encode_profile']
+        )
+        edit = self._add_music(edit)
+        segment_cache = None
+        if self.config['render_cache']:
+            previous = edl.find_render(edit, str(self.dirs['output']))
+            if previous:
+                print(f"[VIDEO] Edit unchanged - reusing {previous}")
+                return Path(previous)
+            segment_cache = SegmentCache()
+        
+        # One segment at a time: only the clip being rendered is open, so
+        # memory stays flat however long the video is
+        print(f"[VIDEO] Rendering {len(plan)} segments ({self.config['render_backend']})...")
+        try:
+            rendered = edl.render(edit, str(output_path), backend=self.config['render_backend'],
+                                  work_dir=str(self.dirs['output'] / 'segments'), workers=1,
+                                  segment_cache=segment_cache, mix_cache=MixCache())
+        except Exception as e:
+            print(f"[VIDEO] ERROR: {e}")
+            return None
         
-        # Concatenate and trim
-        video = concatenate_videoclips(clips)
-        video = video.subclip(0, duration)
+        if not rendered:
+            print("[VIDEO] ERROR: No footage could be rendered")
+            return None
         
-        # Add audio
-        video = video.set_audio(audio)
+        edl.mark_rendered(edit, rendered)
+        print(f"[VIDEO] Saved to: {output_path}")
+        return output_path
+    
+    def _add_music(self, edit):
+        """
+        Put a track from the music folder under the voice, ducked while
+        the voice speaks (needs the voiceover word timings and NumPy)
+        """
+        tracks = music.find_tracks(self.config['music_folder'])
+        if not tracks or not self.voice_words or not music.NUMPY_AVAILABLE:
+            return edit
+        
+        voice = edit["audio"][0]["source"]
+        track = music.choose_track(tracks, edit["inputs"][voice]["sha256"])
+        print(f"[VIDEO] Music: {os.path.basename(track)}")
+        return edl.add_audio_track(edit, music.music_track(track, self.voice_words))
+    
+    def _plan_footage(self, footage_paths, duration):
+        """
+        Edit plan: cycle through the footage until the voiceover is covered.
         
-        # Export
+        A clip that comes round again is marked as a loop of its first
+        piece, so the already encoded segment is reused instead of
+        decoding the clip again.
+        """
+        lengths = {}
+        for path in footage_paths:
+            length = ffmpeg_tools.probe_duration(path)
+            if length and length > 0:
+                lengths[str(path)] = length
+            else:
+                print(f"[VIDEO] Could not load {path}")
+        usable = list(lengths)
+        
+        plan = []
+        first_piece = {}
+        covered = 0.0
+        while usable and covered < duration - 0.01:
+            path = usable[len(plan) % len(usable)]
+            take = min(lengths[path], duration - covered)
+            entry = {"source": path, "in": 0.0, "duration": take,
+                     "section": len(plan) + 1, "start": covered}
+            if path in first_piece:
+                entry.update(loop=True, loop_of=first_piece[path])
+            else:
+                first_piece[path] = len(plan)
+            plan.append(entry)
+            covered += take
+        
+        return plan
+    
+    def _assemble_static_video(self, voiceover_path, background_path):
+        """
+        Fast path for placeholder footage: the picture never changes, so
+        the short background segment is looped by stream copy and the
+        voiceover (with any music mixed in) is muxed in directly - nothing
+        is re-encoded.
+        """
         output_path = self.dirs['output'] / 'final_video.mp4'
-        print(f"[VIDEO] Rendering ({duration:.1f}s)...")
-        
-        video.write_videofile(
-            str(output_path),
-            fps=self.config['fps'],
-            codec='libx264',
-            audio_codec='aac',
-            threads=4,
-            logger=None
-        )
+        print("[VIDEO] Static background - muxing voiceover with ffmpeg...")
         
-        # Cleanup
-        audio.close()
-        video.close()
-        for clip in clips:
-            clip.close()
+        try:
+            audio_path = music.voice_with_music(
+                str(voiceover_path), self.voice_words, music.find_tracks(self.config['music_folder'])
+            )
+        except Exception as e:
+            print(f"[VIDEO] Warning: Could not mix music: {e}")
+            audio_path = str(voiceover_path)
+        
+        try:
+            ffmpeg_tools.loop_video_with_audio(
+                str(background_path), audio_path, str(output_path)
+            )
+        except Exception as e:
+            print(f"[VIDEO] ERROR: {e}")
+            return None
         
         print(f"[VIDEO] Saved to: {output_path}")
         return output_path
@@ -463,7 +551,7 @@ We cover all the essential concepts, tips, and strategies you need to succeed.
     
     # ==================== MAIN PIPELINE ====================
     
-    def run(self, topic, length_minutes=8, footage_keywords=None):
+    def run(self, topic, length_minutes=8, footage_keywords=None, allow_repeat=False):
         """
         Run the complete video generation pipeline
         
@@ -471,38 +559,101 @@ We cover all the essential concepts, tips, and strategies you need to succeed.
             topic: Video topic
             length_minutes: Target video length
             footage_keywords: Keywords for stock footage search
+            allow_repeat: Make the video even if the channel already has this topic
         """
+        # Topics are remembered per channel, shared with auto_video_creator.py
+        history = channel_history(os.getenv('YOUTUBE_CHANNEL'))
+        earlier = history.find_duplicate(topic)
+        if earlier and not allow_repeat:
+            print(f"\n[TOPIC] This channel already made: {earlier['title']} ({earlier['made']})")
+            print("[TOPIC] Pick a new topic, or use --allow-repeat to make it again")
+            return None
+        
+        # Every stage is timed and measured (<project>/runs/<run id>/)
+        self.recorder = RunRecorder("master_automation", self.base_dir, profile=self.profile)
+        
+        result = None
+        try:
+            result = self._run_stages(topic, length_minutes, footage_keywords)
+        finally:
+            total = self.recorder.finish(result is not None)
+            self._save_manifest(total, topic)
+        
+        if result:
+            history.record(topic, result['video'])
+        return result
+    
+    # Project folders and what the files in them are
+    ARTIFACT_FOLDERS = [
+        ('scripts', 'generate_script', 'script'),
+        ('voiceovers', 'generate_voiceover', 'voiceover'),
+        ('footage', 'download_footage', 'clip'),
+        ('output', 'assemble_video', 'video'),
+        ('thumbnails', 'create_thumbnail', 'thumbnail'),
+        ('metadata', 'generate_metadata', 'metadata'),
+    ]
+    
+    def _save_manifest(self, total, topic):
+        """Write <project>/runs/<run id>/manifest.json and add it to the artifact index"""
+        try:
+            index = ArtifactIndex()
+            manifest = RunManifest(self.recorder.run_id, "master_automation", self.recorder.run_dir,
+                                   channel=os.getenv('YOUTUBE_CHANNEL'), topic=topic)
+            
+            for folder, stage, kind in self.ARTIFACT_FOLDERS:
+                for path in sorted(self.dirs[folder].glob('*')):
+                    if path.is_file():
+                        file_kind = 'edl' if path.name.endswith(edl.EDL_SUFFIX) else kind
+                        manifest.add(stage, file_kind, str(path), index=index)
+            
+            manifest_file = manifest.save(self.recorder, total, index=index)
+            print(f"[MANIFEST] Saved to: {manifest_file}")
+        except Exception as e:
+            print(f"[MANIFEST] Warning: could not save the run manifest: {e}")
+    
+    def _run_stages(self, topic, length_minutes, footage_keywords):
+        """All pipeline steps, each measured as its own stage"""
+        stage = self.recorder.call
+        
         print("\n" + "=" * 60)
         print("FACELESS YOUTUBE VIDEO GENERATOR")
         print("=" * 60)
         print(f"Topic: {topic}")
         print(f"Length: {length_minutes} minutes")
         print(f"Started: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        print(f"Run: {self.recorder.run_id}")
         print("=" * 60)
         
         # Step 1: Generate script
-        script = self.generate_script(topic, length_minutes)
+        script = stage("generate_script", self.generate_script, topic, length_minutes)
         if not script:
             return None
         
         # Step 2: Generate voiceover
-        voiceover = self.generate_voiceover(script)
+        voiceover = stage("generate_voiceover", self.generate_voiceover, script)
         
         # Step 3: Download footage
         if footage_keywords is None:
             footage_keywords = topic.split()[:3]
-        footage = self.download_footage(footage_keywords)
+        narration_seconds = ffmpeg_tools.probe_duration(voiceover)
+        footage = stage("download_footage", self.download_footage, footage_keywords,
+                        target_seconds=narration_seconds)
         
         # Step 4: Assemble video
-        video = self.assemble_video(voiceover, footage)
+        with self.recorder.stage("assemble_video") as assemble_stage:
+            video = self.assemble_video(voiceover, footage)
+            assemble_stage["ok"] = bool(video)
+            video_seconds = ffmpeg_tools.probe_duration(video) if video else None
+            if video_seconds:
+                assemble_stage["frames"] = int(video_seconds * self.config['fps'])
         if not video:
             return None
         
         # Step 5: Create thumbnail
-        thumbnail = self.create_thumbnail(topic)
+        thumbnail = stage("create_thumbnail", self.create_thumbnail, topic)
         
         # Step 6: Generate metadata
-        metadata = self.generate_metadata(topic)
+        metadata = stage("generate_metadata", self.generate_metadata, topic)
         
         # Summary
         print("\n" + "=" * 60)
@@ -542,18 +693,41 @@ def main():
         nargs='+',
         help='Keywords for stock footage search'
     )
+    parser.add_argument(
+        '--allow-repeat',
+        action='store_true',
+        help='Make the video even if this channel already made the same topic'
+    )
     parser.add_argument(
         '--project', '-p',
         help='Project name (default: auto-generated)'
     )
+    parser.add_argument(
+        '--encode-profile', '-e',
+        choices=list(encode_profiles.ENCODE_PROFILES),
+        default='balanced',
+        help='Encode speed/quality profile (default: balanced)'
+    )
+    parser.add_argument(
+        '--profile',
+        nargs='?',
+        const='cpu',
+        choices=profiling.MODES,
+        help='Profile every step: cpu, sample or memory (default: cpu) - saved in <project>/runs'
+    )
     
     args = parser.parse_args()
     
-    generator = FacelessVideoGenerator(project_name=args.project)
+    generator = FacelessVideoGenerator(
+        project_name=args.project,
+        encode_profile=args.encode_profile,
+        profile=args.profile
+    )
     result = generator.run(
         topic=args.topic,
         length_minutes=args.length,
-        footage_keywords=args.keywords
+        footage_keywords=args.keywords,
+        allow_repeat=args.allow_repeat
     )
     
     if result:
@@ -0,0 +1,141 @@
+"""
+Artifact index: runs recorded through their manifests, and the
+questions asked of the SQLite database (which videos used a clip, the
+slowest renders, every file still on disk).
+"""
+
+import datetime
+import json
+import os
+import sqlite3
+import sys
+import types
+
+import pytest
+
+AUTOMATION_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                              "projects", "00-complete-automation")
+sys.path.insert(0, AUTOMATION_DIR)
+
+import artifact_index
+from artifact_index import ArtifactIndex, RunManifest
+
+
+def _days_ago(days):
+    return (datetime.datetime.now() - datetime.timedelta(days=days)).isoformat(timespec="seconds")
+
+
+def _save(index, tmp_path, run_id, clips, render_seconds, days_ago=0):
+    """Record one run that used clips, with its render time"""
+    manifest = RunManifest(run_id, "auto", str(tmp_path / "runs" / run_id), channel="main", topic=f"Topic {run_id}")
+    for clip in clips:
+        manifest.add("download_clips", "clip", clip, source=os.path.basename(clip).split(".")[0], index=index)
+    video = tmp_path / f"{run_id}.mp4"
+    video.write_bytes(run_id.encode())
+    manifest.add("assemble_video", "video", str(video))
+    recorder = types.SimpleNamespace(started_at=None, stages=[
+        {"stage": "download_clips", "ok": True, "wall_seconds": 2.0},
+        {"stage": "assemble_video", "ok": True, "wall_seconds": render_seconds, "cpu_seconds": 1.0,
+         "encode_fps": 30.0},
+    ])
+    manifest.save(recorder, {"started": _days_ago(days_ago), "ok": True, "wall_seconds": render_seconds + 2},
+                  index=index)
+    return manifest
+
+
+@pytest.fixture
+def index(tmp_path):
+    return ArtifactIndex(str(tmp_path / "index.db"))
+
+
+@pytest.fixture
+def clips(tmp_path):
+    folder = tmp_path / "clips"
+    folder.mkdir()
+    paths = []
+    for number in (1001, 1002):
+        path = folder / f"pexels_{number}.mp4"
+        path.write_bytes(str(number).encode() * 100)
+        paths.append(str(path))
+    return paths
+
+
+def test_schema(index):
+    with sqlite3.connect(index.db_file) as db:
+        tables = {row[0] for row in db.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        indexes = {row[0] for row in db.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert {"runs", "artifacts", "stages", "uploads", "deleted_files"} <= tables
+    assert {"artifacts_hash", "artifacts_path", "stages_slowest", "runs_started"} <= indexes
+
+    # Opening it again keeps what is there
+    ArtifactIndex(index.db_file)
+
+
+def test_manifest_is_written_and_indexed(index, tmp_path, clips):
+    manifest = _save(index, tmp_path, "run_a", clips, 10.0)
+
+    with open(manifest.path, "r", encoding="utf-8") as f:
+        saved = json.load(f)
+    assert saved["run_id"] == "run_a"
+    assert [a["kind"] for a in saved["artifacts"]] == ["clip", "clip", "video"]
+    assert saved["artifacts"][0]["sha256"] == artifact_index.file_hash(clips[0])
+    assert [s["stage"] for s in saved["stages"]] == ["download_clips", "assemble_video"]
+
+    assert [a["path"] for a in index.run_artifacts("run_a")] == clips + [str(tmp_path / "run_a.mp4")]
+    assert index.recent_runs()[0]["run_id"] == "run_a"
+
+
+def test_runs_using_a_clip(index, tmp_path, clips):
+    _save(index, tmp_path, "run_a", clips, 10.0, days_ago=2)
+    _save(index, tmp_path, "run_b", clips[:1], 10.0, days_ago=1)
+    index.record_upload("run_b", "yt_b")
+
+    def run_ids(clip):
+        return [row["run_id"] for row in index.runs_using(clip)]
+
+    # By file name, Pexels id, path or hash - newest first
+    assert run_ids("pexels_1001.mp4") == ["run_b", "run_a"]
+    assert run_ids("pexels_1001") == ["run_b", "run_a"]
+    assert run_ids(clips[1]) == ["run_a"]
+    assert run_ids(artifact_index.file_hash(clips[1])) == ["run_a"]
+    assert run_ids("pexels_9999") == []
+    assert index.runs_using("pexels_1001")[0]["youtube_id"] == "yt_b"
+
+
+def test_slowest_renders(index, tmp_path, clips):
+    _save(index, tmp_path, "fast", clips, 5.0, days_ago=1)
+    _save(index, tmp_path, "slow", clips, 50.0, days_ago=2)
+    _save(index, tmp_path, "slowest_long_ago", clips, 500.0, days_ago=30)
+
+    rows = index.slowest("assemble_video", days=7)
+    assert [(row["run_id"], row["wall_seconds"]) for row in rows] == [("slow", 50.0), ("fast", 5.0)]
+    assert rows[0]["encode_fps"] == 30.0
+    assert len(index.slowest("assemble_video", days=60, limit=1)) == 1
+    assert index.slowest("download_clips", days=7)[0]["wall_seconds"] == 2.0
+
+
+def test_file_references_leave_out_deleted_files(index, tmp_path, clips):
+    _save(index, tmp_path, "run_a", clips, 10.0, days_ago=3)
+    _save(index, tmp_path, "run_b", clips[:1], 10.0, days_ago=1)
+    index.record_upload("run_a", "yt_a")
+
+    references = index.file_references()
+    shared = [r for r in references if r["path"] == clips[0]]
+    assert sorted(r["run_id"] for r in shared) == ["run_a", "run_b"]
+    assert {r["uploaded"] is not None for r in shared} == {True, False}
+    assert all(r["kind"] == "clip" and r["size"] == 400 and r["mtime_ns"] for r in shared)
+
+    stat = os.stat(clips[0])
+    index.mark_deleted(clips[0], stat.st_mtime_ns, stat.st_size, "expired")
+    assert clips[0] not in [r["path"] for r in index.file_references()]
+    assert clips[1] in [r["path"] for r in index.file_references()]
+
+
+def test_rebuild_reads_the_manifests(index, tmp_path, clips):
+    _save(index, tmp_path, "run_a", clips, 10.0)
+    _save(index, tmp_path, "run_b", clips, 20.0)
+
+    fresh = ArtifactIndex(str(tmp_path / "fresh.db"))
+    assert fresh.rebuild(str(tmp_path / "runs")) == 2
+    assert sorted(row["run_id"] for row in fresh.runs_using("pexels_1002")) == ["run_a", "run_b"]
+    assert fresh.runs_folders() == [str(tmp_path / "runs")]
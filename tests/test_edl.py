@@ -0,0 +1,172 @@
+"""
+Edit decision lists: after changing one section, rendering again only
+renders that section; every other one comes from the segment cache.
+Also which sections `edl diff` reports, and the EDL hash.
+"""
+
+import os
+import sys
+
+import pytest
+
+AUTOMATION_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                              "projects", "00-complete-automation")
+sys.path.insert(0, AUTOMATION_DIR)
+
+pytest.importorskip("moviepy.editor")
+ffmpeg_tools = pytest.importorskip("ffmpeg_tools")
+
+import edl
+from asset_cache import SegmentCache
+
+SIZE = (320, 180)
+FPS = 15
+
+
+class RecordingCache(SegmentCache):
+    """Segment cache that remembers which keys it did not have"""
+
+    def __init__(self, cache_dir):
+        super().__init__(cache_dir)
+        self.missed = []
+
+    def get(self, key):
+        found = super().get(key)
+        if not found:
+            self.missed.append(key)
+        return found
+
+
+@pytest.fixture(scope="module")
+def media(tmp_path_factory):
+    folder = tmp_path_factory.mktemp("media")
+    clips = []
+    for i, pattern in enumerate(("testsrc2", "smptebars", "rgbtestsrc", "testsrc")):
+        path = str(folder / f"clip_{i}.mp4")
+        ffmpeg_tools.run_ffmpeg([
+            "-f", "lavfi", "-i", f"{pattern}=s={SIZE[0]}x{SIZE[1]}:r={FPS}:d=2",
+            "-c:v", "libx264", "-preset", "ultrafast", "-pix_fmt", "yuv420p", path
+        ])
+        clips.append(path)
+    voice = str(folder / "voice.m4a")
+    ffmpeg_tools.run_ffmpeg(["-f", "lavfi", "-i", "sine=frequency=440:duration=3", "-c:a", "aac", voice])
+    return clips, voice
+
+
+def _plan(clips, ins=(0.0, 0.0, 0.0)):
+    return [{"source": clips[i], "in": ins[i], "duration": 1.0, "start": float(i), "section": i + 1}
+            for i in range(3)]
+
+
+def _keys_by_section(edit):
+    return {item["section"]: edl.segment_key(edit, item, edl.piece_cues(edit, item)) for item in edit["video"]}
+
+
+def _render(edit, tmp_path, cache, name):
+    output = edl.render(edit, str(tmp_path / name), work_dir=str(tmp_path / f"work_{name}"),
+                        workers=1, segment_cache=cache)
+    assert output and os.path.getsize(output) > 0
+    return output
+
+
+def test_changing_one_section_renders_only_that_section(media, tmp_path):
+    clips, voice = media
+    cache = RecordingCache(str(tmp_path / "cache"))
+
+    first = edl.build_edl(_plan(clips), voice, SIZE[0], SIZE[1], FPS, "draft")
+    _render(first, tmp_path, cache, "first.mp4")
+    assert sorted(cache.missed) == sorted(_keys_by_section(first).values())
+
+    # Fix section 2: another clip
+    plan = _plan(clips)
+    plan[1]["source"] = clips[3]
+    second = edl.build_edl(plan, voice, SIZE[0], SIZE[1], FPS, "draft")
+    cache.missed.clear()
+    _render(second, tmp_path, cache, "second.mp4")
+
+    assert cache.missed == [_keys_by_section(second)[2]]
+    assert ffmpeg_tools.probe_duration(str(tmp_path / "second.mp4")) == pytest.approx(3.0, abs=0.2)
+
+
+def test_changing_captions_of_one_section_renders_only_that_section(media, tmp_path):
+    clips, voice = media
+    cache = RecordingCache(str(tmp_path / "cache"))
+    cues = [{"start": 0.1, "end": 0.9, "text": "One"}, {"start": 2.1, "end": 2.9, "text": "Three"}]
+
+    first = edl.build_edl(_plan(clips), voice, SIZE[0], SIZE[1], FPS, "draft", cues=cues)
+    _render(first, tmp_path, cache, "first.mp4")
+
+    fixed = [cues[0], dict(cues[1], text="Three, fixed")]
+    second = edl.build_edl(_plan(clips), voice, SIZE[0], SIZE[1], FPS, "draft", cues=fixed)
+    cache.missed.clear()
+    _render(second, tmp_path, cache, "second.mp4")
+
+    assert cache.missed == [_keys_by_section(second)[3]]
+
+
+def test_moved_section_is_not_reported_or_rendered_again(media, tmp_path):
+    clips, voice = media
+    cache = RecordingCache(str(tmp_path / "cache"))
+    first = edl.build_edl(_plan(clips), voice, SIZE[0], SIZE[1], FPS, "draft")
+    _render(first, tmp_path, cache, "first.mp4")
+
+    # Section 1 gets longer: sections 2 and 3 only move along the timeline
+    plan = _plan(clips)
+    plan[0]["duration"] = 1.5
+    for entry in plan[1:]:
+        entry["start"] += 0.5
+    second = edl.build_edl(plan, voice, SIZE[0], SIZE[1], FPS, "draft")
+
+    assert edl.changed_sections(first, second) == [1]
+    cache.missed.clear()
+    _render(second, tmp_path, cache, "second.mp4")
+    assert cache.missed == [_keys_by_section(second)[1]]
+
+
+def test_changed_sections(media):
+    clips, voice = media
+    cues = [{"start": 0.1, "end": 0.9, "text": "One"}, {"start": 2.1, "end": 2.9, "text": "Three"}]
+    base = edl.build_edl(_plan(clips), voice, SIZE[0], SIZE[1], FPS, "draft", cues=cues)
+
+    assert edl.changed_sections(base, base) == []
+
+    trimmed = edl.build_edl(_plan(clips, ins=(0.0, 0.5, 0.0)), voice, SIZE[0], SIZE[1], FPS, "draft", cues=cues)
+    assert edl.changed_sections(base, trimmed) == [2]
+
+    recaptioned = edl.build_edl(_plan(clips), voice, SIZE[0], SIZE[1], FPS, "draft",
+                                cues=[cues[0], dict(cues[1], text="Three, fixed")])
+    assert edl.changed_sections(base, recaptioned) == [3]
+
+    # One audio stream under the whole video
+    other_voice = edl.build_edl(_plan(clips), clips[0], SIZE[0], SIZE[1], FPS, "draft", cues=cues)
+    assert edl.changed_sections(base, other_voice) == [1, 2, 3]
+
+
+def test_edl_hash_is_stable_and_follows_content(media, tmp_path):
+    clips, voice = media
+    edit = edl.build_edl(_plan(clips), voice, SIZE[0], SIZE[1], FPS, "draft")
+
+    # Same edit, same hash - also after saving and loading
+    assert edl.build_edl(_plan(clips), voice, SIZE[0], SIZE[1], FPS, "draft")["hash"] == edit["hash"]
+    saved = edl.load_edl(edl.save_edl(edit, str(tmp_path / "edit.edl.json")))
+    assert edl.edl_hash(saved) == edit["hash"]
+
+    # A renamed copy of a clip is the same content
+    renamed = str(tmp_path / "renamed.mp4")
+    with open(clips[0], "rb") as src, open(renamed, "wb") as dst:
+        dst.write(src.read())
+    plan = _plan(clips)
+    plan[0]["source"] = renamed
+    assert edl.build_edl(plan, voice, SIZE[0], SIZE[1], FPS, "draft")["hash"] == edit["hash"]
+
+    # Different clip content, in point, encoding or captions: different hash
+    plan[0]["source"] = clips[3]
+    changed = [
+        edl.build_edl(plan, voice, SIZE[0], SIZE[1], FPS, "draft"),
+        edl.build_edl(_plan(clips, ins=(0.5, 0.0, 0.0)), voice, SIZE[0], SIZE[1], FPS, "draft"),
+        edl.build_edl(_plan(clips), voice, SIZE[0], SIZE[1], FPS, "balanced"),
+        edl.build_edl(_plan(clips), voice, SIZE[0], SIZE[1], FPS, "draft",
+                      cues=[{"start": 0.0, "end": 1.0, "text": "Hi"}]),
+    ]
+    hashes = {edit["hash"]} | {other["hash"] for other in changed}
+    assert len(hashes) == len(changed) + 1
@@ -0,0 +1,75 @@
+"""
+Encode profiles: the encoder settings each profile gives MoviePy and
+ffmpeg, and the trigger file that picks the profile of the next video.
+"""
+
+import os
+import sys
+
+import pytest
+
+AUTOMATION_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                              "projects", "00-complete-automation")
+sys.path.insert(0, AUTOMATION_DIR)
+
+import encode_profiles
+
+# (preset, crf, keyframe every N frames at 30 fps, tune)
+EXPECTED = {
+    "draft": ("ultrafast", "30", "30", "fastdecode"),
+    "fast": ("veryfast", "24", "60", None),
+    "balanced": ("medium", "21", "60", None),
+    "archival": ("slow", "18", "120", "film"),
+}
+
+
+def _x264(crf, gop, tune):
+    params = ["-crf", crf, "-g", gop, "-pix_fmt", "yuv420p"]
+    return params + (["-tune", tune] if tune else [])
+
+
+def test_every_profile_is_tested():
+    assert set(EXPECTED) == set(encode_profiles.ENCODE_PROFILES)
+
+
+@pytest.mark.parametrize("name", sorted(EXPECTED))
+def test_moviepy_args(name):
+    preset, crf, gop, tune = EXPECTED[name]
+    assert encode_profiles.moviepy_args(name, 30, ["-movflags", "+faststart"]) == {
+        "codec": "libx264",
+        "preset": preset,
+        "threads": 0,
+        "ffmpeg_params": _x264(crf, gop, tune) + ["-movflags", "+faststart"],
+    }
+
+
+@pytest.mark.parametrize("name", sorted(EXPECTED))
+def test_ffmpeg_args(name):
+    preset, crf, gop, tune = EXPECTED[name]
+    assert encode_profiles.ffmpeg_args(name, 30) == (
+        ["-c:v", "libx264", "-preset", preset, "-threads", "0"] + _x264(crf, gop, tune)
+    )
+
+
+def test_keyframe_distance_follows_the_frame_rate():
+    args = encode_profiles.ffmpeg_args("balanced", 24)
+    assert args[args.index("-g") + 1] == "48"
+
+
+def test_unknown_profile():
+    with pytest.raises(ValueError, match="turbo"):
+        encode_profiles.ffmpeg_args("turbo", 30)
+
+
+def test_trigger_file_picks_the_next_video_only(tmp_path, capsys):
+    trigger = tmp_path / "encode_profile_next_run.txt"
+    assert encode_profiles.take_trigger(str(trigger)) is None
+
+    trigger.write_text("Archival\n")
+    assert encode_profiles.take_trigger(str(trigger)) == "archival"
+    assert not trigger.exists()
+
+    trigger.write_text("turbo")
+    assert encode_profiles.take_trigger(str(trigger)) is None
+    assert "turbo" in capsys.readouterr().out
+    assert not trigger.exists()
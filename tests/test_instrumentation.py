@@ -0,0 +1,77 @@
+"""
+Stage measurements: network bytes are counted for the stage that moved
+them, not for whatever stage the main thread happens to be in.
+"""
+
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+AUTOMATION_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                              "projects", "00-complete-automation")
+sys.path.insert(0, AUTOMATION_DIR)
+
+import instrumentation
+
+
+def _stage(recorder, name):
+    return next(record for record in recorder.stages if record["stage"] == name)
+
+
+def test_background_uploads_are_not_counted_for_the_running_stage(tmp_path):
+    recorder = instrumentation.RunRecorder("test", str(tmp_path))
+    before = instrumentation.byte_counters()
+    uploading, uploaded = threading.Event(), threading.Event()
+
+    def background_upload():
+        uploading.wait()
+        instrumentation.count_bytes("uploaded", 5000)
+        uploaded.set()
+
+    worker = threading.Thread(target=background_upload)
+    worker.start()
+    with recorder.stage("assemble_video"):
+        instrumentation.count_bytes("downloaded", 300)
+        uploading.set()
+        uploaded.wait()
+    worker.join()
+
+    render = _stage(recorder, "assemble_video")
+    assert render["bytes_downloaded"] == 300
+    assert render["bytes_uploaded"] == 0
+
+    # The process totals (metrics server) still see everything
+    after = instrumentation.byte_counters()
+    assert after["uploaded"] - before["uploaded"] == 5000
+    assert after["downloaded"] - before["downloaded"] == 300
+
+
+def test_work_handed_to_a_pool_counts_for_the_stage(tmp_path):
+    recorder = instrumentation.RunRecorder("test", str(tmp_path))
+
+    def upload(amount):
+        instrumentation.count_bytes("uploaded", amount)
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        with recorder.stage("upload_to_youtube"):
+            futures = [pool.submit(instrumentation.same_stage(upload), 100) for _ in range(4)]
+            for future in futures:
+                future.result()
+        # Outside any stage: counted for none
+        pool.submit(instrumentation.same_stage(upload), 7).result()
+        pool.submit(upload, 9).result()
+
+    assert _stage(recorder, "upload_to_youtube")["bytes_uploaded"] == 400
+
+
+def test_inner_stage_bytes_count_for_the_outer_stage_too(tmp_path):
+    recorder = instrumentation.RunRecorder("test", str(tmp_path))
+    with recorder.stage("download_clips"):
+        instrumentation.count_bytes("downloaded", 10)
+        with recorder.stage("download_one_clip"):
+            instrumentation.count_bytes("downloaded", 20)
+    instrumentation.count_bytes("downloaded", 40)
+
+    assert _stage(recorder, "download_one_clip")["bytes_downloaded"] == 20
+    assert _stage(recorder, "download_clips")["bytes_downloaded"] == 30
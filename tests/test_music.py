@@ -0,0 +1,110 @@
+"""
+Background music: the volume curve ducks while the voice speaks and
+comes back up in the pauses, and mixing the same voiceover and track
+again reuses the cached mix.
+"""
+
+import os
+import shutil
+import sys
+
+import pytest
+
+AUTOMATION_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                              "projects", "00-complete-automation")
+sys.path.insert(0, AUTOMATION_DIR)
+
+np = pytest.importorskip("numpy")
+
+import music
+from asset_cache import MixCache
+
+WORDS = [
+    {"start": 2.0, "end": 3.0},
+    # A short pause: joined with the word before
+    {"start": 3.2, "end": 4.0},
+    {"start": 8.0, "end": 9.0},
+]
+
+SETTINGS = {"volume": 0.3, "ducked_volume": 0.05, "attack": 0.2, "release": 0.5, "fade": 0.0}
+
+
+def test_speech_intervals_join_short_pauses():
+    assert music.speech_intervals(WORDS, min_pause=0.7) == [[2.0, 4.0], [8.0, 9.0]]
+    assert music.speech_intervals(WORDS, min_pause=0.1) == [[2.0, 3.0], [3.2, 4.0], [8.0, 9.0]]
+
+
+def test_music_is_ducked_while_the_voice_speaks():
+    track = music.music_track("track.mp3", WORDS, SETTINGS)
+    gain_at = music.gain_curve(track, duration=12.0)
+
+    def gain(t):
+        return float(gain_at(np.array([t]))[0])
+
+    # Full volume before, between and after the speech
+    for t in (0.5, 1.7, 5.0, 7.7, 10.0):
+        assert gain(t) == pytest.approx(0.3)
+    # Ducked while speaking, also in the short pause between two words
+    for t in (2.0, 2.5, 3.1, 3.9, 8.5):
+        assert gain(t) == pytest.approx(0.05)
+    # Ducks in over the attack time, comes back over the release time
+    assert 0.05 < gain(1.9) < 0.3
+    assert 0.05 < gain(4.25) < 0.3
+    assert gain(4.1) < gain(4.3)
+
+
+def test_fade_in_and_out():
+    track = music.music_track("track.mp3", WORDS, dict(SETTINGS, fade=1.0))
+    gains = music.gain_curve(track, duration=12.0)(np.array([0.0, 0.5, 1.0, 11.0, 11.5, 12.0]))
+    assert gains.dtype == np.float32
+    assert list(gains) == pytest.approx([0.0, 0.15, 0.3, 0.3, 0.15, 0.0], abs=1e-6)
+
+
+@pytest.fixture(scope="module")
+def audio(tmp_path_factory):
+    ffmpeg_tools = pytest.importorskip("ffmpeg_tools")
+    folder = tmp_path_factory.mktemp("audio")
+    voice = str(folder / "voice.m4a")
+    track = str(folder / "track.m4a")
+    ffmpeg_tools.run_ffmpeg(["-f", "lavfi", "-i", "sine=frequency=440:duration=3", "-c:a", "aac", voice])
+    ffmpeg_tools.run_ffmpeg(["-f", "lavfi", "-i", "sine=frequency=220:duration=1", "-c:a", "aac", track])
+    return voice, track
+
+
+def test_unchanged_voice_and_track_reuse_the_mix(audio, tmp_path, monkeypatch):
+    voice, track = audio
+    cache = MixCache(str(tmp_path / "cache"))
+    words = [{"start": 0.5, "end": 1.5}]
+
+    rendered = []
+    real_render = music._render_mix
+
+    def counting_render(*args):
+        rendered.append(args)
+        return real_render(*args)
+
+    monkeypatch.setattr(music, "_render_mix", counting_render)
+
+    first = music.voice_with_music(voice, words, [track], cache=cache)
+    assert first != voice and os.path.exists(first)
+    assert len(rendered) == 1
+
+    # Same content under another name: same mix, nothing mixed again
+    copy = str(tmp_path / "voice_copy.m4a")
+    shutil.copy(voice, copy)
+    assert music.voice_with_music(voice, words, [track], cache=cache) == first
+    assert music.voice_with_music(copy, words, [track], cache=cache) == first
+    assert len(rendered) == 1
+    assert cache.hits == 2
+
+    # Other ducking: another mix
+    other = music.voice_with_music(voice, [{"start": 1.0, "end": 2.0}], [track], cache=cache)
+    assert other != first
+    assert len(rendered) == 2
+
+
+def test_no_music_without_tracks_or_word_timings(audio, tmp_path):
+    voice, track = audio
+    cache = MixCache(str(tmp_path / "cache"))
+    assert music.voice_with_music(voice, [{"start": 0.5, "end": 1.5}], [], cache=cache) == voice
+    assert music.voice_with_music(voice, [], [track], cache=cache) == voice
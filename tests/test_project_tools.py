@@ -0,0 +1,103 @@
+"""
+The shared Pexels clip downloader (used by auto_video_creator.py,
+scripts/master_automation.py and the starter projects), against a
+local stand-in for the Pexels API.
+"""
+
+import json
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+AUTOMATION_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                              "projects", "00-complete-automation")
+sys.path.insert(0, AUTOMATION_DIR)
+
+import project_tools
+
+
+def _video(video_id, duration, host, broken=False):
+    name = "broken" if broken else f"clip{video_id}"
+    return {
+        "id": video_id,
+        "duration": duration,
+        "video_files": [
+            {"link": f"http://{host}/files/{name}-4k", "width": 3840, "height": 2160, "size": 400},
+            {"link": f"http://{host}/files/{name}-1080", "width": 1920, "height": 1080, "size": 100},
+            {"link": f"http://{host}/files/{name}-720", "width": 1280, "height": 720, "size": 50},
+        ],
+    }
+
+
+@pytest.fixture
+def pexels():
+    requested = {"searches": [], "files": []}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            parsed = urlparse(self.path)
+            host = self.headers.get("Host")
+            if parsed.path == "/videos/search":
+                requested["searches"].append(parse_qs(parsed.query)["query"][0])
+                videos = [_video(1, 4, host, broken=True), _video(2, 30, host),
+                          _video(3, 8, host), _video(4, 12, host)]
+                body = json.dumps({"videos": videos}).encode()
+                status = 200
+            elif parsed.path.startswith("/files/"):
+                requested["files"].append(parsed.path[len("/files/"):])
+                broken = "broken" in parsed.path
+                body = b"error" if broken else parsed.path.encode() * 1000
+                status = 500 if broken else 200
+            else:
+                body, status = b"", 404
+            self.send_response(status)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/videos/search", requested
+    server.shutdown()
+
+
+def test_pick_video_file_takes_the_smallest_big_enough():
+    files = _video(1, 10, "host")["video_files"]
+    assert project_tools.pick_video_file(files)["width"] == 1920
+    assert project_tools.pick_video_file(files, 1280, 720)["width"] == 1280
+    assert project_tools.pick_video_file(files[2:])["width"] == 1280
+    assert project_tools.pick_video_file([]) is None
+
+
+def test_download_clips_stops_when_the_narration_is_covered(pexels, tmp_path):
+    search_url, requested = pexels
+    clips = project_tools.download_clips("key", ["sharks", "ocean"], str(tmp_path), 40, 2,
+                                         search_url=search_url)
+
+    # Clips long enough for a 20s part first, then the longest short one
+    assert [os.path.basename(clip) for clip in clips] == ["pexels_2_1920x1080.mp4", "pexels_4_1920x1080.mp4"]
+    assert requested["searches"] == ["sharks"]
+    assert not any(name.endswith("4k") for name in requested["files"])
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".part")]
+
+
+def test_failed_download_is_skipped_and_clips_are_reused(pexels, tmp_path):
+    search_url, requested = pexels
+    clips = project_tools.download_clips("key", ["sharks"], str(tmp_path), 16, 4, search_url=search_url)
+
+    # The broken video is skipped, the other three are downloaded
+    assert len(clips) == 3
+    assert "broken-1080" in requested["files"]
+    assert sorted(os.listdir(tmp_path)) == sorted(os.path.basename(clip) for clip in clips)
+
+    requested["files"].clear()
+    again = project_tools.download_clips("key", ["sharks"], str(tmp_path), 16, 4, search_url=search_url)
+    assert again == clips
+    assert requested["files"] == ["broken-1080"]
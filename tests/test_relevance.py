@@ -0,0 +1,86 @@
+"""
+Niche relevance: trends that fit the channel are ranked above the ones
+that do not, and each niche's scorer is built once and shared.
+"""
+
+import os
+import sys
+
+import pytest
+
+AUTOMATION_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                              "projects", "00-complete-automation")
+sys.path.insert(0, AUTOMATION_DIR)
+
+import relevance
+
+SPACE_KEYWORDS = ["space", "planet", "galaxy", "black hole", "nasa", "mars"]
+
+ON_NICHE = [
+    "New Images Of The Andromeda Galaxy",
+    "Why Black Holes Evaporate",
+    "NASA Announces Next Moon Mission",
+    "Ten Planets Bigger Than Jupiter",
+    "Life On Mars: What The Rover Found",
+]
+
+OFF_NICHE = [
+    "Celebrity Wedding Photos Leaked",
+    "Best Chocolate Cake Recipe",
+    "Football Transfer Window Rumours",
+    "Stock Market Falls Again",
+    "How To Train Your Puppy",
+]
+
+
+@pytest.fixture(autouse=True)
+def no_shared_scorers():
+    relevance._scorers.clear()
+    yield
+    relevance._scorers.clear()
+
+
+def test_on_niche_titles_rank_above_off_niche_ones():
+    scorer = relevance.NicheScorer(SPACE_KEYWORDS, ["Amazing facts about the universe"])
+    ranked = [title for _, title in scorer.rank(OFF_NICHE + ON_NICHE)]
+
+    assert set(ranked[:len(ON_NICHE)]) == set(ON_NICHE)
+    assert set(ranked[len(ON_NICHE):]) == set(OFF_NICHE)
+    assert all(0.0 <= scorer.score(title) <= 1.0 for title in ON_NICHE + OFF_NICHE)
+
+
+def test_plural_and_phrase_keywords_match():
+    scorer = relevance.NicheScorer(SPACE_KEYWORDS, use_embeddings=False)
+    assert scorer.score("Planets colliding") > scorer.score("Kittens colliding")
+    assert scorer.score("Inside a black hole") > scorer.score("Inside a black box")
+
+
+def test_min_score_leaves_out_off_niche_titles():
+    scorer = relevance.NicheScorer(SPACE_KEYWORDS)
+    lowest_on_niche = min(scorer.score(title) for title in ON_NICHE)
+    kept = [title for _, title in scorer.rank(ON_NICHE + OFF_NICHE, min_score=lowest_on_niche)]
+    assert sorted(kept) == sorted(ON_NICHE)
+
+
+def test_one_scorer_per_niche(monkeypatch):
+    built = []
+    real_scorer = relevance.NicheScorer
+
+    def counting_scorer(*args, **kwargs):
+        built.append(args)
+        return real_scorer(*args, **kwargs)
+
+    monkeypatch.setattr(relevance, "NicheScorer", counting_scorer)
+
+    space = relevance.get_scorer("Space", SPACE_KEYWORDS)
+    assert relevance.get_scorer("space", SPACE_KEYWORDS) is space
+    assert relevance.get_scorer("Space", SPACE_KEYWORDS) is space
+    assert len(built) == 1
+
+    cooking = relevance.get_scorer("Cooking", ["recipe", "cake", "baking"])
+    assert cooking is not space
+    assert len(built) == 2
+    assert cooking.score("Best Chocolate Cake Recipe") > space.score("Best Chocolate Cake Recipe")
+
+    # Other keywords for the same niche: a new scorer
+    assert relevance.get_scorer("Space", SPACE_KEYWORDS[:2]) is not space
@@ -0,0 +1,148 @@
+"""
+Retention: files are only deleted when every run that used them is done
+with them, never while a video is being made, and never when the file
+on disk is not the one that was recorded.
+"""
+
+import datetime
+import os
+import sys
+import types
+
+import pytest
+
+AUTOMATION_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                              "projects", "00-complete-automation")
+sys.path.insert(0, AUTOMATION_DIR)
+
+from artifact_index import ArtifactIndex, RunManifest
+from retention import RetentionManager, RetentionPolicy
+
+
+def _days_ago(days):
+    return (datetime.datetime.now() - datetime.timedelta(days=days)).isoformat(timespec="seconds")
+
+
+@pytest.fixture
+def setup(tmp_path):
+    index = ArtifactIndex(str(tmp_path / "index.db"))
+    manager = RetentionManager(index, RetentionPolicy(video_days_after_upload=7, clip_days=14))
+    files = tmp_path / "files"
+    files.mkdir()
+    return index, manager, tmp_path / "runs", files
+
+
+def _file(folder, name, size=100):
+    path = folder / name
+    path.write_bytes(name.encode().ljust(size, b"."))
+    return str(path)
+
+
+def _run(index, runs_folder, run_id, files, days_ago, uploaded_days_ago=None):
+    """Record a finished run that used files ({kind: path})"""
+    manifest = RunManifest(run_id, "test", str(runs_folder / run_id))
+    for kind, paths in files.items():
+        for path in paths if isinstance(paths, list) else [paths]:
+            manifest.add("make", kind, path)
+    if uploaded_days_ago is not None:
+        manifest.data["youtube"] = {"video_id": f"yt_{run_id}", "uploaded": _days_ago(uploaded_days_ago),
+                                    "job_id": None}
+    recorder = types.SimpleNamespace(started_at=None, stages=[])
+    manifest.save(recorder, {"started": _days_ago(days_ago), "ok": True, "wall_seconds": 1.0}, index=index)
+
+
+def test_shared_clip_is_kept_while_any_run_still_needs_it(setup):
+    index, manager, runs, files = setup
+    shared = _file(files, "pexels_1.mp4")
+    old_only = _file(files, "pexels_2.mp4")
+    _run(index, runs, "old", {"clip": [shared, old_only]}, days_ago=30)
+    _run(index, runs, "recent", {"clip": shared}, days_ago=1)
+
+    expired = manager.expired_files()
+    assert [(f["path"], f["runs"]) for f in expired] == [(old_only, 1)]
+
+    stats = manager.run_pass()
+    assert stats["deleted"] == 1
+    assert not os.path.exists(old_only)
+    assert os.path.exists(shared)
+    # Deleted files are not offered again
+    assert manager.expired_files() == []
+    assert old_only not in [r["path"] for r in index.file_references()]
+
+
+def test_intermediates_go_after_upload_and_scripts_stay(setup):
+    index, manager, runs, files = setup
+    voiceover = _file(files, "voiceover.mp3")
+    video = _file(files, "video.mp4")
+    script = _file(files, "script.txt")
+    waiting = _file(files, "waiting_voiceover.mp3")
+    _run(index, runs, "uploaded", {"voiceover": voiceover, "video": video, "script": script},
+         days_ago=2, uploaded_days_ago=1)
+    _run(index, runs, "not_uploaded", {"voiceover": waiting}, days_ago=2)
+
+    manager.run_pass()
+    assert not os.path.exists(voiceover)
+    # Video: 7 days after the upload. Script: always. Not uploaded yet: 30 days.
+    assert os.path.exists(video) and os.path.exists(script) and os.path.exists(waiting)
+
+
+def test_nothing_shared_is_deleted_while_a_video_is_being_made(setup):
+    index, manager, runs, files = setup
+    clip = _file(files, "pexels_1.mp4")
+    voiceover = _file(files, "voiceover.mp3")
+    _run(index, runs, "old", {"clip": clip, "voiceover": voiceover}, days_ago=30, uploaded_days_ago=29)
+
+    # A run folder without a manifest yet: a video being made right now
+    running = runs / "running"
+    running.mkdir()
+    (running / "stages.jsonl").write_text("{}\n")
+    assert manager.active_runs() == ["running"]
+
+    stats = manager.run_pass()
+    assert os.path.exists(clip)
+    assert stats["skipped"] == 1
+    # Files only this run used are not shared: they go anyway
+    assert not os.path.exists(voiceover)
+
+    # A run folder left behind hours ago is not running any more
+    hours_ago = datetime.datetime.now().timestamp() - 7 * 3600
+    for path in (running / "stages.jsonl", running):
+        os.utime(path, (hours_ago, hours_ago))
+    assert manager.active_runs() == []
+    manager.run_pass()
+    assert not os.path.exists(clip)
+
+
+def test_dry_run_deletes_nothing(setup):
+    index, manager, runs, files = setup
+    clip = _file(files, "pexels_1.mp4")
+    _run(index, runs, "old", {"clip": clip}, days_ago=30)
+
+    stats = manager.run_pass(dry_run=True)
+    assert stats["deleted"] == 1 and stats["bytes"] == 100
+    assert os.path.exists(clip)
+    assert len(manager.expired_files()) == 1
+
+
+def test_replaced_file_is_not_deleted(setup):
+    index, manager, runs, files = setup
+    resized = _file(files, "pexels_1.mp4")
+    touched = _file(files, "pexels_2.mp4")
+    missing = _file(files, "pexels_3.mp4")
+    _run(index, runs, "old", {"clip": [resized, touched, missing]}, days_ago=30)
+
+    # Another file now has these names, or the file is already gone
+    _file(files, "pexels_1.mp4", size=200)
+    stat = os.stat(touched)
+    os.utime(touched, ns=(stat.st_atime_ns, stat.st_mtime_ns + 5_000_000_000))
+    os.remove(missing)
+
+    stats = manager.run_pass()
+    assert stats["deleted"] == 0
+    assert stats["skipped"] == 2
+    assert os.path.getsize(resized) == 200
+    assert os.path.exists(touched)
+
+    # The recorded versions are gone; the new files are not the index's to delete
+    assert index.file_references() == []
+    assert manager.run_pass()["skipped"] == 0
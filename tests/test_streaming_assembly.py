@@ -0,0 +1,89 @@
+"""
+Peak memory of the streaming assembly path.
+
+Rendering 4x as many clips must not need more memory than rendering
+a few: only one clip is open per worker at any time. Each render runs
+in a fresh subprocess so ru_maxrss is the peak of that render alone.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+AUTOMATION_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                              "projects", "00-complete-automation")
+sys.path.insert(0, AUTOMATION_DIR)
+
+pytest.importorskip("moviepy.editor")
+ffmpeg_tools = pytest.importorskip("ffmpeg_tools")
+
+CLIP_SECONDS = 1.0
+SIZE = (640, 360)
+FEW_CLIPS = 3
+
+# Allowed growth of the peak when rendering 4x as many clips
+MARGIN_MB = 40
+
+RENDER_SCRIPT = textwrap.dedent("""
+    import json, resource, sys
+    sys.path.insert(0, sys.argv[1])
+    import edl
+
+    settings = json.loads(sys.argv[2])
+    plan = [{"source": path, "in": 0.0, "duration": settings["seconds"],
+             "start": i * settings["seconds"], "section": i + 1}
+            for i, path in enumerate(settings["clips"])]
+    edit = edl.build_edl(plan, settings["voice"], settings["width"], settings["height"], 15, "draft")
+    output = edl.render(edit, settings["output"], workers=settings["workers"])
+    assert output, "nothing rendered"
+
+    who = resource.RUSAGE_SELF if settings["workers"] == 1 else resource.RUSAGE_CHILDREN
+    print("PEAK_KB", resource.getrusage(who).ru_maxrss)
+""")
+
+
+def _make_media(folder, count):
+    clips = []
+    for i in range(count):
+        path = os.path.join(folder, f"clip_{i:02d}.mp4")
+        if not os.path.exists(path):
+            ffmpeg_tools.run_ffmpeg([
+                "-f", "lavfi", "-i", f"testsrc2=s={SIZE[0]}x{SIZE[1]}:r=15:d={CLIP_SECONDS}",
+                "-c:v", "libx264", "-preset", "ultrafast", "-pix_fmt", "yuv420p", path
+            ])
+        clips.append(path)
+    return clips
+
+
+def _peak_mb(tmp_path, clips, workers):
+    voice = str(tmp_path / f"voice_{len(clips)}.m4a")
+    ffmpeg_tools.run_ffmpeg([
+        "-f", "lavfi", "-i", f"sine=frequency=440:duration={len(clips) * CLIP_SECONDS}",
+        "-c:a", "aac", voice
+    ])
+    settings = {
+        "clips": clips, "voice": voice, "seconds": CLIP_SECONDS, "workers": workers,
+        "width": SIZE[0], "height": SIZE[1],
+        "output": str(tmp_path / f"out_{len(clips)}_{workers}.mp4"),
+    }
+    result = subprocess.run(
+        [sys.executable, "-c", RENDER_SCRIPT, AUTOMATION_DIR, json.dumps(settings)],
+        capture_output=True, text=True, cwd=str(tmp_path), timeout=600
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+    peak_kb = int(result.stdout.split("PEAK_KB")[-1].split()[0])
+    return peak_kb / 1024
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_peak_rss_does_not_grow_with_clip_count(tmp_path, workers):
+    clips = _make_media(str(tmp_path), FEW_CLIPS * 4)
+
+    few = _peak_mb(tmp_path, clips[:FEW_CLIPS], workers)
+    many = _peak_mb(tmp_path, clips, workers)
+
+    assert many <= few + MARGIN_MB, f"peak RSS grew from {few:.0f} MB to {many:.0f} MB"
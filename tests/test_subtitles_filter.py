@@ -0,0 +1,42 @@
+"""
+Burning captions from awkward paths.
+
+The subtitles filter gets the .srt path inside the filter text, so
+quotes and colons in folder or file names must survive ffmpeg's
+escaping rules.
+"""
+
+import os
+import sys
+
+import pytest
+
+AUTOMATION_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                              "projects", "00-complete-automation")
+sys.path.insert(0, AUTOMATION_DIR)
+
+ffmpeg_tools = pytest.importorskip("ffmpeg_tools")
+
+SRT = "1\n00:00:00,000 --> 00:00:01,000\nHello\n"
+
+
+@pytest.mark.parametrize("folder, name", [
+    ("plain", "captions.srt"),
+    ("it's here", "captions.srt"),
+    ("a:b", "it's.srt"),
+])
+def test_subtitles_filter_opens_the_file(tmp_path, folder, name):
+    if not ffmpeg_tools.has_filter("subtitles"):
+        pytest.skip("ffmpeg has no subtitles filter")
+
+    srt_file = tmp_path / folder / name
+    srt_file.parent.mkdir()
+    srt_file.write_text(SRT)
+    output = tmp_path / "out.mp4"
+
+    ffmpeg_tools.run_ffmpeg([
+        "-f", "lavfi", "-i", "color=s=160x90:d=1",
+        "-vf", ffmpeg_tools.subtitles_filter(str(srt_file)),
+        "-c:v", "libx264", "-preset", "ultrafast", str(output)
+    ])
+    assert output.exists()
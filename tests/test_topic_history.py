@@ -0,0 +1,89 @@
+"""
+Topic history: near repeats found through the MinHash buckets, one
+history per channel, and runs at the same time that all keep their
+topics.
+"""
+
+import json
+import os
+import sys
+import threading
+
+AUTOMATION_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                              "projects", "00-complete-automation")
+sys.path.insert(0, AUTOMATION_DIR)
+
+import topic_history
+
+
+def test_exact_repeat_ignores_case_numbers_and_filler(tmp_path):
+    history = topic_history.channel_history("main", str(tmp_path))
+    history.record("5 Amazing Facts About Dolphins!")
+    assert history.find_duplicate("amazing facts about dolphins")["title"] == "5 Amazing Facts About Dolphins!"
+
+
+def test_near_repeat_is_found_through_the_buckets(tmp_path, monkeypatch):
+    # A long history (entries without fingerprints get one when loaded)
+    titles = ["Amazing Facts About Bottlenose Dolphins"]
+    titles += [f"Unrelated topic number {i} about {chr(97 + i % 26) * 3}volcano{i}" for i in range(200)]
+    path = tmp_path / "main.json"
+    path.write_text(json.dumps({"topics": [{"title": title} for title in titles]}))
+    history = topic_history.TopicHistory(str(path))
+
+    compared = []
+    real_similarity = topic_history.similarity
+
+    def counting_similarity(a, b):
+        compared.append(b)
+        return real_similarity(a, b)
+
+    monkeypatch.setattr(topic_history, "similarity", counting_similarity)
+
+    earlier = history.find_duplicate("Amazing Facts About Bottlenose Dolphins Today")
+    assert earlier["title"] == "Amazing Facts About Bottlenose Dolphins"
+    # Only titles sharing a fingerprint band are compared, not the whole history
+    assert 0 < len(compared) < 20
+
+    assert history.is_new("The Deepest Point In The Ocean")
+
+
+def test_history_is_kept_per_channel(tmp_path):
+    main = topic_history.channel_history("main", str(tmp_path))
+    second = topic_history.channel_history("Second Channel!", str(tmp_path))
+    main.record("Why Octopuses Have Three Hearts")
+
+    assert not main.is_new("Why Octopuses Have Three Hearts")
+    assert second.is_new("Why Octopuses Have Three Hearts")
+    assert os.path.basename(second.path) == "second_channel.json"
+
+    # Saved and read back for the right channel only
+    assert len(topic_history.channel_history("main", str(tmp_path))) == 1
+    assert len(topic_history.channel_history("Second Channel!", str(tmp_path))) == 0
+
+
+def test_runs_at_the_same_time_keep_every_topic(tmp_path):
+    path = str(tmp_path / "main.json")
+    # Every run reads the history first, then records later (like real runs)
+    runs = [topic_history.TopicHistory(path) for _ in range(8)]
+    start = threading.Barrier(len(runs))
+
+    def make_videos(number, history):
+        start.wait()
+        for video in range(5):
+            history.record(f"Run {number} video {video} topic {'abcdefgh'[number]}{'ijklm'[video]}")
+
+    threads = [threading.Thread(target=make_videos, args=(i, history)) for i, history in enumerate(runs)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(topic_history.TopicHistory(path)) == 8 * 5
+
+
+def test_topics_recorded_elsewhere_are_seen(tmp_path):
+    path = str(tmp_path / "main.json")
+    scheduler = topic_history.TopicHistory(path)
+    topic_history.TopicHistory(path).record("Why Octopuses Have Three Hearts")
+
+    assert not scheduler.is_new("Why Do Octopuses Have Three Hearts?")
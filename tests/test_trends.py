@@ -0,0 +1,124 @@
+"""
+Trend discovery without the network: fixture files, the disk cache
+and its time limit, and merging keyword batches into one list.
+"""
+
+import json
+import os
+import sys
+import time
+import types
+
+import pytest
+
+AUTOMATION_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                              "projects", "00-complete-automation")
+sys.path.insert(0, AUTOMATION_DIR)
+
+import trends
+
+FIXTURE = {
+    "trending": {"US": ["Solar Eclipse", "Shark Week"], "GB": ["shark week", "Royal Wedding"]},
+    "related": {
+        "sharks": ["great white shark", "Shark Week"],
+        "space": ["black holes"],
+        "ocean": ["deep sea fish"],
+        "whales": ["blue whale size"],
+        "octopus": ["octopus hearts"],
+        "jellyfish": ["immortal jellyfish"],
+    },
+    "topics": ["My own topic", "black holes"],
+}
+
+KEYWORDS = ["sharks", "space", "ocean", "whales", "octopus", "jellyfish"]
+
+
+@pytest.fixture(autouse=True)
+def empty_memory_cache():
+    trends._memory_cache.clear()
+    yield
+    trends._memory_cache.clear()
+
+
+@pytest.fixture
+def fixture_file(tmp_path):
+    path = tmp_path / "trends.json"
+    path.write_text(json.dumps(FIXTURE))
+    return str(path)
+
+
+def _fetcher(fixture_file, tmp_path, **settings):
+    settings.setdefault("cache_file", str(tmp_path / "trend_cache.json"))
+    return trends.TrendFetcher(["US", "GB"], KEYWORDS, topics_file="topics.txt",
+                               fixture_file=fixture_file, **settings)
+
+
+def test_fixture_gives_every_source_once(fixture_file, tmp_path):
+    candidates = _fetcher(fixture_file, tmp_path).fetch()
+    titles = [c["title"] for c in candidates]
+
+    # Same title from two places (any case) is kept once, first source wins
+    assert titles.count("Shark Week") == 1
+    assert "shark week" not in titles
+    assert titles.count("black holes") == 1
+
+    by_title = {c["title"]: c for c in candidates}
+    assert by_title["Shark Week"] == {"title": "Shark Week", "source": "trending", "region": "US"}
+    assert by_title["Royal Wedding"]["region"] == "GB"
+    assert by_title["My own topic"]["source"] == "file"
+
+
+def test_keywords_are_fetched_in_batches_and_merged(fixture_file, tmp_path):
+    fetcher = _fetcher(fixture_file, tmp_path)
+    related = [name for name, _ in fetcher.sources() if name.startswith("related:")]
+    assert related == ["related:sharks|space|ocean|whales|octopus", "related:jellyfish"]
+
+    titles = [c["title"] for c in fetcher.fetch() if c["source"] == "related"]
+    assert titles == ["great white shark", "black holes", "deep sea fish", "blue whale size",
+                      "octopus hearts", "immortal jellyfish"]
+
+
+def test_disk_cache_is_used_until_it_expires(fixture_file, tmp_path, monkeypatch):
+    clock = types.SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(trends, "time", types.SimpleNamespace(time=lambda: clock.now))
+
+    first = _fetcher(fixture_file, tmp_path, ttl_minutes=10)
+    first.fetch()
+    assert first.cache_hits == 0
+    assert first.cache_misses == len(first.sources())
+
+    # Another process: nothing in memory, everything from the cache file
+    trends._memory_cache.clear()
+    clock.now += 9 * 60
+    second = _fetcher(fixture_file, tmp_path, ttl_minutes=10)
+    second.fetch()
+    assert second.cache_misses == 0
+    assert second.cache_hits == len(second.sources())
+
+    clock.now += 2 * 60
+    third = _fetcher(fixture_file, tmp_path, ttl_minutes=10)
+    third.fetch()
+    assert third.cache_hits == 0
+
+
+def test_fixture_results_do_not_mix_with_real_ones(fixture_file, tmp_path):
+    _fetcher(fixture_file, tmp_path).fetch()
+    with open(tmp_path / "trend_cache.json", "r", encoding="utf-8") as f:
+        keys = json.load(f)
+    assert keys and all(key.startswith("fixture-") for key in keys)
+
+
+def test_fixture_from_environment(fixture_file, tmp_path, monkeypatch):
+    monkeypatch.setenv("TRENDS_FIXTURE", fixture_file)
+    fetcher = trends.TrendFetcher(["US"], [], cache_file=None)
+    assert [c["title"] for c in fetcher.fetch()] == ["Solar Eclipse", "Shark Week"]
+
+
+def test_unknown_region_is_an_error_not_us_trends(tmp_path, capsys):
+    fetcher = trends.TrendFetcher(["XX"], [], cache_file=None)
+    with pytest.raises(ValueError, match="XX"):
+        fetcher.fetch_source("trending:XX", fetcher._trending_fetcher("XX"))
+
+    # fetch() reports the source and carries on with the others
+    assert fetcher.fetch() == []
+    assert "trending:XX" in capsys.readouterr().out
@@ -0,0 +1,78 @@
+"""
+Upload queue: two processes emptying the same outbox (the scheduler's
+upload worker and a manual upload_queue.py) upload every video once.
+"""
+
+import os
+import sys
+import threading
+import time
+
+AUTOMATION_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                              "projects", "00-complete-automation")
+sys.path.insert(0, AUTOMATION_DIR)
+
+import upload_queue
+
+
+def _queue(outbox, uploads):
+    queue = upload_queue.UploadQueue(str(outbox), auth=None, upload_url="http://unused")
+
+    def upload_video(job):
+        uploads.append(job["id"])
+        time.sleep(0.5)
+        with queue._job_lock:
+            job = queue._read_job(job["id"])
+            job["video_id"] = f"yt-{job['id']}"
+            queue._write_job(job)
+
+    queue._upload_video = upload_video
+    return queue
+
+
+def test_two_processes_upload_a_video_once(tmp_path):
+    video = tmp_path / "video.mp4"
+    video.write_bytes(b"video")
+    outbox = tmp_path / "outbox"
+    uploads = []
+
+    first = _queue(outbox, uploads)
+    second = _queue(outbox, uploads)
+    job_id = first.add(str(video), {"snippet": {"title": "Test"}}, topic="test")
+
+    start = threading.Barrier(2)
+
+    def drain(queue):
+        start.wait()
+        queue.drain()
+
+    threads = [threading.Thread(target=drain, args=(queue,)) for queue in (first, second)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert uploads == [job_id]
+    assert first.find_job(job_id)["video_id"] == f"yt-{job_id}"
+    assert os.path.exists(outbox / "done" / job_id)
+    # Quota was spent once, not once per process
+    assert first.quota.available() <= first.quota.capacity - upload_queue.QUOTA_COSTS["video"] + 1
+    assert first.quota.available() > first.quota.capacity - 2 * upload_queue.QUOTA_COSTS["video"]
+
+
+def test_claimed_job_is_skipped_then_uploaded(tmp_path):
+    video = tmp_path / "video.mp4"
+    video.write_bytes(b"video")
+    uploads = []
+    queue = _queue(tmp_path / "outbox", uploads)
+    job_id = queue.add(str(video), {"snippet": {"title": "Test"}}, topic="test")
+
+    claim = queue._claim(job_id)
+    assert queue._claim(job_id) is None
+    queue.drain()
+    assert uploads == []
+    assert queue.quota.available() == queue.quota.capacity
+
+    claim.close()
+    queue.drain()
+    assert uploads == [job_id]
@@ -0,0 +1,108 @@
+"""
+Resumable uploads against the fake YouTube upload server: retries on
+server errors and dropped connections, and resuming a saved session
+after the uploading process stopped half way.
+"""
+
+import os
+import sys
+import time
+import types
+
+import pytest
+import requests
+
+AUTOMATION_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                              "projects", "00-complete-automation")
+sys.path.insert(0, AUTOMATION_DIR)
+
+import fake_upload_server
+import uploader
+
+BODY = {"snippet": {"title": "Test upload"}, "status": {"privacyStatus": "private"}}
+
+# Ten pieces of the smallest size YouTube accepts
+CHUNK_MB = uploader.CHUNK_GRANULARITY / (1024 * 1024)
+FILE_BYTES = 10 * uploader.CHUNK_GRANULARITY + 12345
+
+
+class Crash(Exception):
+    """The uploading process stops (not an error the uploader retries)"""
+
+
+class CrashingSession(requests.Session):
+    """Stops the upload after a number of pieces were sent"""
+
+    def __init__(self, crash_after):
+        super().__init__()
+        self.crash_after = crash_after
+        self.pieces = 0
+
+    def request(self, method, url, *args, **kwargs):
+        headers = kwargs.get("headers") or {}
+        if method == "PUT" and not headers.get("Content-Range", "").startswith("bytes */"):
+            if self.pieces == self.crash_after:
+                raise Crash()
+            self.pieces += 1
+        return super().request(method, url, *args, **kwargs)
+
+
+@pytest.fixture(autouse=True)
+def no_waiting(monkeypatch):
+    # Retries wait 1s, 2s, 4s, ... - not in tests
+    fast = types.SimpleNamespace(sleep=lambda seconds: None, time=time.time, perf_counter=time.perf_counter)
+    monkeypatch.setattr(uploader, "time", fast)
+
+
+@pytest.fixture
+def video(tmp_path):
+    path = tmp_path / "video.mp4"
+    path.write_bytes(os.urandom(FILE_BYTES))
+    return path
+
+
+def _server(tmp_path, **settings):
+    server, url = fake_upload_server.start_server(0, save_dir=str(tmp_path / "received"), **settings)
+    return server, url
+
+
+def _received(tmp_path, response):
+    return (tmp_path / "received" / f"{response['id']}.mp4").read_bytes()
+
+
+def test_upload_survives_errors_and_dropped_connections(tmp_path, video):
+    server, url = _server(tmp_path, fail_every=3, drop_every=5)
+    try:
+        upload = uploader.ResumableUploader(requests.Session(), str(video), BODY, url,
+                                            chunk_mb=CHUNK_MB, max_retries=5, timeout=10)
+        response = upload.upload()
+    finally:
+        server.shutdown()
+
+    assert response["snippet"]["title"] == "Test upload"
+    assert upload.stats["retries"] > 0
+    assert _received(tmp_path, response) == video.read_bytes()
+
+
+def test_saved_session_resumes_after_a_crash(tmp_path, video):
+    server, url = _server(tmp_path, fail_every=4, drop_every=7)
+    sessions_file = str(tmp_path / "upload_sessions.json")
+    try:
+        first = uploader.ResumableUploader(CrashingSession(crash_after=4), str(video), BODY, url,
+                                           chunk_mb=CHUNK_MB, sessions_file=sessions_file, timeout=10)
+        with pytest.raises(Crash):
+            first.upload()
+        assert os.path.exists(sessions_file)
+
+        second = uploader.ResumableUploader(requests.Session(), str(video), BODY, url,
+                                            chunk_mb=CHUNK_MB, sessions_file=sessions_file, timeout=10)
+        response = second.upload()
+    finally:
+        server.shutdown()
+
+    # Carried on where the server stopped, instead of from 0%
+    assert second.stats["resumed_from"] >= 3 * uploader.CHUNK_GRANULARITY
+    assert second.stats["bytes_sent"] <= FILE_BYTES - second.stats["resumed_from"] + 3 * uploader.CHUNK_GRANULARITY
+    assert _received(tmp_path, response) == video.read_bytes()
+    # Finished uploads are not resumed again
+    assert second._saved_session() is None
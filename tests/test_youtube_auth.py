@@ -0,0 +1,133 @@
+"""
+YouTube login: moving token.pickle to the JSON token store, refreshing
+before the token expires, and locks that stay held while in use.
+"""
+
+import datetime
+import json
+import os
+import pickle
+import sys
+import threading
+import time
+
+import pytest
+
+AUTOMATION_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                              "projects", "00-complete-automation")
+sys.path.insert(0, AUTOMATION_DIR)
+
+import youtube_auth
+
+credentials_module = pytest.importorskip("google.oauth2.credentials")
+
+
+def _credentials(seconds_left, token="old-token"):
+    return credentials_module.Credentials(
+        token=token,
+        refresh_token="refresh-token",
+        token_uri="https://oauth2.googleapis.com/token",
+        client_id="client-id",
+        client_secret="client-secret",
+        scopes=[youtube_auth.UPLOAD_SCOPE],
+        expiry=datetime.datetime.utcnow() + datetime.timedelta(seconds=seconds_left),
+    )
+
+
+def _auth(tmp_path, legacy_pickle=None):
+    return youtube_auth.YouTubeAuth(
+        str(tmp_path / "tokens" / "main.json"),
+        str(tmp_path / "client_secrets.json"),
+        [youtube_auth.UPLOAD_SCOPE],
+        legacy_pickle=legacy_pickle,
+    )
+
+
+def test_token_pickle_is_moved_to_json(tmp_path):
+    legacy = tmp_path / "token.pickle"
+    with open(legacy, "wb") as f:
+        pickle.dump(_credentials(3600), f)
+
+    credentials = _auth(tmp_path, str(legacy)).credentials(interactive=False)
+    assert credentials.token == "old-token"
+
+    with open(tmp_path / "tokens" / "main.json", "r", encoding="utf-8") as f:
+        stored = json.load(f)
+    assert stored["refresh_token"] == "refresh-token"
+
+    # The next start reads the JSON token, even without the pickle
+    legacy.unlink()
+    assert _auth(tmp_path).credentials(interactive=False).token == "old-token"
+
+
+def test_no_token_and_no_client_secrets_gives_none(tmp_path):
+    assert _auth(tmp_path).credentials(interactive=False) is None
+
+
+@pytest.mark.parametrize("seconds_left, expected", [
+    (youtube_auth.REFRESH_MARGIN_SECONDS - 30, True),
+    (youtube_auth.REFRESH_MARGIN_SECONDS + 60, False),
+    (-10, True),
+])
+def test_expires_soon_uses_the_margin(seconds_left, expected):
+    assert youtube_auth.YouTubeAuth._expires_soon(_credentials(seconds_left)) is expected
+
+
+def test_token_is_refreshed_before_it_expires(tmp_path, monkeypatch):
+    auth = _auth(tmp_path)
+    auth._save(_credentials(youtube_auth.REFRESH_MARGIN_SECONDS - 30))
+
+    refreshed = []
+
+    def refresh(self, request):
+        refreshed.append(request)
+        self.token = "new-token"
+        self.expiry = datetime.datetime.utcnow() + datetime.timedelta(hours=1)
+
+    monkeypatch.setattr(credentials_module.Credentials, "refresh", refresh)
+
+    assert auth.credentials(interactive=False).token == "new-token"
+    assert auth.credentials(interactive=False).token == "new-token"
+    assert len(refreshed) == 1
+
+    # Saved for the other processes
+    assert _auth(tmp_path).credentials(interactive=False).token == "new-token"
+
+
+def test_held_lock_is_not_taken_as_stale(tmp_path, monkeypatch):
+    monkeypatch.setattr(youtube_auth, "STALE_LOCK_SECONDS", 0.4)
+    path = str(tmp_path / "token.json")
+    holding = threading.Event()
+    release = threading.Event()
+
+    def hold():
+        with youtube_auth.file_lock(path):
+            holding.set()
+            release.wait(10)
+
+    holder = threading.Thread(target=hold)
+    holder.start()
+    try:
+        holding.wait(10)
+        # Three times the stale limit, and the lock is still held
+        time.sleep(1.2)
+        with pytest.raises(TimeoutError):
+            with youtube_auth.file_lock(path, timeout=0):
+                pass
+    finally:
+        release.set()
+        holder.join()
+
+    with youtube_auth.file_lock(path, timeout=1):
+        pass
+
+
+def test_lock_left_by_a_crash_is_taken_over(tmp_path, monkeypatch):
+    monkeypatch.setattr(youtube_auth, "STALE_LOCK_SECONDS", 0.2)
+    path = str(tmp_path / "token.json")
+    with open(f"{path}.lock", "w"):
+        pass
+    time.sleep(0.3)
+
+    with youtube_auth.file_lock(path, timeout=1):
+        pass